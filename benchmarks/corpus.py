@@ -0,0 +1,64 @@
+"""
+Module: corpus
+
+This module generates deterministic synthetic memory corpora and a hashing embedder for offline benchmarks.
+"""
+
+import random
+import zlib
+from typing import List
+import numpy as np
+from shared.constants import THEME_WHITELIST
+
+SUBJECTS = ["She", "He", "I", "We", "They", "The child", "My father", "The stranger", "Lyra", "You"]
+VERBS = ["remembered", "waited by", "walked past", "wrote about", "dreamed of", "forgot", "returned to",
+         "kept", "lost", "watched"]
+OBJECTS = ["the bridge", "the window", "an old letter", "the harbor", "the December snow", "the empty room",
+           "a quiet song", "the last train", "the garden", "a photograph"]
+CODAS = ["and felt {theme}.", "in {theme}.", "without a word.", "before dawn.", "for a long time.",
+         "and the {theme} stayed.", "again.", "as the tide came in."]
+THEMES = sorted(THEME_WHITELIST)
+
+USER_INPUTS = [
+    "What are you still holding?",
+    "I'm sorry, it was my fault.",
+    "I miss the way it used to be.",
+    "Why does the silence feel so loud?",
+    "Tell me something I forgot.",
+]
+
+
+def generate_corpus(n: int, seed: int = 0) -> List[str]:
+    """Return n reproducible memory sentences; the same (n, seed) always yields the same corpus."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} "
+        f"{rng.choice(CODAS).format(theme=rng.choice(THEMES))}"
+        for _ in range(n)
+    ]
+
+
+def generate_queries(n: int, seed: int = 1) -> List[str]:
+    return generate_corpus(n, seed)
+
+
+class HashingEmbedder:
+    """
+    Deterministic stand-in for SentenceTransformer: a signed feature-hashing
+    bag of words, L2-normalized, so texts sharing words land close together.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        vectors = np.zeros((len(batch), self.dim), dtype="float32")
+        for row, text in enumerate(batch):
+            for token in text.lower().split():
+                digest = zlib.crc32(token.encode("utf-8"))
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors[0] if single else vectors
@@ -0,0 +1,178 @@
+"""
+Module: run_benchmarks
+
+This module measures memory and prompt-composition operations on synthetic corpora of growing size.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --output results.json
+
+Everything runs offline: embeddings come from a deterministic HashingEmbedder and
+memory files live in a temporary directory. Each corpus size is reached by adding
+to the previous one, and then every operation is timed `--samples` times.
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+import numpy as np
+
+from benchmarks.corpus import USER_INPUTS, HashingEmbedder, generate_corpus, generate_queries
+from companion.memory import model_registry
+from companion.memory.long_term import PERSIST_SNAPSHOT, PERSIST_WAL
+from companion.memory.memory_manager import META_BACKEND_JSON, META_BACKEND_SQLITE, MemoryManager
+from companion.memory.vector_index import INDEX_AUTO, SUPPORTED_INDEX_TYPES, INDEX_FLAT
+from whisper_engine.mirror_context_builder import PAST_REFLECTION
+from whisper_engine.response_builder import ResponseBuilder
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+FULL_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_SAMPLES = 50
+DEFAULT_DIM = 384
+INGEST_CHUNK = 100_000
+MIRRORS = ["mirror_1", "mirror_2", "mirror_3"]
+EMBEDDER_NAME = "benchmark-hashing"
+
+
+def measure(operation: str, size: int, fn: Callable[[int], object], samples: int) -> Dict[str, object]:
+    """Call fn(i) for i in range(samples) and summarize the per-call latency."""
+    latencies = []
+    for i in range(samples):
+        started = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - started)
+    return summarize(operation, size, latencies)
+
+
+def summarize(operation: str, size: int, latencies: List[float], items: int = None) -> Dict[str, object]:
+    total = sum(latencies)
+    items = items if items is not None else len(latencies)
+    return {
+        "operation": operation,
+        "size": size,
+        "samples": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 4),
+        "mean_ms": round(total / len(latencies) * 1000, 4),
+        "ops_per_sec": round(items / total, 1) if total else None,
+    }
+
+
+def run(sizes: List[int], samples: int = DEFAULT_SAMPLES, dim: int = DEFAULT_DIM, persistence: str = PERSIST_WAL,
+        index_type: str = INDEX_FLAT, meta_backend: str = META_BACKEND_JSON, seed: int = 0,
+        log: Callable[[str], None] = print) -> Dict[str, object]:
+    """
+    Run every benchmark at each corpus size.
+
+    :return: {"meta": run configuration, "results": one summary per (operation, size)}.
+    """
+    sizes = sorted(sizes)
+    corpus = generate_corpus(sizes[-1], seed)
+    queries = generate_queries(samples, seed + 1)
+    probes = generate_corpus(samples, seed + 2)
+    results = []
+
+    model_registry.register_model(EMBEDDER_NAME, HashingEmbedder(dim))
+    try:
+        with tempfile.TemporaryDirectory() as memory_dir:
+            manager = MemoryManager(dim=dim, persistence=persistence, index_type=index_type,
+                                    model_name=EMBEDDER_NAME, meta_backend=meta_backend, memory_dir=memory_dir)
+            builder = ResponseBuilder(manager)
+            consumed = 0  # corpus entries ingested so far; single-add probes also grow the store
+
+            for size in sizes:
+                # Grow the store to `size` memories, timing bulk ingestion per item.
+                first_row = len(results)
+                missing = size - manager.long_term.next_id
+                started = time.perf_counter()
+                for chunk_start in range(consumed, consumed + missing, INGEST_CHUNK):
+                    chunk = corpus[chunk_start:min(consumed + missing, chunk_start + INGEST_CHUNK)]
+                    manager.add_many(chunk, metadata=[
+                        {"label": "benchmark", "mirror_id": MIRRORS[(chunk_start + i) % len(MIRRORS)]}
+                        for i in range(len(chunk))
+                    ])
+                if missing > 0:
+                    results.append(summarize("memory_manager.add_many", size, [time.perf_counter() - started],
+                                             items=missing))
+                    consumed += missing
+                log(f"Loaded {manager.long_term.next_id} memories")
+
+                long_term = manager.long_term
+                results.append(measure("long_term.search", size,
+                                       lambda i: long_term.search(queries[i], 5), samples))
+                manager.retriever.sync()  # index build is not part of the per-query latency
+                results.append(measure("hybrid_retriever.search", size,
+                                       lambda i: manager.retriever.search(queries[i], 5), samples))
+                results.append(measure("meta_memory.record", size,
+                                       lambda i: manager.meta_memory.record(i % size, label="touched"), samples))
+                results.append(measure("memory_manager.get_loop_patterns", size,
+                                       lambda i: manager.get_loop_patterns(), samples))
+                for mirror_id in MIRRORS:  # otherwise compose would only time the empty-context path
+                    labels = [label for label, _ in builder.context_builder.fragments(mirror_id)]
+                    if PAST_REFLECTION not in labels:
+                        raise RuntimeError(f"No {PAST_REFLECTION} fragment for {mirror_id}; benchmark memories lost their mirror")
+                results.append(measure("response_builder.compose", size,
+                                       lambda i: builder.compose(USER_INPUTS[i % len(USER_INPUTS)],
+                                                                 MIRRORS[i % len(MIRRORS)]), samples))
+                # Single adds go last so they do not shift the corpus measured above.
+                results.append(measure("long_term.add", size, lambda i: long_term.add(probes[i]), samples))
+                for row in results[first_row:]:
+                    log(f"  {row['operation']:<34} p50={row['p50_ms']:>10.4f}ms  p99={row['p99_ms']:>10.4f}ms  "
+                        f"{row['ops_per_sec']} ops/s")
+
+            long_term.close()
+            if hasattr(manager.meta_memory, "close"):
+                manager.meta_memory.close()
+    finally:
+        model_registry.unload(EMBEDDER_NAME)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "samples": samples,
+            "dim": dim,
+            "persistence": persistence,
+            "index_type": index_type,
+            "meta_backend": meta_backend,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None) -> Dict[str, object]:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for memory and prompt composition.")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=DEFAULT_SIZES,
+                        help="Comma-separated corpus sizes (default: 1000,10000,100000).")
+    parser.add_argument("--full", action="store_true", help="Run every size up to 1,000,000 memories.")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Timed calls per operation and size.")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Embedding dimensionality.")
+    parser.add_argument("--persistence", choices=[PERSIST_SNAPSHOT, PERSIST_WAL], default=PERSIST_WAL)
+    parser.add_argument("--index-type", choices=SUPPORTED_INDEX_TYPES, default=INDEX_FLAT,
+                        help=f"Long-term index backend ({INDEX_AUTO} promotes by corpus size).")
+    parser.add_argument("--meta-backend", choices=[META_BACKEND_JSON, META_BACKEND_SQLITE], default=META_BACKEND_JSON)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    report = run(FULL_SIZES if args.full else args.sizes, samples=args.samples, dim=args.dim,
+                 persistence=args.persistence, index_type=args.index_type, meta_backend=args.meta_backend,
+                 seed=args.seed)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,46 @@
 # Author: Andy Widjaja
 # Purpose: Prompt router
 
-from typing import Dict, List, Callable
+from typing import Dict, Iterator, List, Callable, Optional
 import json
 import re
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from companion.memory.memory_manager import MemoryManager
+from shared.instrumentation import instrumented
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_MODEL = "lyra-k"
+OLLAMA_TIMEOUT = 60
+DEFAULT_POOL_SIZE = 10
+
+class TokenStream:
+    """
+    Iterator over the tokens of one streamed response.
+
+    `stats` is filled once the stream ends (or is closed early) with ttft_ms,
+    total_ms, tokens and tokens_per_sec. Each stream carries its own stats, so
+    concurrent streams on one router do not overwrite each other's numbers.
+    """
+    def __init__(self, tokens: Iterator[str], stats: Dict[str, float]):
+        self.stats = stats
+        self._tokens = tokens
+
+    def __iter__(self) -> "TokenStream":
+        return self
+
+    def __next__(self) -> str:
+        return next(self._tokens)
+
+    def __enter__(self) -> "TokenStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._tokens.close()
 
 class PromptRouter:
     """
@@ -15,14 +50,25 @@ class PromptRouter:
     and local LLM fallback, including 'remember', 'recall', and freeform
     prompts via a local agent hosted in Ollama.
     """
-    def __init__(self, memory: MemoryManager):
+    def __init__(self, memory: MemoryManager, session: Optional[requests.Session] = None, pool_size: int = DEFAULT_POOL_SIZE):
         self.routes: Dict[str, Callable[[str], str]] = {}
         self.memory = memory
+        self.session = session or self._create_session(pool_size)
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """Create a keep-alive session whose connection pool is reused across queries."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
 
     def add_route(self, pattern: str, handler: Callable[[str], str]):
         """Register a regex pattern with its corresponding handler function."""
         self.routes[pattern] = handler
 
+    @instrumented("prompt_router.route")
     def route(self, prompt: str) -> str:
         """Find and invoke the appropriate handler based on pattern matching."""
         for pattern, handler in self.routes.items():
@@ -64,27 +110,61 @@ class PromptRouter:
         #     return f"❌ Error contacting Lyra-K: {e}"
 
         try:
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={"model": "lyra-k", "prompt": prompt, "stream": True},
-                stream=True,
-                timeout=60
-            )
-
-            output = ""
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        token = json.loads(line.decode('utf-8'))
-                        output += token.get("response", "")
-                    except Exception as e:
-                        output += f"\n[⚠️ Error parsing chunk: {e}]"
-
+            output = "".join(self.stream_ollama(prompt))
             return output.strip() if output else "⚠️ Empty response from Lyra-K."
 
         except Exception as e:
             return f"❌ Error contacting Lyra-K: {e}"
 
+    def stream_ollama(self, prompt: str) -> TokenStream:
+        """
+        Stream a response from Lyra-K, yielding tokens as they arrive.
+
+        :param prompt: The prompt to send.
+        :return: A TokenStream of response tokens; its stats hold the call's timing once it ends.
+        """
+        stats: Dict[str, float] = {}
+        return TokenStream(self._stream_tokens(prompt, stats), stats)
+
+    def _stream_tokens(self, prompt: str, stats: Dict[str, float]) -> Iterator[str]:
+        started = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+
+        try:
+            with self.session.post(
+                OLLAMA_URL,
+                json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": True},
+                stream=True,
+                timeout=OLLAMA_TIMEOUT
+            ) as response:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line.decode('utf-8'))
+                        token = chunk.get("response", "")
+                    except Exception as e:
+                        yield f"\n[⚠️ Error parsing chunk: {e}]"
+                        continue
+
+                    if token:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        tokens += 1
+                        yield token
+                    if chunk.get("done"):
+                        break
+        finally:
+            finished = time.perf_counter()
+            generating = finished - first_token_at if first_token_at is not None else 0.0
+            stats.update({
+                "ttft_ms": round((first_token_at - started) * 1000, 2) if first_token_at is not None else None,
+                "total_ms": round((finished - started) * 1000, 2),
+                "tokens": tokens,
+                "tokens_per_sec": round(tokens / generating, 2) if generating > 0 else 0.0,
+            })
+
     @staticmethod
     def default_handler(prompt: str) -> str:
         return f"I'm not sure how to respond to: '{prompt}'"
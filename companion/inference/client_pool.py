@@ -0,0 +1,107 @@
+"""
+Module: client_pool
+
+This module provides a bounded pool of long-lived API clients with usage statistics.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_POOL_SIZE = 8
+
+
+class ClientPool:
+    """
+    Hands out up to `size` clients built by `factory`, creating them lazily and
+    keeping them for reuse so their connections stay alive between calls.
+
+    When every client is in use, acquire() blocks until one is released and the
+    wait is counted in stats().
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = DEFAULT_POOL_SIZE,
+                 close: Optional[Callable[[Any], None]] = None):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.factory = factory
+        self.size = size
+        self._close = close
+        self._idle: List[Any] = []
+        self._created = 0
+        self._in_use = 0
+        self._acquisitions = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Borrow a client for the duration of the block.
+
+        :param timeout: Seconds to wait for a free client (default: wait forever).
+        :raises TimeoutError: If no client became free within timeout.
+        """
+        client = self._checkout(timeout)
+        try:
+            yield client
+        finally:
+            self._checkin(client)
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "wait_ms": round(self._wait_seconds * 1000, 3),
+            }
+
+    def close(self) -> None:
+        """Close every idle client; later acquisitions create fresh ones."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for client in idle:
+            self._close_client(client)
+
+    def _checkout(self, timeout: Optional[float]):
+        with self._condition:
+            self._acquisitions += 1
+            if not self._idle and self._created >= self.size:
+                self._waits += 1
+                started = time.perf_counter()
+                available = self._condition.wait_for(lambda: self._idle or self._created < self.size, timeout)
+                self._wait_seconds += time.perf_counter() - started
+                if not available:
+                    raise TimeoutError(f"No client available after {timeout}s (pool size {self.size})")
+            self._in_use += 1
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            return self.factory()
+        except BaseException:
+            with self._condition:
+                self._created -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def _checkin(self, client) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append(client)
+            self._condition.notify()
+
+    def _close_client(self, client) -> None:
+        if self._close is not None:
+            self._close(client)
+        elif hasattr(client, "close"):
+            client.close()
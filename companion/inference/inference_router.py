@@ -4,10 +4,24 @@ Module: inference_router
 This module handles LLM inference with support for GPT-4o, Claude Sonnet, and LLaMA models.
 """
 
-from anthropic import Anthropic
+from typing import AsyncIterator, Dict, Optional
+from anthropic import Anthropic, AsyncAnthropic
+import asyncio
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import httpx
 import openai
 import requests
+from requests.adapters import HTTPAdapter
 import os
+from companion.inference.client_pool import ClientPool
+from companion.inference.response_cache import ResponseCache
+from companion.inference.single_flight import AsyncSingleFlight, SingleFlight
+from companion.inference.provider_scheduler import ProviderScheduler
+from shared.instrumentation import stage
 
 OPENAI_PROVIDER = "openai"
 ANTHROPIC_PROVIDER = "anthropic"
@@ -18,14 +32,83 @@ CLAUDE_SONNET_MODEL = "claude-sonnet-4-20250514"
 LLAMA3_8B_MODEL = "llama3-8b"
 
 SUPPORTED_MODELS = [GPT_4O_MODEL, CLAUDE_SONNET_MODEL, LLAMA3_8B_MODEL]
+SUPPORTED_PROVIDERS = [OPENAI_PROVIDER, ANTHROPIC_PROVIDER, LOCAL_PROVIDER]
 
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_MAX_TOKENS = 512
 
+LLAMA_URL = "http://localhost:8000/infer"
+NO_RESPONSE = "[No response received]"
+
+# Maximum in-flight async requests per provider, and per-request timeouts in seconds.
+DEFAULT_CONCURRENCY_LIMITS = {OPENAI_PROVIDER: 64, ANTHROPIC_PROVIDER: 64, LOCAL_PROVIDER: 8}
+DEFAULT_TIMEOUTS = {OPENAI_PROVIDER: 60.0, ANTHROPIC_PROVIDER: 60.0, LOCAL_PROVIDER: 120.0}
+
+# Long-lived synchronous clients kept per provider. OpenAI's v0 SDK already reuses a
+# thread-local keep-alive session, so only Anthropic and the local server are pooled here.
+DEFAULT_POOL_SIZES = {ANTHROPIC_PROVIDER: 8, LOCAL_PROVIDER: 8}
+
+class _LoopClients:
+    """
+    Semaphores and async clients bound to one event loop.
+
+    The clients are closed by aclose(), or otherwise when the loop shuts down its
+    async generators (asyncio.run() does so before closing the loop), so their
+    connections never outlive the loop they were opened on.
+    """
+    def __init__(self, anthropic_key: Optional[str]):
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.http = httpx.AsyncClient(timeout=None)
+        self.anthropic = AsyncAnthropic(api_key=anthropic_key)
+        self._released = False
+        self._lifetime = self._hold_open()
+        asyncio.ensure_future(self._lifetime.__anext__())  # registers the generator with the running loop
+
+    async def _hold_open(self):
+        try:
+            yield
+        finally:
+            await self._release()
+
+    async def _release(self) -> None:
+        if not self._released:
+            self._released = True
+            await self.http.aclose()
+            await self.anthropic.close()
+
+    async def aclose(self) -> None:
+        await self._release()
+        await self._lifetime.aclose()
+
 class InferenceRouter:
-    def __init__(self):
+    def __init__(self, concurrency_limits: Optional[Dict[str, int]] = None, timeouts: Optional[Dict[str, float]] = None,
+                 llama_url: str = LLAMA_URL, pool_sizes: Optional[Dict[str, int]] = None,
+                 response_cache: Optional[ResponseCache] = None, scheduler: Optional[ProviderScheduler] = None):
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+        self.llama_url = llama_url
+        self.concurrency_limits = {**DEFAULT_CONCURRENCY_LIMITS, **(concurrency_limits or {})}
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.response_cache = response_cache
+
+        # With a scheduler, failed or slow requests fail over (or are hedged) to other providers.
+        self.scheduler = scheduler
+        self._hedge_executor = None  # only hedged requests use it; created on first use
+        self._hedge_lock = threading.Lock()
+
+        # Concurrent identical requests share one upstream call.
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+
+        pool_sizes = {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}
+        self.pools: Dict[str, ClientPool] = {
+            ANTHROPIC_PROVIDER: ClientPool(lambda: Anthropic(api_key=self.anthropic_key), pool_sizes[ANTHROPIC_PROVIDER]),
+            LOCAL_PROVIDER: ClientPool(self._create_session, pool_sizes[LOCAL_PROVIDER]),
+        }
+
+        # Async primitives and clients belong to one event loop; each loop gets its own on first use.
+        self._loop_clients = weakref.WeakKeyDictionary()  # event loop -> _LoopClients
+        self._loop_lock = threading.Lock()
 
     def _call_openai(self, prompt: str, model: str = GPT_4O_MODEL, temperature: float = DEFAULT_TEMPERATURE, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         """
@@ -43,27 +126,51 @@ class InferenceRouter:
         """
         Call the Anthropic API with the given prompt and parameters.
         """
-        client = Anthropic(api_key=self.anthropic_key)
-        response = client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with self.pools[ANTHROPIC_PROVIDER].acquire() as client:
+            response = client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
 
         # print(response.content[0].text)
 
         # Claude’s response is in `response.content` (list of message blocks)
-        return response.content[0].text.strip() if response.content else "[No response received]"
+        return response.content[0].text.strip() if response.content else NO_RESPONSE
 
     def _call_llama(self, prompt: str, model: str = LLAMA3_8B_MODEL, temperature: float = DEFAULT_TEMPERATURE, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         """
         Call the LLaMA API with the given prompt and parameters.
         """
-        response = requests.post("http://localhost:8000/infer", json={"prompt": prompt, "temperature": temperature, "max_tokens": max_tokens})
-        return response.json().get("text", "")
+        with self.pools[LOCAL_PROVIDER].acquire() as session:
+            response = session.post(self.llama_url, json={"prompt": prompt, "temperature": temperature, "max_tokens": max_tokens},
+                                    timeout=self.timeouts[LOCAL_PROVIDER])
+            return response.json().get("text", "")
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a keep-alive session; each pooled session serves one caller at a time."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def pool_stats(self) -> Dict[str, Dict[str, float]]:
+        """Return in-use, idle and wait counters of each provider's client pool."""
+        return {provider: pool.stats() for provider, pool in self.pools.items()}
+
+    def close(self) -> None:
+        """Close the pooled synchronous clients and the hedging threads."""
+        for pool in self.pools.values():
+            pool.close()
+        with self._hedge_lock:
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
 
     def prompt(self, prompt: str, model: str, provider:str = OPENAI_PROVIDER) -> str:
         """
@@ -76,21 +183,31 @@ class InferenceRouter:
         :param max_tokens: The maximum number of tokens to generate (default is 512).
         :return: The output string from the model.
         """
-        if model not in SUPPORTED_MODELS:
-            raise ValueError(f"Unsupported model specified: {model}. Supported models: {', '.join(SUPPORTED_MODELS)}")
-        
-        if provider not in [OPENAI_PROVIDER, ANTHROPIC_PROVIDER]:
-            raise ValueError(f"Unsupported provider: {provider}. Supported providers: {OPENAI_PROVIDER}, {ANTHROPIC_PROVIDER}")
-        
+        self._validate(model, provider)
+
+        cached, embedding = self._cached(prompt, model, provider)
+        if cached is not None:
+            return cached
+
+        with stage(f"inference_router.prompt.{provider}", len(prompt)):
+            return self.single_flight.do(self._flight_key(prompt, model, provider),
+                                         lambda: self._prompt_upstream(prompt, model, provider, embedding))
+
+    def _call(self, provider: str, prompt: str, model: str) -> str:
+        if provider == OPENAI_PROVIDER:
+            return self._call_openai(prompt, model, temperature = DEFAULT_TEMPERATURE, max_tokens = DEFAULT_MAX_TOKENS)
+        elif provider == ANTHROPIC_PROVIDER:
+            return self._call_anthropic(prompt, model, temperature = DEFAULT_TEMPERATURE, max_tokens = DEFAULT_MAX_TOKENS)
+        return self._call_llama(prompt, model, temperature = DEFAULT_TEMPERATURE, max_tokens = DEFAULT_MAX_TOKENS)
+
+    def _prompt_upstream(self, prompt: str, model: str, provider: str, embedding=None) -> str:
+        if self.scheduler is not None:
+            return self._prompt_scheduled(prompt, model, provider, embedding)
+
         try:
-            if provider == OPENAI_PROVIDER:
-                return self._call_openai(prompt, model, temperature = DEFAULT_TEMPERATURE, max_tokens = DEFAULT_MAX_TOKENS)
-            elif provider == ANTHROPIC_PROVIDER:
-                return self._call_anthropic(prompt, model, temperature = DEFAULT_TEMPERATURE, max_tokens = DEFAULT_MAX_TOKENS)
-            elif provider == LOCAL_PROVIDER:
-                return self._call_llama(prompt, model, temperature = DEFAULT_TEMPERATURE, max_tokens = DEFAULT_MAX_TOKENS)
-            else:
-                raise ValueError(f"Unsupported provider: {provider}. Supported providers: {OPENAI_PROVIDER}, {ANTHROPIC_PROVIDER}, {LOCAL_PROVIDER}")
+            response = self._call(provider, prompt, model)
+            self._remember(prompt, model, provider, response, embedding)
+            return response
         except openai.error.RateLimitError:
             print(f"Rate limit exceeded for {model}, attempting fallback...")
             return self.prompt(prompt, model=CLAUDE_SONNET_MODEL, provider=ANTHROPIC_PROVIDER)
@@ -98,3 +215,362 @@ class InferenceRouter:
             print(f"Error during inference: {ex}")
             return ""  # Return an empty string or handle as needed
 
+    async def aprompt(self, prompt: str, model: str, provider: str = OPENAI_PROVIDER) -> str:
+        """
+        Async counterpart of prompt().
+
+        At most concurrency_limits[provider] calls per provider are in flight at
+        once; further calls wait for a slot. Each call is bounded by timeouts[provider].
+
+        :param prompt: The full prompt ready for the LLM.
+        :param model: The model to use for inference.
+        :param provider: The provider to use for inference (default is "openai").
+        :return: The output string from the model, or "" on error.
+        """
+        self._validate(model, provider)
+
+        cached, embedding = await self._acached(prompt, model, provider)
+        if cached is not None:
+            return cached
+
+        with stage(f"inference_router.aprompt.{provider}", len(prompt)):
+            return await self.async_single_flight.do(self._flight_key(prompt, model, provider),
+                                                     lambda: self._aprompt_upstream(prompt, model, provider, embedding))
+
+    async def _aprompt_upstream(self, prompt: str, model: str, provider: str, embedding=None) -> str:
+        if self.scheduler is not None:
+            return await self._aprompt_scheduled(prompt, model, provider, embedding)
+
+        try:
+            async with self._semaphore(provider):
+                response = await asyncio.wait_for(
+                    self._acall(provider, prompt, model, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS),
+                    timeout=self.timeouts[provider]
+                )
+            await self._aremember(prompt, model, provider, response, embedding)
+            return response
+        except openai.error.RateLimitError:
+            print(f"Rate limit exceeded for {model}, attempting fallback...")
+            return await self.aprompt(prompt, model=CLAUDE_SONNET_MODEL, provider=ANTHROPIC_PROVIDER)
+        except asyncio.TimeoutError:
+            print(f"Inference timed out after {self.timeouts[provider]}s for {provider}/{model}")
+            return ""
+        except Exception as ex:
+            print(f"Error during inference: {ex}")
+            return ""
+
+    def _prompt_scheduled(self, prompt: str, model: str, provider: str, embedding=None) -> str:
+        """
+        Try the scheduler's candidates in order until one returns a non-empty response.
+
+        Any error fails over to the next candidate. Calls run on the caller's thread
+        until one has a hedge delay, which hands the request to _prompt_hedged().
+        """
+        remaining = self.scheduler.candidates((provider, model))
+        if not remaining:
+            print(f"No provider available for {provider}/{model}: every circuit is open")
+            return ""
+
+        while remaining:
+            target = remaining.pop(0)
+            if not self.scheduler.acquire(target):
+                continue
+            if remaining and self.scheduler.hedge_delay(target) is not None:
+                return self._prompt_hedged(prompt, target, remaining, embedding)
+            try:
+                response = self._timed_call(target, prompt)
+            except Exception as ex:
+                print(f"Error during inference on {target[0]}/{target[1]}: {ex}")
+                continue
+            self._remember(prompt, target[1], target[0], response, embedding)
+            return response
+
+        return ""
+
+    def _prompt_hedged(self, prompt: str, first, remaining, embedding=None) -> str:
+        """
+        Run first (already acquired) on the hedge executor, falling over to or hedging with remaining.
+
+        If the running request outlasts its hedge delay, counted from when it starts
+        running, the next candidate is started alongside it and the first successful
+        response wins; at most two requests are ever in flight.
+        """
+        executor = self._hedge_pool()
+        pending = {}  # future -> (target, event set once the call starts running)
+        hedged = False
+
+        def submit(target):
+            running = threading.Event()
+            pending[executor.submit(self._timed_call, target, prompt, running)] = (target, running)
+
+        def launch():
+            while remaining:
+                target = remaining.pop(0)
+                if self.scheduler.acquire(target):
+                    submit(target)
+                    return
+
+        submit(first)
+        while pending:
+            delay = None
+            if not hedged and remaining:
+                target, running = next(iter(pending.values()))
+                delay = self.scheduler.hedge_delay(target)
+                if delay is not None:
+                    running.wait()
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                launch()
+                continue
+
+            for future in done:
+                target, _ = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as ex:
+                    print(f"Error during inference on {target[0]}/{target[1]}: {ex}")
+                    continue
+                self._remember(prompt, target[1], target[0], response, embedding)
+                return response
+
+            if remaining and len(pending) < (2 if hedged else 1):
+                launch()
+
+        return ""
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        # Sized so that hedged calls only queue once every provider is at its concurrency limit.
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=sum(self.concurrency_limits.values()),
+                                                          thread_name_prefix="inference-hedge")
+            return self._hedge_executor
+
+    def _timed_call(self, target, prompt: str, running: Optional[threading.Event] = None) -> str:
+        if running is not None:
+            running.set()
+        started = time.perf_counter()
+        try:
+            response = self._call(target[0], prompt, target[1])
+            if not response or response == NO_RESPONSE:
+                raise ValueError("empty response")
+        except Exception:
+            self.scheduler.record(target, time.perf_counter() - started, ok=False)
+            raise
+        self.scheduler.record(target, time.perf_counter() - started, ok=True)
+        return response
+
+    async def _aprompt_scheduled(self, prompt: str, model: str, provider: str, embedding=None) -> str:
+        """Async counterpart of _prompt_scheduled(); losing hedged requests are cancelled."""
+        remaining = self.scheduler.candidates((provider, model))
+        if not remaining:
+            print(f"No provider available for {provider}/{model}: every circuit is open")
+            return ""
+
+        pending = {}
+        hedged = False
+
+        def launch():
+            while remaining:
+                target = remaining.pop(0)
+                if self.scheduler.acquire(target):
+                    task = asyncio.ensure_future(self._atimed_call(target, prompt))
+                    task.add_done_callback(lambda task, target=target: self._release_cancelled(target, task))
+                    pending[task] = target
+                    return
+
+        launch()
+        try:
+            while pending:
+                delay = None if hedged or not remaining else self.scheduler.hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    launch()
+                    continue
+
+                for task in done:
+                    target = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as ex:
+                        print(f"Error during inference on {target[0]}/{target[1]}: {ex}")
+                        continue
+                    await self._aremember(prompt, target[1], target[0], response, embedding)
+                    return response
+
+                if remaining and len(pending) < (2 if hedged else 1):
+                    launch()
+            return ""
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _atimed_call(self, target, prompt: str) -> str:
+        provider, model = target
+        started = time.perf_counter()
+        try:
+            async with self._semaphore(provider):
+                response = await asyncio.wait_for(
+                    self._acall(provider, prompt, model, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS),
+                    timeout=self.timeouts[provider]
+                )
+            if not response or response == NO_RESPONSE:
+                raise ValueError("empty response")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.scheduler.record(target, time.perf_counter() - started, ok=False)
+            raise
+        self.scheduler.record(target, time.perf_counter() - started, ok=True)
+        return response
+
+    def _release_cancelled(self, target, task: asyncio.Task) -> None:
+        # A cancelled call (even one cancelled before it started) records no outcome,
+        # so its claim on the provider, possibly the half-open trial, is given back.
+        if task.cancelled():
+            self.scheduler.release(target)
+
+    async def astream(self, prompt: str, model: str, provider: str = OPENAI_PROVIDER) -> AsyncIterator[str]:
+        """
+        Stream the model output as it is generated.
+
+        The provider slot is held for the whole stream; timeouts[provider] bounds
+        the wait for each chunk, including the first. Errors end the stream.
+
+        :return: An async iterator of text chunks.
+        """
+        self._validate(model, provider)
+
+        async with self._semaphore(provider):
+            chunks = self._astream_provider(provider, prompt, model, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS)
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeouts[provider])
+                    except StopAsyncIteration:
+                        break
+                    if chunk:
+                        yield chunk
+            except asyncio.TimeoutError:
+                print(f"Inference stream timed out after {self.timeouts[provider]}s for {provider}/{model}")
+            except Exception as ex:
+                print(f"Error during inference stream: {ex}")
+            finally:
+                await chunks.aclose()
+
+    async def aclose(self) -> None:
+        """Close the async clients this router holds for the running event loop."""
+        with self._loop_lock:
+            clients = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if clients is not None:
+            await clients.aclose()
+
+    def _validate(self, model: str, provider: str) -> None:
+        if model not in SUPPORTED_MODELS:
+            raise ValueError(f"Unsupported model specified: {model}. Supported models: {', '.join(SUPPORTED_MODELS)}")
+
+        if provider not in SUPPORTED_PROVIDERS:
+            raise ValueError(f"Unsupported provider: {provider}. Supported providers: {', '.join(SUPPORTED_PROVIDERS)}")
+
+    def coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return how many sync and async calls were served by another caller's in-flight request."""
+        return {"sync": self.single_flight.stats(), "async": self.async_single_flight.stats()}
+
+    @staticmethod
+    def _flight_key(prompt: str, model: str, provider: str) -> str:
+        return ResponseCache.key(provider, model, DEFAULT_TEMPERATURE, prompt)
+
+    def _cached(self, prompt: str, model: str, provider: str):
+        """Return the cached response (or None) and the prompt embedding to hand back to _remember()."""
+        if self.response_cache is None:
+            return None, None
+        return self.response_cache.lookup(provider, model, DEFAULT_TEMPERATURE, prompt)
+
+    def _remember(self, prompt: str, model: str, provider: str, response: str, embedding=None) -> None:
+        # Empty strings and placeholders are failures, not answers worth replaying.
+        if self.response_cache is not None and response and response != NO_RESPONSE:
+            self.response_cache.put(provider, model, DEFAULT_TEMPERATURE, prompt, response, embedding)
+
+    # The semantic tier encodes prompts and the cache may write to SQLite, so async
+    # callers run both off the event loop.
+    async def _acached(self, prompt: str, model: str, provider: str):
+        if self.response_cache is None:
+            return None, None
+        return await asyncio.to_thread(self._cached, prompt, model, provider)
+
+    async def _aremember(self, prompt: str, model: str, provider: str, response: str, embedding=None) -> None:
+        if self.response_cache is not None:
+            await asyncio.to_thread(self._remember, prompt, model, provider, response, embedding)
+
+    def _clients(self) -> _LoopClients:
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            clients = self._loop_clients.get(loop)
+            if clients is None:
+                clients = self._loop_clients[loop] = _LoopClients(self.anthropic_key)
+            return clients
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        semaphores = self._clients().semaphores
+        if provider not in semaphores:
+            semaphores[provider] = asyncio.Semaphore(self.concurrency_limits[provider])
+        return semaphores[provider]
+
+    async def _acall(self, provider: str, prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+        if provider == OPENAI_PROVIDER:
+            response = await openai.ChatCompletion.acreate(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message["content"].strip()
+
+        if provider == ANTHROPIC_PROVIDER:
+            response = await self._clients().anthropic.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.content[0].text.strip() if response.content else NO_RESPONSE
+
+        response = await self._clients().http.post(
+            self.llama_url, json={"prompt": prompt, "temperature": temperature, "max_tokens": max_tokens}
+        )
+        return response.json().get("text", "")
+
+    async def _astream_provider(self, provider: str, prompt: str, model: str, temperature: float,
+                                max_tokens: int) -> AsyncIterator[str]:
+        if provider == OPENAI_PROVIDER:
+            response = await openai.ChatCompletion.acreate(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in response:
+                yield chunk.choices[0].delta.get("content", "")
+
+        elif provider == ANTHROPIC_PROVIDER:
+            async with self._clients().anthropic.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
+        else:
+            # The local server streams newline-delimited JSON objects with a "text" field.
+            async with self._clients().http.stream(
+                "POST", self.llama_url,
+                json={"prompt": prompt, "temperature": temperature, "max_tokens": max_tokens, "stream": True}
+            ) as response:
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        yield json.loads(line).get("text", "")
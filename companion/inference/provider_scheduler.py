@@ -0,0 +1,204 @@
+"""
+Module: provider_scheduler
+
+This module tracks per-provider latency and errors, trips circuit breakers and picks
+the order in which providers are tried, including when to hedge a slow request.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+Target = Tuple[str, str]  # (provider, model)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+DEFAULT_WINDOW = 100
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_MIN_HEDGE_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for
+    reset_timeout seconds. It then lets a single trial call through: success
+    closes the circuit, failure opens it again. A trial that ends without an
+    outcome (e.g. a cancelled call) is released so another call can take it.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def available(self) -> bool:
+        """Whether allow() would let a call through now; unlike allow(), changes nothing."""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN:
+            return self.clock() - self.opened_at >= self.reset_timeout
+        return not self.trial_in_flight
+
+    def allow(self) -> bool:
+        """Let a call through, claiming the trial slot when the circuit is not closed."""
+        if not self.available():
+            return False
+        if self.state != CIRCUIT_CLOSED:
+            self.state = CIRCUIT_HALF_OPEN
+            self.trial_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """Give back a trial slot whose call ended without a recorded outcome."""
+        self.trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = CIRCUIT_OPEN
+            self.opened_at = self.clock()
+
+
+class ProviderStats:
+    """Rolling window of successful-call latencies plus lifetime success and failure counts."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.outcomes.append(ok)
+        if ok:
+            self.successes += 1
+            self.latencies.append(latency)
+        else:
+            self.failures += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        return float(np.percentile(self.latencies, p)) if self.latencies else None
+
+    def error_rate(self) -> float:
+        return round(1 - sum(self.outcomes) / len(self.outcomes), 4) if self.outcomes else 0.0
+
+
+class ProviderScheduler:
+    """
+    Orders (provider, model) targets for a request and decides when to hedge.
+
+    The requested target is tried first when its circuit allows it. The other
+    targets follow, fastest rolling median latency first, and targets with open
+    circuits are skipped. When hedge_percentile is set, a second target is started
+    once the first has run longer than that percentile of its recent latencies.
+    No hedge is sent until min_hedge_samples latencies have been recorded.
+    """
+
+    def __init__(self, targets: Sequence[Target] = (), window: int = DEFAULT_WINDOW,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 hedge_percentile: Optional[float] = None, min_hedge_samples: int = DEFAULT_MIN_HEDGE_SAMPLES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.clock = clock
+        self.targets: List[Target] = []
+        self.stats: Dict[Target, ProviderStats] = {}
+        self.breakers: Dict[Target, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        for target in targets:
+            self._register(tuple(target))
+
+    def candidates(self, preferred: Target) -> List[Target]:
+        """
+        Return the targets to try for a request, in order, skipping open circuits.
+
+        Listing does not claim anything; call acquire() before each call is started.
+        """
+        preferred = tuple(preferred)
+        with self._lock:
+            self._register(preferred)
+            others = sorted(
+                (target for target in self.targets if target != preferred),
+                key=lambda target: self._median(target),
+            )
+            return [target for target in [preferred] + others if self.breakers[target].available()]
+
+    def acquire(self, target: Target) -> bool:
+        """Claim a call on target; False when its circuit rejects it (or its trial call is taken)."""
+        target = tuple(target)
+        with self._lock:
+            self._register(target)
+            return self.breakers[target].allow()
+
+    def release(self, target: Target) -> None:
+        """Return the claim of a call that ended without record() (e.g. it was cancelled)."""
+        with self._lock:
+            self.breakers[tuple(target)].release()
+
+    def hedge_delay(self, target: Target) -> Optional[float]:
+        """Seconds to wait on target before hedging, or None when hedging is off or data is thin."""
+        if self.hedge_percentile is None:
+            return None
+        with self._lock:
+            stats = self.stats.get(tuple(target))
+            if stats is None or len(stats.latencies) < self.min_hedge_samples:
+                return None
+            return stats.percentile(self.hedge_percentile)
+
+    def record(self, target: Target, latency: float, ok: bool) -> None:
+        target = tuple(target)
+        with self._lock:
+            self._register(target)
+            self.stats[target].record(latency, ok)
+            if ok:
+                self.breakers[target].record_success()
+            else:
+                self.breakers[target].record_failure()
+
+    def report(self) -> Dict[str, dict]:
+        """Return latency percentiles, error rate and circuit state per target."""
+        with self._lock:
+            return {
+                f"{provider}/{model}": {
+                    "p50_ms": _ms(self.stats[(provider, model)].percentile(50)),
+                    "p95_ms": _ms(self.stats[(provider, model)].percentile(95)),
+                    "error_rate": self.stats[(provider, model)].error_rate(),
+                    "successes": self.stats[(provider, model)].successes,
+                    "failures": self.stats[(provider, model)].failures,
+                    "circuit": self.breakers[(provider, model)].state,
+                }
+                for provider, model in self.targets
+            }
+
+    def _register(self, target: Target) -> None:
+        if target not in self.stats:
+            self.targets.append(target)
+            self.stats[target] = ProviderStats(self.window)
+            self.breakers[target] = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock)
+
+    def _median(self, target: Target) -> float:
+        median = self.stats[target].percentile(50)
+        return float("inf") if median is None else median
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
@@ -0,0 +1,225 @@
+"""
+Module: response_cache
+
+This module caches LLM responses by exact prompt and, optionally, by prompt similarity.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+from companion.memory import model_registry
+from companion.memory.model_registry import DEFAULT_MODEL_NAME
+from shared.token_estimator import tail_to_tokens
+
+DEFAULT_CACHE_CAPACITY = 1024
+DEFAULT_CACHE_TTL = 3600.0
+
+# Estimated tokens at the end of a prompt that the semantic tier embeds. Sentence models
+# truncate long inputs (MiniLM at 256 tokens), and composed prompts open with the persona
+# directive and end with the user's message, so the tail is what tells prompts apart.
+DEFAULT_SEMANTIC_TOKENS = 128
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    response TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    embedding BLOB
+)
+"""
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of model responses with a time-to-live.
+
+    The exact tier is keyed by a SHA-256 of (provider, model, temperature, prompt).
+    When semantic_threshold is set, a miss on the exact tier falls back to the
+    cached prompt with the highest cosine similarity for the same provider, model
+    and temperature, if it is at least the threshold. The last semantic_tokens of each
+    prompt are embedded with the model_registry sentence model. With a path, entries are written through to a
+    SQLite file and reloaded on start.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_CAPACITY, ttl: float = DEFAULT_CACHE_TTL,
+                 path: Optional[str] = None, semantic_threshold: Optional[float] = None,
+                 model_name: str = DEFAULT_MODEL_NAME, semantic_tokens: int = DEFAULT_SEMANTIC_TOKENS,
+                 clock: Callable[[], float] = time.time):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.path = path
+        self.semantic_threshold = semantic_threshold
+        self.model_name = model_name
+        self.semantic_tokens = semantic_tokens
+        self.clock = clock
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._entries = OrderedDict()  # key -> (scope, response, expires_at)
+        self._embeddings: Dict[str, np.ndarray] = {}  # key -> unit-length prompt embedding
+        self._lock = threading.RLock()
+        self.conn = None
+
+        if path:
+            self._load()
+
+    @staticmethod
+    def key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        return hashlib.sha256(f"{provider}|{model}|{temperature}|{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, provider: str, model: str, temperature: float, prompt: str) -> Optional[str]:
+        """Return a cached response for the prompt, or None."""
+        return self.lookup(provider, model, temperature, prompt)[0]
+
+    def lookup(self, provider: str, model: str, temperature: float,
+               prompt: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Return the cached response for the prompt (or None) and the prompt embedding
+        computed for the semantic tier (None when it was not needed).
+
+        Pass the embedding to put() when the response is stored, so a miss encodes the prompt once.
+        """
+        key = self.key(provider, model, temperature, prompt)
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1], None
+
+        embedding = None
+        if self.semantic_threshold is not None:
+            embedding = self._embed(prompt)
+            key = self._nearest(self._scope(provider, model, temperature), embedding)
+            if key is not None:
+                with self._lock:
+                    entry = self._live(key)
+                    if entry is not None:
+                        self.hits += 1
+                        self.semantic_hits += 1
+                        return entry[1], embedding
+
+        with self._lock:
+            self.misses += 1
+        return None, embedding
+
+    def put(self, provider: str, model: str, temperature: float, prompt: str, response: str,
+            embedding: Optional[np.ndarray] = None) -> None:
+        """
+        :param embedding: The prompt embedding returned by lookup(); computed here when omitted.
+        """
+        key = self.key(provider, model, temperature, prompt)
+        scope = self._scope(provider, model, temperature)
+        expires_at = self.clock() + self.ttl
+        if self.semantic_threshold is None:
+            embedding = None
+        elif embedding is None:
+            embedding = self._embed(prompt)
+
+        with self._lock:
+            self._entries[key] = (scope, response, expires_at)
+            self._entries.move_to_end(key)
+            if embedding is not None:
+                self._embeddings[key] = embedding
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, scope, response, expires_at, embedding) VALUES (?, ?, ?, ?, ?)",
+                    (key, scope, response, expires_at, None if embedding is None else embedding.tobytes()),
+                )
+            while len(self._entries) > self.capacity:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            if self.conn is not None:
+                self.conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._embeddings.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM responses")
+                self.conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _scope(provider: str, model: str, temperature: float) -> str:
+        return f"{provider}|{model}|{temperature}"
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= self.clock():
+            self._drop(key)
+            self.expirations += 1
+            if self.conn is not None:
+                self.conn.commit()
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key):
+        del self._entries[key]
+        self._embeddings.pop(key, None)
+        if self.conn is not None:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _nearest(self, scope: str, embedding: np.ndarray) -> Optional[str]:
+        with self._lock:
+            candidates = [key for key in self._embeddings if self._entries[key][0] == scope]
+            if not candidates:
+                return None
+            similarities = np.stack([self._embeddings[key] for key in candidates]) @ embedding
+        best = int(np.argmax(similarities))
+        return candidates[best] if similarities[best] >= self.semantic_threshold else None
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        text = tail_to_tokens(prompt, self.semantic_tokens)
+        vector = np.asarray(model_registry.get_model(self.model_name).encode([text], convert_to_numpy=True),
+                            dtype="float32").reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load(self):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(_SCHEMA)
+        self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (self.clock(),))
+        self.conn.commit()
+
+        rows = self.conn.execute("SELECT key, scope, response, expires_at, embedding FROM responses "
+                                 "ORDER BY expires_at").fetchall()
+        for key, scope, response, expires_at, embedding in rows[-self.capacity:]:
+            self._entries[key] = (scope, response, expires_at)
+            if embedding is not None:
+                self._embeddings[key] = np.frombuffer(embedding, dtype="float32")
+        for key, *_ in rows[:-self.capacity]:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self.conn.commit()
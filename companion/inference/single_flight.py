@@ -0,0 +1,100 @@
+"""
+Module: single_flight
+
+This module coalesces concurrent identical calls so they share one execution.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe call coalescing: while a call for a key is running, other callers
+    with the same key wait for it and receive its result (or its exception).
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self._in_flight: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.executions += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return _stats(self.calls, self.executions, len(self._in_flight))
+
+
+class AsyncSingleFlight:
+    """
+    Call coalescing for coroutines.
+
+    The shared call runs as its own task, so a waiter that is cancelled or times
+    out does not cancel the call for the others. Tasks belong to one event loop,
+    so callers on different loops (e.g. threads each running asyncio.run()) never
+    share a call.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self._in_flight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = (asyncio.get_running_loop(), key)
+        with self._lock:
+            self.calls += 1
+            task = self._in_flight.get(flight)
+            if task is None:
+                self.executions += 1
+                task = self._in_flight[flight] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(flight))
+        return await asyncio.shield(task)
+
+    def _forget(self, flight) -> None:
+        with self._lock:
+            self._in_flight.pop(flight, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return _stats(self.calls, self.executions, len(self._in_flight))
+
+
+def _stats(calls: int, executions: int, in_flight: int) -> Dict[str, int]:
+    return {"calls": calls, "executions": executions, "coalesced": calls - executions, "in_flight": in_flight}
@@ -0,0 +1,188 @@
+# embedding_cache.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Two-tier cache for sentence embeddings
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+from companion.memory.model_registry import DEFAULT_MODEL_NAME
+
+
+class EmbeddingCache:
+    """
+    Caches embeddings by a hash of the normalized text.
+
+    The first tier is a bounded in-memory LRU. The optional second tier lives on
+    disk as a memory-mapped float32 matrix (<path>.f32) plus an append-only list
+    of text hashes (<path>.keys) giving each row's key, so it survives restarts.
+    Only one process should write to a given disk tier at a time.
+
+    A cache holds vectors of a single model. The disk tier records that model's
+    name in <path>.model and is discarded when opened for a different model.
+    """
+
+    def __init__(self, dim, capacity=4096, path=None, model_name=DEFAULT_MODEL_NAME):
+        self.dim = dim
+        self.capacity = capacity
+        self.path = path
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._lru = OrderedDict()  # key -> vector
+        self._lock = threading.Lock()
+        self._disk_rows = {}       # key -> row in the .f32 file
+        self._disk_view = None
+        self._disk_files = None
+
+        if path:
+            self._load_disk_tier()
+
+    @staticmethod
+    def key(text: str) -> str:
+        """Hash of the text after Unicode NFC normalization and whitespace collapsing."""
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, text: str):
+        """Return the cached vector for text, or None."""
+        with self._lock:
+            vector = self._lookup(self.key(text))
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return vector
+
+    def put(self, text: str, vector) -> None:
+        with self._lock:
+            self._store({self.key(text): np.asarray(vector, dtype="float32").reshape(self.dim)})
+
+    def encode(self, texts, encode_fn) -> np.ndarray:
+        """
+        Return embeddings for texts, encoding only the cache misses in one batch.
+
+        :param texts: List of strings.
+        :param encode_fn: Callable mapping a list of strings to an (N, dim) array.
+        :return: (len(texts), dim) float32 matrix.
+        """
+        keys = [self.key(text) for text in texts]
+        vectors = np.empty((len(texts), self.dim), dtype="float32")
+        missing = {}  # key -> (first text, rows waiting for it)
+
+        with self._lock:
+            for row, key in enumerate(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    self.misses += 1
+                    missing.setdefault(key, (texts[row], []))[1].append(row)
+                else:
+                    self.hits += 1
+                    vectors[row] = vector
+
+        if missing:
+            encoded = np.asarray(encode_fn([text for text, _ in missing.values()]), dtype="float32")
+            encoded = encoded.reshape(len(missing), self.dim)
+            for vector, (_, rows) in zip(encoded, missing.values()):
+                vectors[rows] = vector
+            with self._lock:
+                self._store(dict(zip(missing.keys(), encoded)))
+
+        return vectors
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "disk_entries": len(self._disk_rows),
+        }
+
+    def close(self) -> None:
+        if self._disk_files:
+            for handle in self._disk_files:
+                handle.close()
+            self._disk_files = None
+
+    def _lookup(self, key):
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            return vector
+
+        row = self._disk_rows.get(key)
+        if row is None:
+            return None
+        if self._disk_view is None or row >= len(self._disk_view):
+            self._remap()
+        vector = np.array(self._disk_view[row])
+        self.disk_hits += 1
+        self._remember(key, vector)
+        return vector
+
+    def _store(self, entries):
+        for key, vector in entries.items():
+            self._remember(key, vector)
+
+        if self.path:
+            new = [(key, vector) for key, vector in entries.items() if key not in self._disk_rows]
+            if new:
+                vectors_file, keys_file = self._disk_files
+                # Vectors are written before keys so a torn write never maps a key to a missing row.
+                vectors_file.write(np.stack([vector for _, vector in new]).astype("float32").tobytes())
+                vectors_file.flush()
+                keys_file.write("".join(key + "\n" for key, _ in new))
+                keys_file.flush()
+                for key, _ in new:
+                    self._disk_rows[key] = len(self._disk_rows)
+
+    def _remember(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def _load_disk_tier(self):
+        vectors_path, keys_path, model_path = self.path + ".f32", self.path + ".keys", self.path + ".model"
+        stored_model = None
+        if os.path.exists(model_path):
+            with open(model_path, "r", encoding="utf-8") as f:
+                stored_model = f.read().strip()
+        if stored_model != self.model_name:
+            if os.path.exists(keys_path) and stored_model is not None:
+                print(f"⚠️ Embedding cache {self.path} holds vectors of {stored_model}, not {self.model_name}; discarding it.")
+            # A tier without a recorded model cannot be trusted either, so it starts over.
+            for stale_path in (vectors_path, keys_path):
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+            with open(model_path, "w", encoding="utf-8") as f:
+                f.write(self.model_name + "\n")
+
+        keys = []
+        if os.path.exists(keys_path):
+            with open(keys_path, "r", encoding="utf-8") as f:
+                keys = [line.strip() for line in f if len(line.strip()) == 40]
+        size = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+        keys = keys[:size // (self.dim * 4)]
+
+        # Drop any partially written tail so new rows line up with their keys.
+        if size != len(keys) * self.dim * 4 or not os.path.exists(keys_path):
+            with open(vectors_path, "ab") as f:
+                f.truncate(len(keys) * self.dim * 4)
+            with open(keys_path, "w", encoding="utf-8") as f:
+                f.write("".join(key + "\n" for key in keys))
+
+        self._disk_rows = {key: row for row, key in enumerate(keys)}
+        self._disk_files = (open(vectors_path, "ab"), open(keys_path, "a", encoding="utf-8"))
+
+    def _remap(self):
+        rows = os.path.getsize(self.path + ".f32") // (self.dim * 4)
+        self._disk_view = np.memmap(self.path + ".f32", dtype="float32", mode="r", shape=(rows, self.dim))
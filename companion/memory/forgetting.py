@@ -0,0 +1,87 @@
+# forgetting.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Policies choosing which long term memories to forget
+
+from datetime import datetime, timezone
+
+
+class ForgettingPolicy:
+    """
+    Chooses memories to forget from their meta memory entries.
+
+    Subclasses implement select(); MemoryManager.forget() passes it every
+    (memory_id, metadata) pair, with the created_at, last_accessed and
+    usage_count fields recorded by MetaMemory, and deletes what it returns.
+    """
+
+    def select(self, entries, now):
+        """
+        :param entries: List of (memory_id, metadata) pairs.
+        :param now: Timezone-aware datetime to measure ages against.
+        :return: The memory ids to forget.
+        """
+        raise NotImplementedError
+
+
+class TTLPolicy(ForgettingPolicy):
+    """Forget memories older than ttl seconds, measured from created_at."""
+
+    def __init__(self, ttl, field="created_at"):
+        self.ttl = ttl
+        self.field = field
+
+    def select(self, entries, now):
+        return [memory_id for memory_id, data in entries if _age(data, self.field, now) > self.ttl]
+
+
+class IdlePolicy(ForgettingPolicy):
+    """Forget memories used fewer than min_usage times and not accessed for max_idle seconds."""
+
+    def __init__(self, max_idle, min_usage=2):
+        self.max_idle = max_idle
+        self.min_usage = min_usage
+
+    def select(self, entries, now):
+        return [
+            memory_id for memory_id, data in entries
+            if data.get("usage_count", 0) < self.min_usage and _age(data, "last_accessed", now) > self.max_idle
+        ]
+
+
+class CapacityPolicy(ForgettingPolicy):
+    """Keep at most max_memories, forgetting the least used first and the least recently accessed among equals."""
+
+    def __init__(self, max_memories):
+        self.max_memories = max_memories
+
+    def select(self, entries, now):
+        excess = len(entries) - self.max_memories
+        if excess <= 0:
+            return []
+        ranked = sorted(entries, key=lambda entry: (entry[1].get("usage_count", 0), entry[1].get("last_accessed", "")))
+        return [memory_id for memory_id, _ in ranked[:excess]]
+
+
+class AnyPolicy(ForgettingPolicy):
+    """Forget what any of the given policies selects."""
+
+    def __init__(self, *policies):
+        self.policies = policies
+
+    def select(self, entries, now):
+        selected = {}
+        for policy in self.policies:
+            selected.update(dict.fromkeys(policy.select(entries, now)))
+        return list(selected)
+
+
+def _age(data, field, now):
+    """Seconds since the ISO timestamp in data[field]; entries without one never age."""
+    stamp = data.get(field)
+    if not stamp:
+        return 0.0
+    moment = datetime.fromisoformat(stamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (now - moment).total_seconds()
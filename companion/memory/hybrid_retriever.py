@@ -0,0 +1,90 @@
+# hybrid_retriever.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Lexical + vector retrieval over long term memory
+
+import threading
+from companion.memory.lexical_index import LexicalIndex, tokenize
+
+RRF_K = 60  # reciprocal rank fusion damping constant
+DEFAULT_CANDIDATES = 20  # results taken from each retriever before fusion
+
+# A query term this rare (BM25 IDF; about 1 in 50 memories or fewer) marks a
+# query that exact matching answers well enough to skip the encoder.
+DEFAULT_FAST_PATH_IDF = 4.0
+
+
+class HybridRetriever:
+    """
+    Fuses BM25 results from a LexicalIndex with vector results from LongTermMemory.
+
+    The two rankings are combined with reciprocal rank fusion. When the query
+    contains a term with an IDF of at least fast_path_idf and the lexical index
+    alone returns enough hits, those are used directly and the query is never
+    embedded. The lexical index is filled from the text store on first use and
+    caught up with new memories on every search.
+    """
+
+    def __init__(self, long_term, lexical_index=None, candidates=DEFAULT_CANDIDATES,
+                 fast_path_idf=DEFAULT_FAST_PATH_IDF, rrf_k=RRF_K):
+        """
+        :param fast_path_idf: Minimum IDF of a query term for the lexical-only path (None disables it).
+        """
+        self.long_term = long_term
+        self.lexical_index = lexical_index or LexicalIndex()
+        self.candidates = candidates
+        self.fast_path_idf = fast_path_idf
+        self.rrf_k = rrf_k
+        self.searches = 0
+        self.lexical_only = 0
+        self._sync_lock = threading.Lock()
+
+    def search(self, query_text, top_k=5):
+        """Return up to top_k memory texts, best first."""
+        self.sync()
+        pool = max(top_k, self.candidates)
+        terms = tokenize(query_text)
+        texts = self.long_term.texts
+        lexical = [memory_id for memory_id, _ in self.lexical_index.search(terms, pool) if memory_id in texts]
+        self.searches += 1
+
+        if (self.fast_path_idf is not None and len(lexical) >= top_k
+                and self.lexical_index.max_idf(terms) >= self.fast_path_idf):
+            self.lexical_only += 1
+            return [text for text in texts.get_many(lexical[:top_k]) if text is not None]
+
+        scores = {}
+        for ranking in (lexical, self.long_term.search_ids(query_text, pool)):
+            for rank, memory_id in enumerate(ranking):
+                scores[memory_id] = scores.get(memory_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        fused = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        return [text for text in texts.get_many(fused) if text is not None]
+
+    def sync(self):
+        """Index memories added to long-term memory since the last call."""
+        with self._sync_lock:
+            index = self.lexical_index
+            next_id = self.long_term.next_id
+            if index.watermark > next_id:  # the long-term store was reset underneath the index
+                index.reset()
+            for memory_id, memory_text in self.long_term.texts.iter_texts(index.watermark, next_id):
+                index.add(memory_id, memory_text)
+            index.watermark = next_id
+
+    def remove(self, texts):
+        """
+        Drop deleted memories from the lexical index.
+
+        :param texts: memory_id -> text of each deleted memory.
+        """
+        for memory_id, memory_text in texts.items():
+            if memory_id < self.lexical_index.watermark and memory_text is not None:
+                self.lexical_index.remove(memory_id, memory_text)
+
+    def stats(self):
+        return {
+            "searches": self.searches,
+            "lexical_only": self.lexical_only,
+            "indexed": len(self.lexical_index),
+            "terms": len(self.lexical_index.postings),
+        }
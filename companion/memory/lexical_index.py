@@ -0,0 +1,137 @@
+# lexical_index.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Incremental BM25 inverted index over long term memory texts
+
+import math
+import re
+import threading
+from collections import Counter
+import numpy as np
+
+LEXICAL_TOKEN_PATTERN = re.compile(r"\w+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query terms found in more than this fraction of memories are skipped when the
+# query has rarer terms; they barely move BM25 scores but have the longest postings.
+MAX_DF_RATIO = 0.5
+
+
+def tokenize(text):
+    return LEXICAL_TOKEN_PATTERN.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    Inverted index of term -> {memory_id: term frequency}, scored with Okapi BM25.
+
+    Memories are added and removed one text at a time, so the index follows the
+    long-term store without rebuilds. `watermark` is the id of the first long-term
+    memory not yet indexed, as for ThemeCounter. Queries score each posting list
+    as a numpy array, cached per term until that term's postings change.
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {memory_id: term frequency}
+        self.doc_lengths = {}  # memory_id -> number of tokens
+        self.total_length = 0
+        self.watermark = 0
+        self._arrays = {}  # term -> (memory ids, term frequencies) of its current postings
+        self._lengths = np.zeros(0, dtype="float32")  # doc_lengths, indexed by memory_id
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, memory_id, text):
+        terms = Counter(tokenize(text))
+        with self._lock:
+            if memory_id in self.doc_lengths:
+                return
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, {})[memory_id] = frequency
+                self._arrays.pop(term, None)
+            length = sum(terms.values())
+            self.doc_lengths[memory_id] = length
+            self.total_length += length
+            if memory_id >= len(self._lengths):
+                self._lengths = np.resize(self._lengths, max(memory_id + 1, 2 * len(self._lengths)))
+            self._lengths[memory_id] = length
+
+    def remove(self, memory_id, text):
+        with self._lock:
+            length = self.doc_lengths.pop(memory_id, None)
+            if length is None:
+                return
+            self.total_length -= length
+            for term in set(tokenize(text)):
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(memory_id, None)
+                    self._arrays.pop(term, None)
+                    if not posting:
+                        del self.postings[term]
+
+    def reset(self):
+        with self._lock:
+            self.postings = {}
+            self.doc_lengths = {}
+            self.total_length = 0
+            self.watermark = 0
+            self._arrays = {}
+            self._lengths = np.zeros(0, dtype="float32")
+
+    def idf(self, term):
+        """BM25 inverse document frequency (the non-negative variant)."""
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_lengths) - df + 0.5) / (df + 0.5))
+
+    def max_idf(self, terms):
+        """Highest IDF among the query terms that occur in the index, or 0.0."""
+        with self._lock:
+            return max((self.idf(term) for term in set(terms) if term in self.postings), default=0.0)
+
+    def search(self, terms, top_k=10):
+        """
+        Score memories against tokenized query terms.
+
+        :return: Up to top_k (memory_id, score) pairs, best first.
+        """
+        with self._lock:
+            count = len(self.doc_lengths)
+            if not count:
+                return []
+            matched = [term for term in dict.fromkeys(terms) if term in self.postings]
+            rare = [term for term in matched if len(self.postings[term]) <= MAX_DF_RATIO * count]
+            if not matched:
+                return []
+            average_length = self.total_length / count
+
+            ids, scores = [], []
+            for term in rare or matched:
+                term_ids, frequencies = self._postings_array(term)
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[term_ids] / average_length)
+                ids.append(term_ids)
+                scores.append(self.idf(term) * frequencies * (self.k1 + 1) / (frequencies + norm))
+
+        ids, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(scores))
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            ids, scores = ids[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def _postings_array(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self.postings[term]
+            arrays = self._arrays[term] = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float64, count=len(posting)),
+            )
+        return arrays
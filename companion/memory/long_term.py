@@ -4,51 +4,350 @@
 # Purpose: Long term memory
 
 import os
+import threading
 import faiss
 import numpy as np
 import pickle
-from sentence_transformers import SentenceTransformer
 from shared.path_utils import resolve_memory_path
+from companion.memory.write_ahead_log import WriteAheadLog, OP_ADD, OP_DELETE
+from companion.memory.embedding_cache import EmbeddingCache
+from companion.memory.text_store import TextStore
+from companion.memory import model_registry
+from companion.memory.model_registry import DEFAULT_MODEL_NAME
+from companion.memory import vector_index
+from companion.memory.vector_index import INDEX_FLAT, DEFAULT_NPROBE, DEFAULT_EF_SEARCH
+
+PERSIST_SNAPSHOT = "snapshot"  # rewrite the index and flush texts on every add
+PERSIST_WAL = "wal"            # append to a write-ahead log, checkpoint on a threshold
+
+TEXTS_SUFFIX = ".texts"  # text store files sit next to the index: faiss.index.texts(.idx)
+LEGACY_MEM_MAP_SUFFIX = ".mem"  # pickled (mem_map, next_id) written by earlier versions
+
+# Deleted memories stay in the index, skipped at search time, until they make up
+# this fraction of it; compact() then rebuilds the index and text store without them.
+DEFAULT_COMPACT_RATIO = 0.25
 
 class LongTermMemory:
-    def __init__(self, path=None, dim=384):
+    def __init__(self, path=None, dim=384, persistence=PERSIST_SNAPSHOT, checkpoint_every=10000,
+                 background_checkpoint=False, sync=True, index_type=INDEX_FLAT, promotion_thresholds=None,
+                 nprobe=DEFAULT_NPROBE, ef_search=DEFAULT_EF_SEARCH, embedding_cache=None,
+                 model_name=DEFAULT_MODEL_NAME, fast_start=False, compact_ratio=DEFAULT_COMPACT_RATIO):
+        """
+        :param fast_start: Memory-map the saved index read-only instead of reading it into RAM.
+                           The index is copied into RAM on the first write. Worker processes
+                           that fast-start from the same files share the mapped index pages.
+                           Memory texts are always read on demand from the TextStore.
+        :param compact_ratio: Compact once deleted memories reach this fraction of the index
+                              (None: only when compact() is called).
+        """
+        if persistence not in (PERSIST_SNAPSHOT, PERSIST_WAL):
+            raise ValueError(f"Unsupported persistence mode: {persistence}. Supported modes: {PERSIST_SNAPSHOT}, {PERSIST_WAL}")
+        vector_index.target_index_type(index_type, 0, promotion_thresholds)  # validates index_type
+
         self.path = path or resolve_memory_path("faiss.index")
         self.dim = dim
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.index = faiss.IndexFlatL2(dim)
-        self.mem_map = {}  # maps index IDs to memory strings
+        self.model_name = model_name  # resolved through the shared registry on first encode
+        if embedding_cache is not None and embedding_cache.model_name != model_name:
+            raise ValueError(f"Embedding cache holds {embedding_cache.model_name} vectors, but this memory encodes with {model_name}")
+        self.embedding_cache = embedding_cache or EmbeddingCache(dim, model_name=model_name)
+        self.index = vector_index.with_ids(faiss.IndexFlatL2(dim))
+        self.texts = TextStore(self.path + TEXTS_SUFFIX)  # maps index IDs to memory strings
         self.next_id = 0
+        self.fast_start = fast_start
+        self._index_mapped = False  # True while self.index is a read-only mapping of self.path
+        self.deleted = set()  # ids deleted from the text store whose vectors await compaction
+        self.compact_ratio = compact_ratio
+        self._exclusion = None  # cached selector skipping self.deleted, shared by searches
 
-        if os.path.exists(self.path):
+        self.index_type = index_type
+        self.promotion_thresholds = promotion_thresholds
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+
+        self.persistence = persistence
+        self.checkpoint_every = checkpoint_every
+        self.background_checkpoint = background_checkpoint
+        self.wal = WriteAheadLog(self.path + ".wal", dim, sync=sync) if persistence == PERSIST_WAL else None
+        self._lock = threading.RLock()
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_thread = None
+
+        if os.path.exists(self.path) or (self.wal and self.wal.segments()):
             self.load()
             print("✅ MemoryCore hydrated from disk.")
         else:
             print("⚠️ No saved memory found. Starting fresh.")
+        self._maybe_promote()
     
+    @property
+    def model(self):
+        return model_registry.get_model(self.model_name)
+
+    @property
+    def mem_map(self):
+        """Read-only id -> text mapping, kept for callers of the former dict attribute."""
+        return self.texts
+
     def add(self, memory_text):
-        vector = self._embed(memory_text)
-        vector = vector.reshape(1, -1)  # Ensure shape is (1, dim)
-        print(vector)
-        self.index.add(vector)
-        self.mem_map[self.next_id] = memory_text
-        self.next_id += 1
-        self.save()
+        return self.add_many([memory_text])[0]
+
+    def add_many(self, texts):
+        """
+        Add a batch of memories with one encode call, one index insert and one save.
+
+        :param texts: Memory strings to store, in insertion order.
+        :return: The ids assigned to the stored memories.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        vectors = self._embed_many(texts)  # Shape is (N, dim)
+
+        with self._lock:
+            ids = list(range(self.next_id, self.next_id + len(texts)))
+            if self.wal:
+                self.wal.append((OP_ADD, memory_id, vector, memory_text)
+                                for memory_id, vector, memory_text in zip(ids, vectors, texts))
+
+            self._ensure_writable()
+            self.index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+            self.texts.append(texts)
+            self.next_id += len(texts)
+            promoted = self._maybe_promote()
+            needs_checkpoint = self.wal is not None and (promoted or self.wal.pending >= self.checkpoint_every)
+
+        if not self.wal:
+            self.save()
+        elif needs_checkpoint:
+            self._schedule_checkpoint()
+        return ids
 
     def load(self):
-        self.index = faiss.read_index(self.path)
-        with open(self.path + ".mem", "rb") as f:
-            self.mem_map, self.next_id = pickle.load(f)
+        if os.path.exists(self.path):
+            self.index = vector_index.read_index(self.path, mmap=self.fast_start)
+            self._index_mapped = self.fast_start
+            if not isinstance(self.index, faiss.IndexIDMap2):
+                self.index = vector_index.with_ids(self.index)  # positional index from an earlier version
+                self._index_mapped = False
+                print("🔁 Long-term index migrated to stable memory ids.")
+            vector_index.configure_search(self.index, self.nprobe, self.ef_search)
+        self.texts = TextStore(self.path + TEXTS_SUFFIX)
+        self._migrate_mem_map()
+
+        # The index file is replaced before texts are flushed, so live texts past the
+        # last indexed id lost their vectors; deleted rows there were compacted away.
+        stored_ids = vector_index.stored_ids(self.index)
+        index_end = int(stored_ids.max()) + 1 if len(stored_ids) else 0
+        for memory_id in range(index_end, self.texts.next_id):
+            if memory_id in self.texts:
+                self.texts.truncate(memory_id)
+                break
+        self.next_id = max(index_end, self.texts.next_id)
+        self.deleted = set(np.intersect1d(self.texts.dead_ids(), stored_ids).tolist())
+        self._exclusion = None
+
+        if self.wal:
+            self._replay_wal()
+        if self.texts.next_id < self.next_id:
+            print(f"⚠️ {self.next_id - self.texts.next_id} long-term memories have no stored text.")
+            self._store_text(self.next_id - 1, "")
+
+    def _replay_wal(self):
+        for op, memory_id, vector, memory_text in self.wal.replay():
+            if op == OP_DELETE:
+                self._tombstone([memory_id])
+                continue
+            if memory_id >= self.next_id:
+                self._ensure_writable()
+                self.index.add_with_ids(vector.reshape(1, -1), np.array([memory_id], dtype="int64"))
+                self.next_id = memory_id + 1
+            self._store_text(memory_id, memory_text)
+
+    def _store_text(self, memory_id, memory_text):
+        """Store a text under memory_id if it has none yet, padding any gap before it."""
+        missing = memory_id - self.texts.next_id
+        if missing >= 0:
+            self.texts.append([""] * missing + [memory_text])
+
+    def delete(self, memory_ids):
+        """
+        Delete memories by id. They stop appearing in search results immediately; their
+        vectors and texts are reclaimed by the next compaction.
+
+        :param memory_ids: Ids returned by add_many(); unknown or already deleted ids are ignored.
+        :return: The ids that were deleted.
+        """
+        with self._lock:
+            memory_ids = [int(memory_id) for memory_id in dict.fromkeys(memory_ids) if memory_id in self.texts]
+            if not memory_ids:
+                return []
+            if self.wal:
+                self.wal.append((OP_DELETE, memory_id, None, "") for memory_id in memory_ids)
+            removed = self._tombstone(memory_ids)
+            needs_compaction = (self.compact_ratio is not None
+                                and len(self.deleted) >= self.compact_ratio * self.index.ntotal)
+            needs_checkpoint = self.wal is not None and self.wal.pending >= self.checkpoint_every
+
+        if needs_compaction:
+            self.compact()
+        elif not self.wal:
+            self.save()
+        elif needs_checkpoint:
+            self._schedule_checkpoint()
+        return removed
+
+    def compact(self):
+        """
+        Rebuild the index without deleted memories, persist it and rewrite the text
+        store without their texts. Ids of the remaining memories do not change.
+
+        :return: The number of vectors removed from the index.
+        """
+        with self._lock:
+            removed = len(self.deleted)
+            if removed:
+                # Tombstones reach disk before the rebuilt index does, so a crash
+                # between the two writes cannot bring deleted texts back on reload.
+                self.texts.flush(upto=self.texts.persisted)
+                target = vector_index.target_index_type(self.index_type, self.index.ntotal - removed,
+                                                        self.promotion_thresholds)
+                self.index = vector_index.rebuild_index(self.index, target, self.nprobe, self.ef_search,
+                                                        exclude_ids=self.deleted)
+                self._index_mapped = False
+                self.deleted = set()
+                self._exclusion = None
+
+        self.save()
+        reclaimed = self.texts.compact()
+        print(f"🧹 Long-term memory compacted: {removed} vectors and {reclaimed} text bytes reclaimed.")
+        return removed
+
+    def _tombstone(self, memory_ids):
+        removed = self.texts.discard(memory_ids)
+        if removed:
+            self.deleted.update(removed)
+            self._exclusion = None
+        return removed
+
+    def _migrate_mem_map(self):
+        """Move texts from a pickled mem_map left by an earlier version into the text store."""
+        legacy_path = self.path + LEGACY_MEM_MAP_SUFFIX
+        if not os.path.exists(legacy_path):
+            return
+        if len(self.texts) == 0:
+            with open(legacy_path, "rb") as f:
+                mem_map, next_id = pickle.load(f)
+            self.texts.append(mem_map.get(memory_id, "") for memory_id in range(next_id))
+            self.texts.flush()
+            print(f"🔁 Migrated {next_id} memory texts to the text store.")
+        os.remove(legacy_path)
+
+    def _ensure_writable(self):
+        """Replace a memory-mapped index with an in-memory copy before its first modification."""
+        if self._index_mapped:
+            self.index = vector_index.owned_copy(self.index)
+            vector_index.configure_search(self.index, self.nprobe, self.ef_search)
+            self._index_mapped = False
+
+    def reindex(self, index_type):
+        """
+        Rebuild the index under a different backend, training it on the stored vectors.
+
+        :param index_type: One of the concrete types in companion.memory.vector_index.
+        """
+        with self._lock:
+            self.index = vector_index.rebuild_index(self.index, index_type, self.nprobe, self.ef_search)
+            self._index_mapped = False
+            self._exclusion = None
+            print(f"🔁 Long-term index rebuilt as {index_type} ({self.index.ntotal} memories).")
+
+    def _maybe_promote(self):
+        """Switch to the configured backend once the corpus is large enough; returns True if rebuilt."""
+        target = vector_index.target_index_type(self.index_type, self.index.ntotal, self.promotion_thresholds)
+        if target == vector_index.index_type_of(self.index):
+            return False
+        self.reindex(target)
+        return True
 
     def search(self, query_text, top_k=3):
-        vector = self.model.encode([query_text])
-        D, I = self.index.search(vector, top_k)
-        results = [self.mem_map.get(i, None) for i in I[0] if i in self.mem_map]
-        return results
+        return [text for text in self.texts.get_many(self.search_ids(query_text, top_k)) if text is not None]
+
+    def search_ids(self, query_text, top_k=3):
+        """Return the ids of the top_k nearest live memories, nearest first."""
+        vector = self._embed_many([query_text])
+        with self._lock:
+            if self._exclusion is None and self.deleted:
+                self._exclusion = vector_index.exclusion_selector(self.deleted)
+            index = self.index
+            params = vector_index.search_params(index, self._exclusion, self.nprobe, self.ef_search)
+        D, I = index.search(vector, top_k, params=params) if params is not None else index.search(vector, top_k)
+        return [int(memory_id) for memory_id in I[0] if memory_id >= 0]
 
     def _embed(self, text: str):
-        return self.model.encode(text, convert_to_numpy=True)
+        return self._embed_many([text])[0]
+
+    def _embed_many(self, texts):
+        return self.embedding_cache.encode(texts, self._encode)
+
+    def _encode(self, texts):
+        vectors = self.model.encode(texts, convert_to_numpy=True)
+        return np.ascontiguousarray(vectors, dtype="float32").reshape(len(texts), self.dim)
 
     def save(self):
-        faiss.write_index(self.index, self.path)
-        with open(self.path + ".mem", "wb") as f:
-            pickle.dump((self.mem_map, self.next_id), f)
+        if self.wal:
+            self.checkpoint()
+            return
+
+        # Written atomically: other processes may have the current file memory-mapped.
+        with self._lock:
+            index_bytes = faiss.serialize_index(self.index)
+            next_id = self.next_id
+        self._write_atomic(self.path, index_bytes.tobytes())
+        self.texts.flush(next_id)
+
+    def checkpoint(self):
+        """
+        Compact the write-ahead log into the FAISS index and text store files.
+
+        The index is captured and the log rotated under the lock; the index file
+        is then written atomically (temp file + rename), texts up to the captured
+        id are appended to the text store and the sealed log segments deleted,
+        so a crash at any point leaves a loadable state.
+        """
+        with self._checkpoint_lock:
+            with self._lock:
+                index_bytes = faiss.serialize_index(self.index)
+                next_id = self.next_id
+                sealed = self.wal.rotate() if self.wal else None
+
+            self._write_atomic(self.path, index_bytes.tobytes())
+            self.texts.flush(next_id)
+
+            if sealed is not None:
+                self.wal.drop_segments(sealed)
+
+    def close(self):
+        """Wait for a running background checkpoint and release the log handle."""
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+        if self.wal:
+            self.wal.close()
+
+    def _schedule_checkpoint(self):
+        if not self.background_checkpoint:
+            self.checkpoint()
+            return
+        if self._checkpoint_thread is not None and self._checkpoint_thread.is_alive():
+            return
+        self._checkpoint_thread = threading.Thread(target=self.checkpoint, name="ltm-checkpoint", daemon=True)
+        self._checkpoint_thread.start()
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -3,54 +3,211 @@
 # Author: Andy Widjaja
 # Purpose: Memory manager
 
-import re
-from collections import Counter
-from typing import List
+import os
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
 from companion.memory.short_term import ShortTermMemory
-from companion.memory.long_term import LongTermMemory
+from companion.memory.long_term import LongTermMemory, PERSIST_SNAPSHOT
 from companion.memory.meta_memory import MetaMemory
+from companion.memory.sqlite_meta_memory import SQLiteMetaMemory
+from companion.memory.vector_index import INDEX_FLAT
+from companion.memory.model_registry import DEFAULT_MODEL_NAME
+from companion.memory.theme_counter import ThemeCounter
+from companion.memory.hybrid_retriever import HybridRetriever
 
-class MemoryManager:
-    def __init__(self, dim=384, short_term_limit=10, enable_meta=True):
-        self.short_term = ShortTermMemory(max_length=short_term_limit)
-        self.long_term = LongTermMemory(dim=dim)
-        self.meta_memory = MetaMemory() if enable_meta else None
+META_BACKEND_JSON = "json"
+META_BACKEND_SQLITE = "sqlite"
+
+RETRIEVAL_VECTOR = "vector"  # dense vector search only
+RETRIEVAL_HYBRID = "hybrid"  # BM25 and vector results fused, lexical-only for rare-term queries
+
+# Per-memory metadata accepted by add() and add_many().
+METADATA_KEYS = ("source", "emotion", "label", "mirror_id")
 
-    def add(self, memory_text, *, source="system", emotion=None, label=None):
+class MemoryManager:
+    def __init__(self, dim=384, short_term_limit=10, enable_meta=True, persistence=PERSIST_SNAPSHOT,
+                 index_type=INDEX_FLAT, promotion_thresholds=None, embedding_cache=None,
+                 model_name=DEFAULT_MODEL_NAME, meta_backend=META_BACKEND_JSON, theme_whitelist=None,
+                 memory_dir=None, fast_start=False, forgetting_policy=None, forget_every=None,
+                 retrieval=RETRIEVAL_VECTOR):
+        """
+        :param memory_dir: Directory holding every layer's files (default: the project memory_store/).
+        :param fast_start: Memory-map the long-term index and load its texts on first use
+                           (see LongTermMemory).
+        :param forgetting_policy: A companion.memory.forgetting policy applied by forget().
+                                  Policies read meta memory, so they need enable_meta.
+        :param forget_every: Run forget() after this many added memories (default: only when called).
+        :param retrieval: How search() ranks long-term memories: RETRIEVAL_VECTOR or RETRIEVAL_HYBRID.
+        """
+        if retrieval not in (RETRIEVAL_VECTOR, RETRIEVAL_HYBRID):
+            raise ValueError(f"Unsupported retrieval mode: {retrieval}. Supported modes: {RETRIEVAL_VECTOR}, {RETRIEVAL_HYBRID}")
+        path = (lambda name: os.path.join(memory_dir, name)) if memory_dir else (lambda name: None)
+        self.short_term = ShortTermMemory(path=path("short_term_mem.json"), max_length=short_term_limit)
+        self.long_term = LongTermMemory(path=path("faiss.index"), dim=dim, persistence=persistence,
+                                        index_type=index_type, promotion_thresholds=promotion_thresholds,
+                                        embedding_cache=embedding_cache, model_name=model_name,
+                                        fast_start=fast_start)
+        self.meta_memory = self._create_meta_memory(meta_backend, memory_dir) if enable_meta else None
+        self.theme_counter = ThemeCounter(theme_whitelist, path=self.long_term.path + ".themes.json")
+        self._theme_lock = threading.Lock()  # concurrent composes catch the counter up once
+        self.theme_counter.load()
+        self._sync_theme_counter()
+        self.retrieval = retrieval
+        self.retriever = HybridRetriever(self.long_term)
+        self.forgetting_policy = forgetting_policy
+        self.forget_every = forget_every
+        self._added_since_forget = 0
+
+    def add(self, memory_text, *, source="system", emotion=None, label=None, mirror_id=None):
         """Adds memory to all active layers."""
-        self.short_term.add(memory_text)
-        self.long_term.add(memory_text)
+        memory_id = self.long_term.add(memory_text)
+        self.short_term.add(memory_text, memory_id)
+        self._sync_theme_counter()
 
-        if self.meta_memory:
+        if self.meta_memory is not None:
             self.meta_memory.record(
-                memory_id=self.long_term.next_id - 1,
+                memory_id=memory_id,
                 content=memory_text,
                 emotion=emotion,
                 source=source,
-                label=label
+                label=label,
+                mirror_id=mirror_id
             )
+        self._maybe_forget(1)
 
+    def add_many(self, texts, metadata=None) -> List[int]:
+        """
+        Adds a batch of memories to all active layers with a single encode and save per layer.
+
+        :param texts: Memory strings to store.
+        :param metadata: Optional dict applied to every memory, or a list of dicts (one per text)
+                         with the same keys as add(): source, emotion, label, mirror_id.
+        :return: The long-term ids assigned to the memories.
+        """
+        texts = list(texts)
+        metadata = self._expand_metadata(metadata, len(texts))
+
+        ids = self.long_term.add_many(texts)
+        for memory_id, memory_text in zip(ids, texts):
+            self.short_term.add(memory_text, memory_id)
+        self._sync_theme_counter()
+
+        if self.meta_memory is not None and ids:
+            self.meta_memory.record_many(
+                {
+                    "memory_id": memory_id,
+                    "content": memory_text,
+                    "emotion": meta.get("emotion"),
+                    "source": meta.get("source", "system"),
+                    "label": meta.get("label"),
+                    "mirror_id": meta.get("mirror_id"),
+                }
+                for memory_id, memory_text, meta in zip(ids, texts, metadata)
+            )
+
+        self._maybe_forget(len(ids))
+        return ids
+
+    def delete(self, memory_ids) -> List[int]:
+        """
+        Deletes memories from every layer: long-term index and texts, meta memory,
+        theme counts and matching short-term entries.
+
+        :param memory_ids: Long-term memory ids.
+        :return: The ids that were deleted from long-term memory.
+        """
+        memory_ids = [int(memory_id) for memory_id in memory_ids]
+        texts = dict(zip(memory_ids, self.long_term.texts.get_many(memory_ids)))
+        removed = self.long_term.delete(memory_ids)
+
+        with self._theme_lock:
+            for memory_id in removed:
+                if memory_id < self.theme_counter.watermark:
+                    self.theme_counter.remove(texts[memory_id])
+            self.theme_counter.save()
+        self.retriever.remove({memory_id: texts[memory_id] for memory_id in removed})
+        self.short_term.remove({memory_id: texts[memory_id] for memory_id in removed})
+        if self.meta_memory is not None:
+            self.meta_memory.remove(memory_ids)
+        return removed
+
+    def forget(self, policy=None, now=None) -> List[int]:
+        """
+        Deletes the memories a forgetting policy selects from the meta memory entries.
+
+        :param policy: Overrides the manager's forgetting_policy for this call.
+        :param now: Reference time for age-based policies (default: the current UTC time).
+        :return: The ids that were deleted.
+        """
+        policy = policy or self.forgetting_policy
+        self._added_since_forget = 0
+        if policy is None or self.meta_memory is None:
+            return []
+        selected = policy.select(self.meta_memory.entries(), now or datetime.now(timezone.utc))
+        return self.delete(memory_id for memory_id in selected if str(memory_id).isdigit())
+
+    def compact(self) -> int:
+        """Reclaims the space of deleted long-term memories; returns the number of vectors removed."""
+        return self.long_term.compact()
+
+    def _maybe_forget(self, added: int):
+        if not self.forget_every:
+            return
+        self._added_since_forget += added
+        if self._added_since_forget >= self.forget_every:
+            self.forget()
+
+    @staticmethod
+    def _expand_metadata(metadata: Optional[object], count: int) -> List[dict]:
+        if metadata is None:
+            return [{}] * count
+        if isinstance(metadata, dict):
+            metadata = [metadata] * count
+        metadata = [meta or {} for meta in metadata]
+        if len(metadata) != count:
+            raise ValueError(f"Expected {count} metadata entries, got {len(metadata)}")
+        unknown = sorted({key for meta in metadata for key in meta} - set(METADATA_KEYS))
+        if unknown:
+            raise ValueError(f"Unsupported metadata keys: {', '.join(unknown)}. Supported keys: {', '.join(METADATA_KEYS)}")
+        return metadata
+
+    @staticmethod
+    def _create_meta_memory(backend, memory_dir=None):
+        if backend == META_BACKEND_JSON:
+            return MetaMemory(os.path.join(memory_dir, "meta_memory.json") if memory_dir else None)
+        if backend == META_BACKEND_SQLITE:
+            return SQLiteMetaMemory(os.path.join(memory_dir, "meta_memory.db") if memory_dir else None)
+        raise ValueError(f"Unsupported meta memory backend: {backend}. Supported backends: {META_BACKEND_JSON}, {META_BACKEND_SQLITE}")
 
     def recent(self, n=5):
         """Returns the last n short-term memories."""
         return self.short_term.recall(n)
 
     def search(self, query_text, k=5):
-        """Searches long-term memory for semantically similar entries."""
+        """Searches long-term memory for similar entries, by meaning and, in hybrid mode, by wording."""
+        if self.retrieval == RETRIEVAL_HYBRID:
+            return self.retriever.search(query_text, k)
         return self.long_term.search(query_text, k)
 
     def save_all(self):
         """Saves all memory layers."""
         self.short_term.save()
         self.long_term.save()
-        if self.meta_memory:
+        with self._theme_lock:
+            self.theme_counter.save()
+        if self.meta_memory is not None:
             self.meta_memory.save()
 
     def load_all(self):
         """Loads all memory layers."""
         self.short_term.load()
         self.long_term.load()
-        if self.meta_memory:
+        self.retriever.lexical_index.reset()
+        with self._theme_lock:
+            self.theme_counter.load()
+        self._sync_theme_counter()
+        if self.meta_memory is not None:
             self.meta_memory.load()
 
     def get_loop_patterns(self, top_n: int = 5) -> List[str]:
@@ -61,19 +218,22 @@ class MemoryManager:
         # Placeholder logic -> This would include n-gram, vector, or semantic clustering
         # return ["abandonment", "yearning", "containment", "disappearance"]
 
-        all_texts = list(self.long_term.mem_map.values())
-        combined_text = " ".join(all_texts).lower()
-
-        tokens = re.findall(r'\b[a-z]{5,}\b', combined_text)  # Filter: words with ≥5 letters
-        token_counts = Counter(tokens)
-
-        theme_whitelist = {
-        "abandonment", "containment", "yearning", "disappearance", "isolation",
-            "regret", "silence", "longing", "disconnect", "shame", "withdrawal"
-        }
-
-        filtered = {word: freq for word, freq in token_counts.items() if word in theme_whitelist}
-        sorted_themes = sorted(filtered.items(), key=lambda x: x[1], reverse=True)
-
-        return [theme for theme, _ in sorted_themes[:top_n]]
-
+        self._sync_theme_counter()
+        with self._theme_lock:
+            return self.theme_counter.top(top_n)
+
+    def _sync_theme_counter(self):
+        """Count themes for long-term memories added since the counter's watermark, then persist."""
+        next_id = self.long_term.next_id
+        if self.theme_counter.watermark == next_id:
+            return
+        with self._theme_lock:
+            if self.theme_counter.watermark > next_id:  # the long-term store was reset underneath the counter
+                self.theme_counter.reset()
+            if self.theme_counter.watermark == next_id:
+                return
+            for _, memory_text in self.long_term.texts.iter_texts(self.theme_counter.watermark, next_id):
+                if memory_text:
+                    self.theme_counter.add(memory_text)
+            self.theme_counter.watermark = next_id
+            self.theme_counter.save()
@@ -4,19 +4,89 @@
 # Purpose: Meta memory
 
 from datetime import datetime, timezone
+import bisect
 import json
-from collections import defaultdict
+from itertools import islice
+from collections import OrderedDict
 from shared.path_utils import resolve_memory_path
 
+class UsageRanking:
+    """
+    Memory ids bucketed by usage count.
+
+    Counts only move one step at a time, so an increment relocates a single id
+    between neighbouring buckets and a top-n read walks buckets from the highest
+    count down, without sorting the whole counter.
+    """
+
+    def __init__(self):
+        self.counts = {}    # memory_id -> usage count
+        self._buckets = {}  # usage count -> ids with that count, in the order they reached it
+        self._levels = []   # sorted usage counts that have a non-empty bucket
+
+    def set(self, memory_id, count):
+        self.remove(memory_id)
+        self.counts[memory_id] = count
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = {}
+            bisect.insort(self._levels, count)
+        bucket[memory_id] = None
+
+    def increment(self, memory_id, by=1):
+        self.set(memory_id, self.counts.get(memory_id, 0) + by)
+
+    def remove(self, memory_id):
+        count = self.counts.pop(memory_id, None)
+        if count is None:
+            return
+        bucket = self._buckets[count]
+        del bucket[memory_id]
+        if not bucket:
+            del self._buckets[count]
+            del self._levels[bisect.bisect_left(self._levels, count)]
+
+    def top(self, n):
+        """Return up to n (memory_id, count) pairs, highest count first."""
+        ranked = []
+        for count in reversed(self._levels):
+            for memory_id in self._buckets[count]:
+                if len(ranked) >= n:
+                    return ranked
+                ranked.append((memory_id, count))
+        return ranked
+
+
 class MetaMemory:
     def __init__(self, path=None):
         self.path = path or resolve_memory_path("meta_memory.json")
-        self.meta = {}  # memory_id -> metadata
-        self.usage_counter = defaultdict(int)
+        self.meta = {}  # memory_id (as str, matching the JSON keys) -> metadata
+        self.usage_ranking = UsageRanking()
+        self.mirror_index = {}  # mirror_id -> OrderedDict of memory_ids, least recently accessed first
         self.load()
 
     def record(self, memory_id, content=None, emotion=None, source="system", label=None, mirror_id=None):
         """Log metadata when a memory is added or accessed."""
+        self._record(memory_id, content, emotion, source, label, mirror_id)
+        self.save()
+
+    def record_many(self, entries):
+        """
+        Log metadata for a batch of memories and persist once.
+
+        :param entries: Iterable of dicts with the keyword arguments accepted by record().
+        """
+        for entry in entries:
+            self._record(**entry)
+        self.save()
+
+    @property
+    def usage_counter(self):
+        """memory_id -> usage count, rebuilt from the persisted usage_count on load."""
+        return self.usage_ranking.counts
+
+    def _record(self, memory_id, content=None, emotion=None, source="system", label=None, mirror_id=None):
+        memory_id = str(memory_id)
         now = datetime.now(timezone.utc).isoformat()
         if memory_id not in self.meta:
             self.meta[memory_id] = {
@@ -36,18 +106,40 @@ class MetaMemory:
                 self.meta[memory_id]["emotion"] = emotion
             if label:
                 self.meta[memory_id]["label"] = label
-            if mirror_id:
+            if mirror_id and mirror_id != self.meta[memory_id]["mirror_id"]:
+                self.mirror_index[self.meta[memory_id]["mirror_id"]].pop(memory_id, None)
                 self.meta[memory_id]["mirror_id"] = mirror_id
 
-        self.usage_counter[memory_id] += 1
-        self.save()
+        # Every record stamps "now", so the accessed entry becomes the most recent of its mirror.
+        recency = self.mirror_index.setdefault(self.meta[memory_id]["mirror_id"], OrderedDict())
+        recency[memory_id] = None
+        recency.move_to_end(memory_id)
+
+        self.usage_ranking.set(memory_id, self.meta[memory_id]["usage_count"])
 
     def get(self, memory_id):
-        return self.meta.get(memory_id)
+        return self.meta.get(str(memory_id))
+
+    def remove(self, memory_ids):
+        """Purge the metadata of deleted memories; returns the number of entries removed."""
+        removed = 0
+        for memory_id in map(str, memory_ids):
+            data = self.meta.pop(memory_id, None)
+            if data is None:
+                continue
+            self.usage_ranking.remove(memory_id)
+            self.mirror_index.get(data.get("mirror_id"), {}).pop(memory_id, None)
+            removed += 1
+        if removed:
+            self.save()
+        return removed
+
+    def entries(self):
+        """Return every (memory_id, metadata) pair."""
+        return list(self.meta.items())
 
     def get_top_used(self, n=5):
-        sorted_ids = sorted(self.usage_counter.items(), key=lambda x: x[1], reverse=True)
-        return [(mid, self.meta[mid]) for mid, _ in sorted_ids[:n]]
+        return [(mid, self.meta[mid]) for mid, _ in self.usage_ranking.top(n)]
 
     def save(self):
         with open(self.path, "w") as f:
@@ -59,6 +151,15 @@ class MetaMemory:
                 self.meta = json.load(f)
         except FileNotFoundError:
             self.meta = {}
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self.mirror_index = {}
+        self.usage_ranking = UsageRanking()
+        by_access = sorted(self.meta.items(), key=lambda x: x[1].get("last_accessed", ""))
+        for mid, data in by_access:
+            self.mirror_index.setdefault(data.get("mirror_id"), OrderedDict())[mid] = None
+            self.usage_ranking.set(mid, data.get("usage_count", 0))
 
     def retrieve_by_mirror_id(self, mirror_id: str, n=3) -> list[str]:
         """
@@ -68,17 +169,5 @@ class MetaMemory:
         :param n: Number of items to return
         :return: List of content strings
         """
-        filtered = [
-            (mid, data)
-            for mid, data in self.meta.items()
-            if data.get("mirror_id") == mirror_id
-        ]
-
-        sorted_by_access = sorted(
-            filtered,
-            key=lambda x: x[1].get("last_accessed", ""),
-            reverse=True
-        )
-
-        return [entry["content"] for _, entry in sorted_by_access[:n]]
-
+        recency = self.mirror_index.get(mirror_id, {})
+        return [self.meta[mid]["content"] for mid in islice(reversed(recency), n)]
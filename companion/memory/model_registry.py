@@ -0,0 +1,52 @@
+# model_registry.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Process-wide, lazily loaded embedding models
+
+import threading
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_models = {}  # model name -> loaded encoder
+_lock = threading.Lock()
+
+
+def get_model(name: str = DEFAULT_MODEL_NAME):
+    """
+    Return the shared encoder for name, loading it on first use.
+
+    Every memory object asking for the same name gets the same instance, so the
+    weights are held once per process however many managers exist.
+    """
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(name)
+                _models[name] = model
+    return model
+
+
+def warm_up(name: str = DEFAULT_MODEL_NAME):
+    """Load the encoder and run one encode so the first request does not pay for it."""
+    model = get_model(name)
+    model.encode(["warm up"], convert_to_numpy=True)
+    return model
+
+
+def register_model(name: str, model) -> None:
+    """Install an already constructed encoder (e.g. a stub or a fine-tuned model) under name."""
+    with _lock:
+        _models[name] = model
+
+
+def unload(name: str = DEFAULT_MODEL_NAME) -> None:
+    """Drop the shared instance; the next get_model() call loads it again."""
+    with _lock:
+        _models.pop(name, None)
+
+
+def is_loaded(name: str = DEFAULT_MODEL_NAME) -> bool:
+    return name in _models
@@ -3,7 +3,7 @@
 # Author: Andy Widjaja
 # Purpose: Short term memory
 
-from collections import deque
+from collections import Counter, deque
 from datetime import datetime, timezone
 import json
 from shared.path_utils import resolve_memory_path
@@ -16,11 +16,16 @@ class ShortTermMemory:
         self.buffer = deque(maxlen=max_length)
         self.default_agent = os.getenv("DEFAULT_AGENT", "default_agent")
 
-    def add(self, thought):
+    def add(self, thought, memory_id=None):
+        """
+        :param memory_id: The long-term id the thought was stored under, so remove() can find it.
+        """
         timestamped = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "content": thought
         }
+        if memory_id is not None:
+            timestamped["memory_id"] = memory_id
         self.buffer.append(timestamped)
 
     def add_response(self, content: str, role: str = None):
@@ -43,6 +48,26 @@ class ShortTermMemory:
             return list(self.buffer)
         return list(self.buffer)[-n:]
 
+    def remove(self, memories):
+        """
+        Drop the buffered thoughts of deleted long-term memories. Responses are kept.
+
+        :param memories: Mapping of deleted memory id to its text. Thoughts saved without
+                         a memory id are matched by text instead, one per deleted memory.
+        """
+        tagged = {entry["memory_id"] for entry in self.buffer if "memory_id" in entry}
+        untagged = Counter(text for memory_id, text in memories.items() if memory_id not in tagged)
+        kept = deque(maxlen=self.max_length)
+        for entry in self.buffer:
+            if "memory_id" in entry:
+                if entry["memory_id"] in memories:
+                    continue
+            elif "role" not in entry and untagged[entry.get("content")] > 0:
+                untagged[entry["content"]] -= 1
+                continue
+            kept.append(entry)
+        self.buffer = kept
+
     def clear(self):
         self.buffer.clear()
 
@@ -0,0 +1,228 @@
+# sqlite_meta_memory.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: SQLite storage engine for meta memory
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from shared.path_utils import resolve_memory_path
+
+_COLUMNS = ("content", "created_at", "last_accessed", "usage_count", "emotion", "source", "label", "mirror_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    memory_id TEXT PRIMARY KEY,
+    content TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    last_accessed TEXT NOT NULL,
+    usage_count INTEGER NOT NULL DEFAULT 1,
+    emotion TEXT NOT NULL DEFAULT 'neutral',
+    source TEXT NOT NULL DEFAULT 'system',
+    label TEXT NOT NULL DEFAULT 'unspecified',
+    mirror_id TEXT NOT NULL DEFAULT 'default'
+);
+CREATE INDEX IF NOT EXISTS idx_meta_mirror_accessed ON meta (mirror_id, last_accessed);
+CREATE INDEX IF NOT EXISTS idx_meta_last_accessed ON meta (last_accessed);
+CREATE INDEX IF NOT EXISTS idx_meta_label ON meta (label);
+CREATE INDEX IF NOT EXISTS idx_meta_emotion ON meta (emotion);
+CREATE INDEX IF NOT EXISTS idx_meta_usage_count ON meta (usage_count);
+"""
+
+# New rows take defaults; existing rows only overwrite the fields the caller supplied.
+_UPSERT = """
+INSERT INTO meta (memory_id, content, created_at, last_accessed, usage_count, emotion, source, label, mirror_id)
+VALUES (:memory_id, :content, :now, :now, 1, :emotion_default, :source, :label_default, :mirror_id_default)
+ON CONFLICT (memory_id) DO UPDATE SET
+    last_accessed = excluded.last_accessed,
+    usage_count = meta.usage_count + 1,
+    emotion = COALESCE(:emotion, meta.emotion),
+    label = COALESCE(:label, meta.label),
+    mirror_id = COALESCE(:mirror_id, meta.mirror_id)
+"""
+
+
+class SQLiteMetaMemory:
+    """
+    Drop-in replacement for MetaMemory backed by an indexed SQLite table.
+
+    Each record() is its own transaction; record_many() and the batch() context
+    manager group many writes into one commit.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or resolve_memory_path("meta_memory.db")
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self.conn = None
+        self.load()
+
+    def record(self, memory_id, content=None, emotion=None, source="system", label=None, mirror_id=None):
+        """Log metadata when a memory is added or accessed."""
+        with self.batch():
+            self._record(memory_id, content, emotion, source, label, mirror_id)
+
+    def record_many(self, entries):
+        """
+        Log metadata for a batch of memories in a single transaction.
+
+        :param entries: Iterable of dicts with the keyword arguments accepted by record().
+        """
+        with self.batch():
+            for entry in entries:
+                self._record(**entry)
+
+    @contextmanager
+    def batch(self):
+        """Group every write made inside the block into one transaction."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.conn.rollback()
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.commit()
+
+    def get(self, memory_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM meta WHERE memory_id = ?", (str(memory_id),)).fetchone()
+        return self._to_entry(row)[1] if row else None
+
+    def remove(self, memory_ids):
+        """Purge the metadata of deleted memories; returns the number of entries removed."""
+        with self.batch():
+            cursor = self.conn.executemany("DELETE FROM meta WHERE memory_id = ?",
+                                           [(str(memory_id),) for memory_id in memory_ids])
+            return cursor.rowcount
+
+    def entries(self):
+        """Return every (memory_id, metadata) pair."""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM meta").fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def get_top_used(self, n=5):
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM meta ORDER BY usage_count DESC LIMIT ?", (n,)).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def find(self, label=None, emotion=None, mirror_id=None, n=None):
+        """
+        Return (memory_id, metadata) pairs matching every given field, most recently accessed first.
+
+        :param n: Maximum number of entries to return (default: all).
+        """
+        filters = {"label": label, "emotion": emotion, "mirror_id": mirror_id}
+        clauses = [f"{column} = :{column}" for column, value in filters.items() if value is not None]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM meta {where} ORDER BY last_accessed DESC LIMIT :n",
+                {**filters, "n": -1 if n is None else n},
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def retrieve_by_mirror_id(self, mirror_id: str, n=3) -> list[str]:
+        """
+        Retrieve the most recently accessed meta memory contents for a given mirror_id.
+
+        :param mirror_id: The mirror identifier to filter entries
+        :param n: Number of items to return
+        :return: List of content strings
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT content FROM meta WHERE mirror_id = ? ORDER BY last_accessed DESC LIMIT ?",
+                (mirror_id, n),
+            ).fetchall()
+        return [row["content"] for row in rows]
+
+    def save(self):
+        with self._lock:
+            self.conn.commit()
+
+    def load(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0]
+
+    def _record(self, memory_id, content=None, emotion=None, source="system", label=None, mirror_id=None):
+        self.conn.execute(_UPSERT, {
+            "memory_id": str(memory_id),
+            "content": content or "",
+            "now": datetime.now(timezone.utc).isoformat(),
+            "source": source,
+            "emotion": emotion,
+            "label": label,
+            "mirror_id": mirror_id,
+            "emotion_default": emotion or "neutral",
+            "label_default": label or "unspecified",
+            "mirror_id_default": mirror_id or "default",
+        })
+
+    @staticmethod
+    def _to_entry(row):
+        return row["memory_id"], {column: row[column] for column in _COLUMNS}
+
+
+def migrate_json_to_sqlite(json_path, db_path) -> int:
+    """
+    One-shot import of a MetaMemory JSON file into a SQLite meta memory database.
+
+    Existing rows with the same memory_id are replaced.
+
+    :param json_path: Path to meta_memory.json.
+    :param db_path: Path of the SQLite database to create or update.
+    :return: Number of entries migrated.
+    """
+    with open(json_path, "r") as f:
+        meta = json.load(f)
+
+    store = SQLiteMetaMemory(db_path)
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            "memory_id": str(memory_id),
+            "content": data.get("content") or "",
+            "created_at": data.get("created_at") or now,
+            "last_accessed": data.get("last_accessed") or data.get("created_at") or now,
+            "usage_count": data.get("usage_count", 1),
+            "emotion": data.get("emotion") or "neutral",
+            "source": data.get("source") or "system",
+            "label": data.get("label") or "unspecified",
+            "mirror_id": data.get("mirror_id") or "default",
+        }
+        for memory_id, data in meta.items()
+    ]
+
+    with store.batch():
+        store.conn.executemany(
+            "INSERT OR REPLACE INTO meta (memory_id, content, created_at, last_accessed, usage_count, "
+            "emotion, source, label, mirror_id) VALUES (:memory_id, :content, :created_at, :last_accessed, "
+            ":usage_count, :emotion, :source, :label, :mirror_id)",
+            rows,
+        )
+    store.close()
+    return len(rows)
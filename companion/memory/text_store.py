@@ -0,0 +1,287 @@
+# text_store.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Append-only, offset-indexed store of long term memory texts
+
+import mmap
+import os
+import threading
+from collections.abc import Mapping
+import numpy as np
+
+SPAN_DTYPE = np.dtype("<i8")  # each record is an (offset, length) pair into the blob
+SPAN_WIDTH = 2 * SPAN_DTYPE.itemsize
+DEAD_SPAN = np.array([0, -1], dtype=SPAN_DTYPE)  # marks a deleted id
+DEFAULT_STREAM_BATCH = 4096
+
+
+class TextStore(Mapping):
+    """
+    Memory texts keyed by dense integer id, stored as one UTF-8 blob file plus a
+    fixed-width (offset, length) table in `path + ".idx"`.
+
+    Both files are memory-mapped read-only, so a lookup is one table read and one
+    slice of the blob, and processes opening the same store share its pages.
+    append() keeps new texts in memory until flush() appends them to the two
+    files; the table is written after the blob, so a crash mid-flush leaves at
+    most unreferenced bytes at the blob's tail.
+
+    Deleted ids keep their table row, marked with a negative length, so ids are
+    never reused; compact() rewrites the blob without the deleted texts.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.spans_path = path + ".idx"
+        self._spans = np.empty((0, 2), dtype=SPAN_DTYPE)
+        self._blob = b""
+        self._dead_on_disk = 0
+        self._pending = []  # texts for ids len(self._spans) onward, not yet on disk; None once deleted
+        self._pending_dead = 0
+        self._dead = set()  # persisted ids deleted since the last flush
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._recover_compaction()
+        self._remap()
+
+    def __getitem__(self, memory_id):
+        with self._lock:
+            if not self._is_live(memory_id):
+                raise KeyError(memory_id)
+            persisted = len(self._spans)
+            if memory_id < persisted:
+                offset, length = self._spans[memory_id]
+                return self._blob[offset:offset + length].decode("utf-8")
+            return self._pending[memory_id - persisted]
+
+    def __len__(self):
+        """Number of live (not deleted) texts."""
+        return self.next_id - self._dead_on_disk - len(self._dead) - self._pending_dead
+
+    def __iter__(self):
+        for memory_id, _ in self.iter_texts():
+            yield memory_id
+
+    def __contains__(self, memory_id):
+        with self._lock:
+            return self._is_live(memory_id)
+
+    @property
+    def next_id(self):
+        """The id the next appended text receives; deleted ids are counted too."""
+        return len(self._spans) + len(self._pending)
+
+    @property
+    def persisted(self):
+        """Number of ids already flushed to disk."""
+        return len(self._spans)
+
+    def append(self, texts):
+        """
+        Queue texts for the next flush.
+
+        :param texts: Memory strings, stored under consecutive ids.
+        :return: The ids assigned to the texts.
+        """
+        texts = list(texts)
+        with self._lock:
+            start = self.next_id
+            self._pending.extend(texts)
+        return list(range(start, start + len(texts)))
+
+    def discard(self, memory_ids):
+        """
+        Delete texts; deletions of already persisted ids are written by the next flush.
+
+        :return: The ids that were live and are now deleted.
+        """
+        removed = []
+        with self._lock:
+            persisted = len(self._spans)
+            for memory_id in memory_ids:
+                if not self._is_live(memory_id):
+                    continue
+                if memory_id < persisted:
+                    self._dead.add(int(memory_id))
+                else:
+                    self._pending[memory_id - persisted] = None
+                    self._pending_dead += 1
+                removed.append(int(memory_id))
+        return removed
+
+    def dead_ids(self):
+        """Return every deleted id, ascending, as an int64 array."""
+        with self._lock:
+            persisted = len(self._spans)
+            dead = [
+                np.flatnonzero(self._spans[:, 1] < 0),
+                np.fromiter(self._dead, dtype=np.int64),
+                np.array([persisted + i for i, text in enumerate(self._pending) if text is None], dtype=np.int64),
+            ]
+        return np.unique(np.concatenate(dead))
+
+    def get_many(self, memory_ids):
+        """Return the texts for a batch of ids, in order; ids not in the store map to None."""
+        with self._lock:
+            return [self[memory_id] if self._is_live(memory_id) else None for memory_id in memory_ids]
+
+    def iter_texts(self, start=0, stop=None, batch_size=DEFAULT_STREAM_BATCH):
+        """
+        Yield (id, text) pairs of live texts with ids in [start, stop) without loading the whole store.
+
+        Texts are decoded one batch at a time from a contiguous slice of the blob.
+        """
+        stop = self.next_id if stop is None else min(stop, self.next_id)
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            with self._lock:
+                spans, blob, persisted, dead = self._spans, self._blob, len(self._spans), set(self._dead)
+                pending = self._pending[max(batch_start - persisted, 0):max(batch_stop - persisted, 0)]
+            if batch_start < persisted:
+                rows = spans[batch_start:min(batch_stop, persisted)]
+                live = np.flatnonzero(rows[:, 1] >= 0)
+                if len(live):
+                    base = int(rows[live[0], 0])
+                    chunk = blob[base:int(rows[live[-1], 0] + rows[live[-1], 1])]
+                    for position in live:
+                        memory_id = batch_start + int(position)
+                        if memory_id not in dead:
+                            offset, length = rows[position]
+                            yield memory_id, chunk[offset - base:offset - base + length].decode("utf-8")
+            for memory_id, text in enumerate(pending, max(batch_start, persisted)):
+                if text is not None:
+                    yield memory_id, text
+
+    def flush(self, upto=None):
+        """
+        Write pending deletions and append queued texts to disk.
+
+        :param upto: Only append texts with ids below this (default: everything queued).
+        :return: The number of texts appended.
+        """
+        with self._flush_lock:
+            with self._lock:
+                persisted = len(self._spans)
+                end = self.next_id if upto is None else min(upto, self.next_id)
+                batch = self._pending[:max(end - persisted, 0)]
+                dead = sorted(self._dead)
+            if not batch and not dead:
+                return 0
+
+            if dead:
+                with open(self.spans_path, "r+b") as f:
+                    for memory_id in dead:
+                        f.seek(memory_id * SPAN_WIDTH)
+                        f.write(DEAD_SPAN.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            if batch:
+                encoded = [b"" if text is None else text.encode("utf-8") for text in batch]
+                blob_end = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+                lengths = np.fromiter((len(data) for data in encoded), dtype=SPAN_DTYPE, count=len(encoded))
+                offsets = blob_end + np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(SPAN_DTYPE)
+                spans = np.column_stack((offsets, lengths)).astype(SPAN_DTYPE)
+                spans[[text is None for text in batch]] = DEAD_SPAN
+
+                self._write_at(self.path, blob_end, b"".join(encoded))
+                self._write_at(self.spans_path, persisted * SPAN_WIDTH, spans.tobytes())
+
+            with self._lock:
+                self._remap()
+                self._dead.difference_update(dead)
+                self._pending_dead -= sum(text is None for text in batch)
+                del self._pending[:len(batch)]
+            return len(batch)
+
+    def compact(self):
+        """
+        Rewrite the blob with only live texts, after writing pending deletions.
+
+        The new blob and table go to temporary files that are renamed blob first;
+        a crash between the two renames is completed the next time the store opens.
+
+        :return: Bytes reclaimed from the blob.
+        """
+        self.flush(upto=self.persisted)
+        with self._flush_lock:
+            with self._lock:
+                spans, blob = self._spans, self._blob
+            if not len(spans) or not np.any(spans[:, 1] < 0):
+                return 0
+
+            compacted = np.array(spans, dtype=SPAN_DTYPE)
+            live = np.flatnonzero(compacted[:, 1] >= 0)
+            lengths = compacted[live, 1]
+            compacted[live, 0] = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(SPAN_DTYPE)
+            with open(self.path + ".tmp", "wb") as f:
+                for position in live:
+                    offset, length = spans[position]
+                    f.write(blob[offset:offset + length])
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.spans_path + ".tmp", "wb") as f:
+                f.write(compacted.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            reclaimed = len(blob) - int(lengths.sum())
+            with self._lock:
+                os.replace(self.path + ".tmp", self.path)
+                os.replace(self.spans_path + ".tmp", self.spans_path)
+                self._remap()
+            return reclaimed
+
+    def truncate(self, count):
+        """Drop every text with an id of count or above, on disk and in memory."""
+        with self._flush_lock, self._lock:
+            persisted = len(self._spans)
+            if count >= persisted:
+                self._pending_dead -= sum(text is None for text in self._pending[count - persisted:])
+                del self._pending[count - persisted:]
+                return
+            self._pending, self._pending_dead = [], 0
+            self._dead = {memory_id for memory_id in self._dead if memory_id < count}
+            with open(self.spans_path, "r+b") as f:
+                f.truncate(count * SPAN_WIDTH)
+                os.fsync(f.fileno())
+            self._remap()
+
+    def _is_live(self, memory_id):
+        if not isinstance(memory_id, (int, np.integer)) or memory_id < 0:
+            return False
+        persisted = len(self._spans)
+        if memory_id < persisted:
+            return bool(self._spans[memory_id, 1] >= 0) and int(memory_id) not in self._dead
+        if memory_id < persisted + len(self._pending):
+            return self._pending[memory_id - persisted] is not None
+        return False
+
+    def _remap(self):
+        span_bytes = os.path.getsize(self.spans_path) if os.path.exists(self.spans_path) else 0
+        count = span_bytes // SPAN_WIDTH  # a torn trailing record is ignored and later overwritten
+        if count == 0:
+            self._spans, self._blob, self._dead_on_disk = np.empty((0, 2), dtype=SPAN_DTYPE), b"", 0
+            return
+        self._spans = np.memmap(self.spans_path, dtype=SPAN_DTYPE, mode="r", shape=(count, 2))
+        self._dead_on_disk = int(np.count_nonzero(self._spans[:, 1] < 0))
+        with open(self.path, "rb") as f:
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def _recover_compaction(self):
+        # The blob was renamed but the table was not: the waiting table belongs to the new blob.
+        if os.path.exists(self.spans_path + ".tmp") and not os.path.exists(self.path + ".tmp"):
+            os.replace(self.spans_path + ".tmp", self.spans_path)
+        for tmp_path in (self.path + ".tmp", self.spans_path + ".tmp"):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _write_at(path, offset, data):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,77 @@
+# theme_counter.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Incremental theme token counts for loop pattern detection
+
+import json
+import os
+import re
+from collections import Counter
+from shared.constants import THEME_WHITELIST
+
+THEME_TOKEN_PATTERN = re.compile(r'\b[a-z]{5,}\b')  # Filter: words with ≥5 letters
+
+
+class ThemeCounter:
+    """
+    Running counts of whitelisted theme tokens across stored memory texts.
+
+    Texts are tokenized once, when added or removed, so reading the top themes
+    costs O(whitelist) instead of a pass over every memory. The counts are
+    persisted together with a watermark: the id of the first long-term memory
+    not yet reflected, so memories added elsewhere can be caught up on load.
+    """
+
+    def __init__(self, whitelist=None, path=None):
+        self.whitelist = frozenset(whitelist or THEME_WHITELIST)
+        self.path = path
+        self.counts = Counter()
+        self.watermark = 0
+
+    def add(self, text: str) -> None:
+        self.counts.update(self._themes(text))
+
+    def remove(self, text: str) -> None:
+        self.counts.subtract(self._themes(text))
+        for theme in [theme for theme, count in self.counts.items() if count <= 0]:
+            del self.counts[theme]
+
+    def top(self, n: int = 5):
+        """Return the n most frequent themes, most frequent first."""
+        return [theme for theme, _ in self.counts.most_common(n)]
+
+    def reset(self) -> None:
+        self.counts = Counter()
+        self.watermark = 0
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "whitelist": sorted(self.whitelist),
+                "watermark": self.watermark,
+                "counts": dict(self.counts),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """
+        Load persisted counts.
+
+        :return: False (and an empty counter) if there is no file or it was built for another whitelist.
+        """
+        self.reset()
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        if set(data.get("whitelist", [])) != self.whitelist:
+            return False
+        self.counts = Counter(data.get("counts", {}))
+        self.watermark = data.get("watermark", 0)
+        return True
+
+    def _themes(self, text: str):
+        return [token for token in THEME_TOKEN_PATTERN.findall(text.lower()) if token in self.whitelist]
@@ -0,0 +1,284 @@
+# vector_index.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: FAISS index backends, promotion policy and recall/latency reporting
+
+import math
+import time
+import faiss
+import numpy as np
+
+INDEX_FLAT = "flat"
+INDEX_IVF_FLAT = "ivf_flat"
+INDEX_IVF_PQ = "ivf_pq"
+INDEX_HNSW = "hnsw"
+INDEX_AUTO = "auto"
+
+SUPPORTED_INDEX_TYPES = [INDEX_FLAT, INDEX_IVF_FLAT, INDEX_IVF_PQ, INDEX_HNSW, INDEX_AUTO]
+
+# Corpus size at which INDEX_AUTO promotes to each backend, smallest first.
+DEFAULT_PROMOTION_THRESHOLDS = {
+    INDEX_IVF_FLAT: 50_000,
+    INDEX_IVF_PQ: 1_000_000,
+}
+
+# IVF and PQ quantizers need enough vectors to train on; below this the index stays flat.
+MIN_TRAINING_SIZE = {
+    INDEX_IVF_FLAT: 1_000,
+    INDEX_IVF_PQ: 10_000,
+}
+
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+DEFAULT_HNSW_M = 32
+
+# Read-only memory mapping of the stored codes. IO_FLAG_MMAP_IFC maps flat, IVF and
+# HNSW storage alike; older FAISS builds only offer IO_FLAG_MMAP (IVF lists only).
+MMAP_READ_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def default_nlist(n: int) -> int:
+    """Number of IVF cells for a corpus of n vectors (~4·√n, with ≥39 training points per cell)."""
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def pq_subquantizers(dim: int) -> int:
+    """Largest number of PQ sub-quantizers ≤ dim / 8 that divides dim."""
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def index_type_of(index) -> str:
+    """Return the backend name for a FAISS index instance."""
+    index = unwrap(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return INDEX_HNSW
+    if isinstance(index, faiss.IndexIVFPQ):
+        return INDEX_IVF_PQ
+    if isinstance(index, faiss.IndexIVF):
+        return INDEX_IVF_FLAT
+    return INDEX_FLAT
+
+
+def target_index_type(index_type: str, n: int, thresholds=None) -> str:
+    """
+    Resolve the backend a corpus of n vectors should use.
+
+    :param index_type: The configured backend, or INDEX_AUTO to pick by size.
+    :param n: Number of vectors in the corpus.
+    :param thresholds: Promotion thresholds for INDEX_AUTO (default DEFAULT_PROMOTION_THRESHOLDS).
+    :return: A concrete backend name.
+    """
+    if index_type not in SUPPORTED_INDEX_TYPES:
+        raise ValueError(f"Unsupported index type: {index_type}. Supported index types: {', '.join(SUPPORTED_INDEX_TYPES)}")
+
+    if index_type == INDEX_AUTO:
+        index_type = INDEX_FLAT
+        thresholds = thresholds or DEFAULT_PROMOTION_THRESHOLDS
+        for candidate, threshold in sorted(thresholds.items(), key=lambda x: x[1]):
+            if n >= threshold:
+                index_type = candidate
+
+    if n < MIN_TRAINING_SIZE.get(index_type, 0):
+        return INDEX_FLAT
+    return index_type
+
+
+def create_index(index_type: str, dim: int, training_vectors=None, hnsw_m: int = DEFAULT_HNSW_M):
+    """
+    Create an empty, trained index of the given backend.
+
+    :param index_type: One of INDEX_FLAT, INDEX_IVF_FLAT, INDEX_IVF_PQ, INDEX_HNSW.
+    :param dim: Vector dimensionality.
+    :param training_vectors: (N, dim) float32 matrix used to train IVF/PQ quantizers.
+    :return: A FAISS index ready for add().
+    """
+    if index_type == INDEX_FLAT:
+        return faiss.IndexFlatL2(dim)
+    if index_type == INDEX_HNSW:
+        return faiss.index_factory(dim, f"HNSW{hnsw_m}")
+
+    n = 0 if training_vectors is None else len(training_vectors)
+    if n < MIN_TRAINING_SIZE[index_type]:
+        raise ValueError(f"{index_type} needs at least {MIN_TRAINING_SIZE[index_type]} training vectors, got {n}")
+
+    nlist = default_nlist(n)
+    if index_type == INDEX_IVF_FLAT:
+        index = faiss.index_factory(dim, f"IVF{nlist},Flat")
+    else:
+        index = faiss.index_factory(dim, f"IVF{nlist},PQ{pq_subquantizers(dim)}")
+
+    index.train(training_vectors)
+    index.make_direct_map()  # keeps reconstruct() available for later re-indexing
+    return index
+
+
+def unwrap(index):
+    """Return the backend index inside an IndexIDMap, or the index itself."""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def with_ids(index):
+    """
+    Return index wrapped in an IndexIDMap2, so ids stay stable when vectors are removed.
+
+    A populated positional index is re-indexed with each vector's position as its id.
+    """
+    if isinstance(index, faiss.IndexIDMap2):
+        return index
+    if index.ntotal == 0:
+        return faiss.IndexIDMap2(index)
+    vectors = reconstruct_all(index)
+    wrapped = faiss.IndexIDMap2(create_index(index_type_of(index), index.d, vectors))
+    wrapped.add_with_ids(vectors, np.arange(index.ntotal, dtype="int64"))
+    return wrapped
+
+
+def stored_ids(index) -> np.ndarray:
+    """Return the id of every stored vector, in storage order."""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.vector_to_array(index.id_map).astype("int64")
+    return np.arange(index.ntotal, dtype="int64")
+
+
+def exclusion_selector(excluded_ids):
+    """Build a read-only selector that skips the given ids, or None when there are none to skip."""
+    if not excluded_ids:
+        return None
+    return faiss.IDSelectorNot(faiss.IDSelectorBatch(np.fromiter(excluded_ids, dtype="int64")))
+
+
+def search_params(index, selector, nprobe: int = DEFAULT_NPROBE, ef_search: int = DEFAULT_EF_SEARCH):
+    """
+    Build search parameters around an exclusion_selector(), or None without one.
+
+    Build them per search: IndexIDMap swaps its own selector into the parameters
+    for the duration of a call, so concurrent searches must not share them. The
+    selector itself is only read and may be shared. The query-time knobs are
+    repeated here because FAISS reads them from the parameters instead of the
+    index once parameters are passed.
+    """
+    if selector is None:
+        return None
+    backend = unwrap(index)
+    if isinstance(backend, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=min(nprobe, backend.nlist))
+    elif isinstance(backend, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    params.referenced_objects = [selector]  # the SWIG parameters do not keep the selector alive
+    return params
+
+
+def read_index(path: str, mmap: bool = False):
+    """
+    Read an index from disk.
+
+    :param mmap: Map the stored vectors read-only instead of copying them into RAM.
+                 Processes mapping the same file share its pages through the OS page
+                 cache. A mapped index must not be modified; use owned_copy() first.
+    """
+    return faiss.read_index(path, MMAP_READ_FLAGS if mmap else 0)
+
+
+def owned_copy(index):
+    """Return an in-memory copy of index that can be modified (e.g. of a memory-mapped index)."""
+    return faiss.deserialize_index(faiss.serialize_index(index))
+
+
+def configure_search(index, nprobe: int = DEFAULT_NPROBE, ef_search: int = DEFAULT_EF_SEARCH) -> None:
+    """Apply query-time accuracy/latency knobs to an index."""
+    index = unwrap(index)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe, index.nlist)
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+def reconstruct_all(index) -> np.ndarray:
+    """Return every stored vector, in storage order, as an (ntotal, d) float32 matrix."""
+    index = unwrap(index)
+    if index.ntotal == 0:
+        return np.empty((0, index.d), dtype="float32")
+    if isinstance(index, faiss.IndexIVF) and index.direct_map.type == faiss.DirectMap.NoMap:
+        index.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def rebuild_index(index, index_type: str, nprobe: int = DEFAULT_NPROBE, ef_search: int = DEFAULT_EF_SEARCH,
+                  exclude_ids=None):
+    """
+    Re-index the vectors of an existing index into a new backend.
+
+    Positions are preserved for a positional index, and ids for an IndexIDMap, so
+    ids assigned by the old index remain valid.
+
+    :param exclude_ids: Ids to leave out of the rebuilt index (IndexIDMap only).
+    """
+    vectors, ids = reconstruct_all(index), stored_ids(index)
+    if exclude_ids:
+        keep = ~np.isin(ids, np.fromiter(exclude_ids, dtype="int64"))
+        vectors, ids = vectors[keep], ids[keep]
+
+    rebuilt = create_index(index_type, index.d, vectors)
+    if isinstance(index, faiss.IndexIDMap):
+        rebuilt = faiss.IndexIDMap2(rebuilt)
+        if len(vectors):
+            rebuilt.add_with_ids(vectors, ids)
+    elif len(vectors):
+        rebuilt.add(vectors)
+    configure_search(rebuilt, nprobe, ef_search)
+    return rebuilt
+
+
+def recall_report(vectors, queries, index_types=None, top_k: int = 10, nprobe: int = DEFAULT_NPROBE,
+                  ef_search: int = DEFAULT_EF_SEARCH) -> list:
+    """
+    Measure recall@k and per-query latency of each backend against the flat baseline.
+
+    :param vectors: (N, dim) float32 corpus.
+    :param queries: (Q, dim) float32 queries.
+    :param index_types: Backends to evaluate (default: all concrete backends).
+    :param top_k: Number of neighbours compared against the exact result.
+    :return: One dict per backend with recall, build time and latency percentiles.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    index_types = index_types or [INDEX_FLAT, INDEX_IVF_FLAT, INDEX_IVF_PQ, INDEX_HNSW]
+
+    baseline = faiss.IndexFlatL2(vectors.shape[1])
+    baseline.add(vectors)
+    _, expected = baseline.search(queries, top_k)
+
+    report = []
+    for index_type in index_types:
+        started = time.perf_counter()
+        index = create_index(index_type, vectors.shape[1], vectors)
+        index.add(vectors)
+        configure_search(index, nprobe, ef_search)
+        build_seconds = time.perf_counter() - started
+
+        latencies = []
+        found = np.empty_like(expected)
+        for row, query in enumerate(queries):
+            started = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), top_k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found[row] = ids[0]
+
+        hits = sum(len(set(e) & set(f)) for e, f in zip(expected, found))
+        report.append({
+            "index_type": index_type,
+            "recall_at_k": round(hits / expected.size, 4),
+            "build_seconds": round(build_seconds, 3),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+            "qps": round(len(latencies) / (sum(latencies) / 1000), 1) if latencies else 0.0,
+        })
+
+    return report
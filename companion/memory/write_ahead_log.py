@@ -0,0 +1,127 @@
+# write_ahead_log.py
+# Companion Framework - Memory Module
+# Author: Andy Widjaja
+# Purpose: Append-only write-ahead log for long term memory
+
+import glob
+import os
+import struct
+import zlib
+import numpy as np
+
+OP_ADD = 1
+OP_DELETE = 2
+
+_FRAME = struct.Struct("<II")    # body length, crc32 of body
+_RECORD = struct.Struct("<BqI")  # op, memory id, vector byte length
+
+
+class WriteAheadLog:
+    """
+    Append-only log of memory mutations, split into numbered segment files.
+
+    Each record is framed with its length and a CRC32 so a torn write at the
+    tail of a segment (e.g. a crash mid-append) is detected and discarded on
+    replay. Segments are sealed by rotate() and removed by drop_segments()
+    once a checkpoint has made them redundant.
+    """
+
+    def __init__(self, path, dim, sync=True):
+        self.path = path
+        self.dim = dim
+        self.sync = sync
+        self.pending = 0  # records appended since the last rotation
+        segments = self.segments()
+        self.segment = segments[-1] if segments else 1
+        self._handle = None
+
+    def segments(self):
+        """Return the sequence numbers of the segment files on disk, oldest first."""
+        numbers = []
+        for name in glob.glob(glob.escape(self.path) + ".*"):
+            suffix = name.rsplit(".", 1)[-1]
+            if suffix.isdigit():
+                numbers.append(int(suffix))
+        return sorted(numbers)
+
+    def append(self, records):
+        """
+        Append records and make them durable with a single flush.
+
+        :param records: Iterable of (op, memory_id, vector, text) tuples.
+        """
+        frames = []
+        for op, memory_id, vector, text in records:
+            vector_bytes = b"" if vector is None else np.asarray(vector, dtype="float32").tobytes()
+            body = _RECORD.pack(op, memory_id, len(vector_bytes)) + vector_bytes + (text or "").encode("utf-8")
+            frames.append(_FRAME.pack(len(body), zlib.crc32(body)) + body)
+
+        if not frames:
+            return
+
+        handle = self._open()
+        handle.write(b"".join(frames))
+        handle.flush()
+        if self.sync:
+            os.fsync(handle.fileno())
+        self.pending += len(frames)
+
+    def replay(self):
+        """
+        Yield every intact record, oldest first, as (op, memory_id, vector, text).
+
+        A corrupt or truncated frame ends its segment; the segment is cut back to
+        the last intact record so later appends are not hidden behind garbage.
+        """
+        self.close()
+        for number in self.segments():
+            segment_path = self._segment_path(number)
+            with open(segment_path, "rb") as f:
+                data = f.read()
+
+            offset = 0
+            while offset + _FRAME.size <= len(data):
+                length, checksum = _FRAME.unpack_from(data, offset)
+                body = data[offset + _FRAME.size:offset + _FRAME.size + length]
+                if len(body) != length or zlib.crc32(body) != checksum:
+                    break
+                op, memory_id, vector_length = _RECORD.unpack_from(body)
+                vector_end = _RECORD.size + vector_length
+                vector = np.frombuffer(body[_RECORD.size:vector_end], dtype="float32") if vector_length else None
+                yield op, memory_id, vector, body[vector_end:].decode("utf-8")
+                offset += _FRAME.size + length
+
+            if offset != len(data):
+                with open(segment_path, "r+b") as f:
+                    f.truncate(offset)
+
+    def rotate(self):
+        """
+        Seal the active segment and start a new one.
+
+        :return: The sequence number of the sealed segment.
+        """
+        self.close()
+        sealed = self.segment
+        self.segment += 1
+        self.pending = 0
+        return sealed
+
+    def drop_segments(self, up_to):
+        """Delete all segments with a sequence number <= up_to."""
+        for number in self.segments():
+            if number <= up_to and number != self.segment:
+                os.remove(self._segment_path(number))
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _open(self):
+        if self._handle is None:
+            self._handle = open(self._segment_path(self.segment), "ab")
+        return self._handle
+
+    def _segment_path(self, number):
+        return f"{self.path}.{number:06d}"
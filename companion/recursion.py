@@ -10,11 +10,19 @@ This module models and analyzes recurring emotional and cognitive patterns in AI
 # print(sys.path)
 
 from shared.constants import REFLECTIONS
+from shared.pattern_matcher import MultiPatternMatcher
 from companion.memory import MemoryManager
 from typing import List, Dict, Any
 from collections import Counter
 
-import re
+THEME_PATTERNS = {
+    "fear of disconnection": r"(abandon(ed|ment)|drift|lost|vanish)",
+    "guilt": r"(sorry|regret|fault|blame)",
+    "yearning": r"(miss|long for|desire|wish|ache)",
+    "emotional suppression": r"(hide|contain|silent|shut down|numb)"
+}
+
+THEME_MATCHER = MultiPatternMatcher(THEME_PATTERNS)
 
 class RecursionCore:
     """
@@ -29,6 +37,14 @@ class RecursionCore:
         self.emotional_snapshots: List[str] = []
         self.recursive_themes: Dict[str, float] = {} 
 
+    def reset(self) -> None:
+        """
+        Clear per-call state in place so one core can serve many reflections.
+        """
+        self.memory_patterns = []
+        self.emotional_snapshots = []
+        self.recursive_themes.clear()
+
     def capture_memory_patterns(self, memory_core: MemoryManager)-> None:
         """
         Capture memory loop patterns from the MemoryCore module.
@@ -54,17 +70,32 @@ class RecursionCore:
         """
         # Logic to identify recurring themes
         combined_emotional_snapshots = " ".join(self.emotional_snapshots).lower()
-        themes = {
-            "fear of disconnection": r"(abandon(ed|ment)|drift|lost|vanish)",
-            "guilt": r"(sorry|regret|fault|blame)",
-            "yearning": r"(miss|long for|desire|wish|ache)",
-            "emotional suppression": r"(hide|contain|silent|shut down|numb)"
-        }
-
-        for theme, pattern in themes.items():
-            matches = re.findall(pattern, combined_emotional_snapshots)
-            if matches:
-                self.recursive_themes[theme] = len(matches)
+        self.recursive_themes.update(self._count_themes(combined_emotional_snapshots))
+
+    def detect_many(self, snapshot_sets: List[List[str]]) -> List[Dict[str, float]]:
+        """
+        Score many sets of emotional snapshots without touching this core's state.
+
+        :param snapshot_sets: A list of snapshot lists (e.g. one per archived session).
+        :return: For each set, its recurring themes mapped to normalized weights.
+        """
+        return [
+            self._normalize(self._count_themes(" ".join(snapshots).lower()))
+            for snapshots in snapshot_sets
+        ]
+
+    @staticmethod
+    def _count_themes(text: str) -> Dict[str, int]:
+        """Count every theme in one scan, keeping THEME_PATTERNS order for tie-breaking."""
+        counts = THEME_MATCHER.count(text)
+        return {theme: counts[theme] for theme in THEME_PATTERNS if counts[theme]}
+
+    @staticmethod
+    def _normalize(theme_counts: Dict[str, float]) -> Dict[str, float]:
+        total = sum(theme_counts.values())
+        if total == 0:
+            return {}
+        return {theme: round(count / total, 2) for theme, count in theme_counts.items()}
 
     def assign_recursive_weights(self) -> None:
         """
@@ -15,3 +15,9 @@ REFLECTIONS = {
     "containment": "It wasn't weakness—it was your strength wrapped in armor.",
     "disappearance": "You didn't vanish. You were surviving. That's not something to be ashamed of.",
 }
+
+# Tokens counted by MemoryManager.get_loop_patterns as recurring emotional or cognitive themes.
+THEME_WHITELIST = {
+    "abandonment", "containment", "yearning", "disappearance", "isolation",
+    "regret", "silence", "longing", "disconnect", "shame", "withdrawal"
+}
@@ -0,0 +1,274 @@
+"""
+Module: instrumentation
+
+This module records per-stage wall time, call counts and payload sizes into an in-process histogram registry.
+
+Instrumentation is off by default; enable() it (or set COMPANION_INSTRUMENTATION=1)
+to start recording. While disabled, stage() returns a shared no-op span and
+instrumented functions call straight through, so the cost is one flag check.
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+from shared.logger import get_logger
+
+# Upper bounds, in seconds, of the stage duration histogram buckets.
+DEFAULT_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds, in characters, of the payload size histogram buckets.
+DEFAULT_SIZE_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+PROMETHEUS_PREFIX = "companion_stage"
+
+_enabled = os.getenv("COMPANION_INSTRUMENTATION", "").lower() in ("1", "true", "yes")
+_logger = None
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style, plus min and max."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the bucket that contains it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+class StageMetrics:
+
+    def __init__(self, duration_buckets: Sequence[float], size_buckets: Sequence[float]):
+        self.duration = Histogram(duration_buckets)
+        self.size = Histogram(size_buckets)
+        self.errors = 0
+
+
+class Registry:
+    """Thread-safe map of stage name to duration and payload-size histograms."""
+
+    def __init__(self, duration_buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS,
+                 size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS):
+        self.duration_buckets = duration_buckets
+        self.size_buckets = size_buckets
+        self.stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, size: Optional[int] = None, error: bool = False) -> None:
+        with self._lock:
+            metrics = self.stages.get(stage)
+            if metrics is None:
+                metrics = self.stages[stage] = StageMetrics(self.duration_buckets, self.size_buckets)
+            metrics.duration.observe(seconds)
+            if size is not None:
+                metrics.size.observe(size)
+            if error:
+                metrics.errors += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Summarize every stage: calls, errors, latency in ms and payload sizes."""
+        with self._lock:
+            return {name: _summarize(metrics) for name, metrics in sorted(self.stages.items())}
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            stages = sorted(self.stages.items())
+            for metric, attribute, help_text in (
+                (f"{prefix}_duration_seconds", "duration", "Wall time per pipeline stage."),
+                (f"{prefix}_payload_size", "size", "Payload size in characters per pipeline stage."),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for name, metrics in stages:
+                    histogram = getattr(metrics, attribute)
+                    if not histogram.count:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+
+            lines.append(f"# HELP {prefix}_errors_total Calls per pipeline stage that raised.")
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for name, metrics in stages:
+                lines.append(f'{prefix}_errors_total{{stage="{name}"}} {metrics.errors}')
+        return "\n".join(lines) + "\n"
+
+    def emit(self, level: str = "info") -> None:
+        """Write one summary line per stage through the shared logger."""
+        logger = _get_logger()
+        for name, summary in self.snapshot().items():
+            getattr(logger, level)(
+                f"{name}: calls={summary['calls']} errors={summary['errors']} "
+                f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms max={summary['max_ms']}ms "
+                f"payload_avg={summary['payload_avg']}"
+            )
+
+
+class Span:
+    """Times one stage; set .size inside the block to record a payload size."""
+
+    __slots__ = ("registry", "stage", "size", "_started")
+
+    def __init__(self, registry: Registry, stage: str, size: Optional[int] = None):
+        self.registry = registry
+        self.stage = stage
+        self.size = size
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self._started, self.size, error=exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    """Shared stand-in returned while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+REGISTRY = Registry()
+_NOOP_SPAN = _NoopSpan()
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def stage(name: str, size: Optional[int] = None):
+    """
+    Time a block of code as a pipeline stage.
+
+    :param name: Dotted stage name, e.g. "response_builder.compose".
+    :param size: Payload size to record (can also be set on the span inside the block).
+    :return: A context manager.
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(REGISTRY, name, size)
+
+
+def event(name: str, size: Optional[int] = None) -> None:
+    """
+    Record one occurrence of a notable condition (e.g. a budget underflow) as a zero-duration stage.
+
+    :param size: A magnitude to record with it, reported as the payload size.
+    """
+    if _enabled:
+        REGISTRY.observe(name, 0.0, size)
+
+
+def instrumented(name: str, size: Optional[Callable[..., Optional[int]]] = None):
+    """
+    Decorate a function so every call is recorded as a stage.
+
+    :param name: Stage name.
+    :param size: Optional callable receiving the call's arguments and returning the payload size.
+                 By default the length of the first str argument after self is used.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            payload = size(*args, **kwargs) if size else _first_str_length(args)
+            with Span(REGISTRY, name, payload):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _first_str_length(args) -> Optional[int]:
+    for arg in args:
+        if isinstance(arg, str):
+            return len(arg)
+    return None
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def _summarize(metrics: StageMetrics) -> dict:
+    duration, size = metrics.duration, metrics.size
+    return {
+        "calls": duration.count,
+        "errors": metrics.errors,
+        "total_ms": _ms(duration.sum),
+        "mean_ms": _ms(duration.sum / duration.count) if duration.count else None,
+        "p50_ms": _ms(duration.quantile(0.5)),
+        "p95_ms": _ms(duration.quantile(0.95)),
+        "p99_ms": _ms(duration.quantile(0.99)),
+        "max_ms": _ms(duration.max),
+        "payload_avg": round(size.sum / size.count, 1) if size.count else None,
+        "payload_max": size.max,
+    }
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        _logger = get_logger("instrumentation", log_to_file=False)
+    return _logger
@@ -0,0 +1,65 @@
+"""
+Module: pattern_matcher
+
+This module provides a precompiled multi-pattern matcher that finds and counts several named regex patterns in one scan.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+
+class MultiPatternMatcher:
+    """
+    Compile named patterns into a single alternation of named groups.
+
+    One left-to-right scan attributes every match to the pattern that produced
+    it, instead of running (and re-scanning the text for) each pattern in turn.
+    When two patterns could match at the same position, the one listed first wins.
+    """
+
+    def __init__(self, patterns: Dict[str, str], flags: int = 0):
+        self.names = list(patterns)
+        self._groups = {f"p{i}": name for i, name in enumerate(self.names)}
+        self.regex = re.compile(
+            "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns.values())),
+            flags
+        )
+
+    @property
+    def max_width(self) -> Optional[int]:
+        """Longest possible match in characters, or None if a pattern is unbounded (e.g. uses + or *)."""
+        _, high = _sre_parse.parse(self.regex.pattern, self.regex.flags).getwidth()
+        return None if high >= _sre_parse.MAXREPEAT else high
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Tuple[str, re.Match]]:
+        """
+        Yield (pattern name, match) for every non-overlapping match, in text order.
+
+        :param text: The text to scan.
+        :param pos: Index to start scanning from; characters before it still count as context for \\b.
+        """
+        for match in self.regex.finditer(text, pos):
+            yield self._groups[match.lastgroup], match
+
+    def count(self, text: str) -> Counter:
+        """Return the number of matches per pattern name (names without matches are omitted)."""
+        return Counter(self._groups[match.lastgroup] for match in self.regex.finditer(text))
+
+    def found(self, text: str) -> Set[str]:
+        """Return the names of the patterns that occur in text."""
+        names = set()
+        for match in self.regex.finditer(text):
+            names.add(self._groups[match.lastgroup])
+            if len(names) == len(self.names):
+                break
+        return names
+
+    def sub(self, replacements: Dict[str, str], text: str) -> str:
+        """Replace each match with the replacement registered for its pattern name."""
+        return self.regex.sub(lambda match: replacements[self._groups[match.lastgroup]], text)
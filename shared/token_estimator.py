@@ -0,0 +1,68 @@
+"""
+Module: token_estimator
+
+This module estimates LLM token counts locally, without loading a tokenizer, and trims text to a token budget.
+"""
+
+import re
+
+# Words, runs of digits and single symbols are the units a BPE tokenizer rarely merges across.
+_PIECE_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+# Average characters per token for English words in common BPE vocabularies.
+CHARS_PER_TOKEN = 4
+
+ELLIPSIS = "…"
+
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, -(-len(piece) // CHARS_PER_TOKEN))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text.
+
+    Each word or digit run counts as ceil(len / 4) tokens and each symbol as one,
+    which errs slightly high for English prose so budgets are not overrun.
+    """
+    if not text:
+        return 0
+    return sum(_piece_tokens(match.group()) for match in _PIECE_PATTERN.finditer(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text at a piece boundary so its estimate, ellipsis included, fits max_tokens.
+
+    :return: The original text if it already fits, otherwise a prefix ending in "…" (or "" if nothing fits).
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - 1  # room for the ellipsis
+    used, end = 0, 0
+    for match in _PIECE_PATTERN.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > budget:
+            break
+        end = match.end()
+    return text[:end].rstrip() + ELLIPSIS if end else ""
+
+
+def tail_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Keep the end of text, cut at a piece boundary so its estimate fits max_tokens.
+
+    :return: The original text if it already fits, otherwise its longest fitting suffix.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    used, start = 0, len(text)
+    for match in reversed(list(_PIECE_PATTERN.finditer(text))):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            break
+        start = match.start()
+    return text[start:]
@@ -0,0 +1,21 @@
+import zlib
+
+import numpy as np
+
+
+class StubEncoder:
+    """Deterministic stand-in for SentenceTransformer that counts encode calls."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.calls = 0
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.calls += 1
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        vectors = np.array(
+            [np.random.default_rng(zlib.crc32(text.encode("utf-8"))).random(self.dim) for text in batch],
+            dtype="float32",
+        )
+        return vectors[0] if single else vectors
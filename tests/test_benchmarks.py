@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus import HashingEmbedder, generate_corpus
+from benchmarks.run_benchmarks import main
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(generate_corpus(20, seed=3), generate_corpus(20, seed=3))
+        self.assertNotEqual(generate_corpus(20, seed=3), generate_corpus(20, seed=4))
+
+    def test_hashing_embedder_is_normalized(self):
+        vectors = HashingEmbedder(dim=32).encode(["the tide came in", "the tide came in"])
+        self.assertEqual(vectors.shape, (2, 32))
+        self.assertAlmostEqual(float((vectors[0] ** 2).sum()), 1.0, places=5)
+        self.assertTrue((vectors[0] == vectors[1]).all())
+
+    def test_smoke_run_writes_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "bench.json")
+            main(["--sizes", "20,40", "--samples", "3", "--dim", "16", "--output", output])
+            with open(output, "r", encoding="utf-8") as f:
+                report = json.load(f)
+
+        operations = {(row["operation"], row["size"]) for row in report["results"]}
+        self.assertIn(("long_term.search", 40), operations)
+        self.assertIn(("hybrid_retriever.search", 40), operations)
+        self.assertIn(("response_builder.compose", 20), operations)
+        self.assertEqual(report["meta"]["sizes"], [20, 40])
+
+
+if __name__ == "__main__":
+    unittest.main()
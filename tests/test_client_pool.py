@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from companion.inference.client_pool import ClientPool
+
+
+class TestClientPool(unittest.TestCase):
+
+    def test_clients_are_reused(self):
+        factory = MagicMock(side_effect=lambda: object())
+        pool = ClientPool(factory, size=2)
+
+        clients = set()
+        for _ in range(5):
+            with pool.acquire() as client:
+                clients.add(id(client))
+
+        self.assertEqual(len(clients), 1)
+
+        self.assertEqual(factory.call_count, 1)
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["idle"], stats["in_use"], stats["acquisitions"]), (1, 1, 0, 5))
+
+    def test_acquire_waits_when_exhausted(self):
+        pool = ClientPool(object, size=1)
+        released = threading.Event()
+
+        def hold():
+            with pool.acquire():
+                released.wait(1)
+                time.sleep(0.05)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        while pool.stats()["in_use"] == 0:
+            time.sleep(0.001)
+        released.set()
+        with pool.acquire():
+            self.assertEqual(pool.stats()["in_use"], 1)
+        worker.join()
+
+        self.assertEqual(pool.stats()["waits"], 1)
+        self.assertEqual(pool.stats()["created"], 1)
+
+    def test_acquire_timeout(self):
+        pool = ClientPool(object, size=1)
+        with pool.acquire():
+            with self.assertRaises(TimeoutError):
+                with pool.acquire(timeout=0.01):
+                    pass
+
+    def test_factory_failure_frees_the_slot(self):
+        pool = ClientPool(MagicMock(side_effect=[RuntimeError("boom"), "client"]), size=1)
+        with self.assertRaises(RuntimeError):
+            with pool.acquire():
+                pass
+        with pool.acquire() as client:
+            self.assertEqual(client, "client")
+
+    def test_close_closes_idle_clients(self):
+        client = MagicMock()
+        pool = ClientPool(lambda: client, size=1)
+        with pool.acquire():
+            pass
+        pool.close()
+        client.close.assert_called_once()
+        self.assertEqual(pool.stats()["idle"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from companion.memory.embedding_cache import EmbeddingCache
+from companion.memory.long_term import LongTermMemory
+from stub_encoder import StubEncoder
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = StubEncoder(dim=4)
+
+    def test_encode_only_misses_and_counts(self):
+        cache = EmbeddingCache(dim=4)
+        first = cache.encode(["hello there", "goodbye"], self.encoder.encode)
+        second = cache.encode(["hello   there", "goodbye", "new phrase"], self.encoder.encode)
+
+        self.assertEqual(self.encoder.calls, 2)
+        np.testing.assert_array_equal(first[0], second[0])  # whitespace is normalized
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 3))
+        self.assertEqual(stats["hit_rate"], 0.4)
+
+    def test_duplicates_in_batch_are_encoded_once(self):
+        cache = EmbeddingCache(dim=4)
+        vectors = cache.encode(["same", "same", "other"], self.encoder.encode)
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = EmbeddingCache(dim=4, capacity=2)
+        cache.put("a", np.zeros(4))
+        cache.put("b", np.ones(4))
+        cache.get("a")
+        cache.put("c", np.ones(4))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "embeddings")
+            cache = EmbeddingCache(dim=4, capacity=1, path=path)
+            expected = cache.encode(["kept on disk", "evicted from memory"], self.encoder.encode)
+            cache.close()
+
+            reopened = EmbeddingCache(dim=4, capacity=1, path=path)
+            vectors = reopened.encode(["kept on disk"], self.encoder.encode)
+            reopened.close()
+
+            self.assertEqual(self.encoder.calls, 1)
+            np.testing.assert_array_equal(vectors[0], expected[0])
+            self.assertEqual(reopened.stats()["disk_hits"], 1)
+
+    def test_disk_tier_is_discarded_for_another_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "embeddings")
+            cache = EmbeddingCache(dim=4, path=path, model_name="model-a")
+            cache.encode(["shared text"], self.encoder.encode)
+            cache.close()
+
+            other = EmbeddingCache(dim=4, path=path, model_name="model-b")
+            self.assertIsNone(other.get("shared text"))
+            self.assertEqual(other.stats()["disk_entries"], 0)
+            other.close()
+
+    def test_long_term_rejects_cache_of_another_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                LongTermMemory(path=os.path.join(tmp, "faiss.index"), dim=4, model_name="model-a",
+                               embedding_cache=EmbeddingCache(dim=4, model_name="model-b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
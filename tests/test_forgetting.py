@@ -0,0 +1,44 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from companion.memory.forgetting import AnyPolicy, CapacityPolicy, IdlePolicy, TTLPolicy
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def entry(created_days_ago, accessed_days_ago, usage_count):
+    return {
+        "created_at": (NOW - timedelta(days=created_days_ago)).isoformat(),
+        "last_accessed": (NOW - timedelta(days=accessed_days_ago)).isoformat(),
+        "usage_count": usage_count,
+    }
+
+
+ENTRIES = [
+    ("0", entry(9, 9, 1)),
+    ("1", entry(9, 1, 5)),
+    ("2", entry(2, 2, 1)),
+    ("3", entry(1, 0, 3)),
+]
+
+
+class TestForgettingPolicies(unittest.TestCase):
+
+    def test_ttl_policy(self):
+        self.assertEqual(TTLPolicy(ttl=5 * 86400).select(ENTRIES, NOW), ["0", "1"])
+        self.assertEqual(TTLPolicy(ttl=5 * 86400, field="last_accessed").select(ENTRIES, NOW), ["0"])
+
+    def test_idle_policy_spares_frequently_used_memories(self):
+        self.assertEqual(IdlePolicy(max_idle=86400, min_usage=2).select(ENTRIES, NOW), ["0", "2"])
+
+    def test_capacity_policy_forgets_least_used_then_least_recent(self):
+        self.assertEqual(CapacityPolicy(max_memories=2).select(ENTRIES, NOW), ["0", "2"])
+        self.assertEqual(CapacityPolicy(max_memories=10).select(ENTRIES, NOW), [])
+
+    def test_any_policy_unions_without_duplicates(self):
+        policy = AnyPolicy(TTLPolicy(ttl=5 * 86400), CapacityPolicy(max_memories=2))
+        self.assertEqual(policy.select(ENTRIES, NOW), ["0", "1", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
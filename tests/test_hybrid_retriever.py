@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from companion.memory import model_registry
+from companion.memory.hybrid_retriever import HybridRetriever
+from companion.memory.long_term import LongTermMemory
+from stub_encoder import StubEncoder
+
+
+class TestHybridRetriever(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        model_registry.register_model("stub", StubEncoder())
+        self.long_term = LongTermMemory(path=os.path.join(self.tmp.name, "faiss.index"), dim=8, model_name="stub")
+        self.long_term.add_many([f"an ordinary evening by the water, number {i}" for i in range(200)]
+                                + ["the letter from Zephyrine arrived", "Zephyrine never wrote again"])
+        self.retriever = HybridRetriever(self.long_term)
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_rare_term_takes_lexical_fast_path(self):
+        with patch.object(self.long_term, "search_ids", wraps=self.long_term.search_ids) as search_ids:
+            results = self.retriever.search("what did Zephyrine say", top_k=2)
+
+        self.assertEqual(sorted(results), ["Zephyrine never wrote again", "the letter from Zephyrine arrived"])
+        search_ids.assert_not_called()
+        self.assertEqual(self.retriever.stats()["lexical_only"], 1)
+
+    def test_common_query_fuses_vector_and_lexical_rankings(self):
+        with patch.object(self.long_term, "search_ids", wraps=self.long_term.search_ids) as search_ids:
+            results = self.retriever.search("an ordinary evening by the water, number 42", top_k=3)
+
+        search_ids.assert_called_once()
+        self.assertEqual(results[0], "an ordinary evening by the water, number 42")
+        self.assertEqual(len(results), 3)
+
+    def test_indexes_new_memories_and_skips_deleted_ones(self):
+        self.retriever.search("water", top_k=1)
+        self.long_term.add("Zephyrine's last postcard")
+        self.long_term.delete([200])
+
+        results = self.retriever.search("Zephyrine", top_k=3)
+        self.assertNotIn("the letter from Zephyrine arrived", results)
+        self.assertIn("Zephyrine's last postcard", results)
+        self.assertEqual(self.retriever.lexical_index.watermark, 203)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from companion.inference.response_cache import ResponseCache
+from companion.inference.inference_router import InferenceRouter, LLAMA3_8B_MODEL, LOCAL_PROVIDER
+from companion.memory import model_registry
+from stub_encoder import StubEncoder
+
+
+class StubLlamaHandler(BaseHTTPRequestHandler):
+    """Answers /infer after an optional delay; streams NDJSON when the body asks for it."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            time.sleep(server.delay)
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for word in body["prompt"].split():
+                    self.wfile.write((json.dumps({"text": word + " "}) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+            else:
+                payload = json.dumps({"text": body["prompt"].upper()}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and closed the connection
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestInferenceRouterAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubLlamaHandler)
+        self.server.lock = threading.Lock()
+        self.server.active = self.server.peak = 0
+        self.server.delay = 0.0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/infer"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def router(self, **kwargs):
+        return InferenceRouter(llama_url=self.url, **kwargs)
+
+    def test_aprompt_local(self):
+        async def run():
+            router = self.router()
+            try:
+                return await router.aprompt("hold the line", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)
+            finally:
+                await router.aclose()
+
+        self.assertEqual(asyncio.run(run()), "HOLD THE LINE")
+
+    def test_concurrency_limit_is_respected(self):
+        self.server.delay = 0.05
+
+        async def run():
+            router = self.router(concurrency_limits={LOCAL_PROVIDER: 2})
+            try:
+                return await asyncio.gather(*(
+                    router.aprompt(f"prompt {i}", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER) for i in range(6)
+                ))
+            finally:
+                await router.aclose()
+
+        results = asyncio.run(run())
+        self.assertEqual(results, [f"PROMPT {i}" for i in range(6)])
+        self.assertEqual(self.server.peak, 2)
+
+    def test_timeout_returns_empty_string(self):
+        self.server.delay = 0.5
+
+        async def run():
+            router = self.router(timeouts={LOCAL_PROVIDER: 0.05})
+            try:
+                return await router.aprompt("too slow", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)
+            finally:
+                await router.aclose()
+
+        self.assertEqual(asyncio.run(run()), "")
+
+    def test_astream_yields_chunks(self):
+        async def run():
+            router = self.router()
+            try:
+                return [chunk async for chunk in router.astream("one two three", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)]
+            finally:
+                await router.aclose()
+
+        self.assertEqual(asyncio.run(run()), ["one ", "two ", "three "])
+
+    def test_router_survives_new_event_loop(self):
+        router = self.router()
+        clients = []
+
+        async def run():
+            response = await router.aprompt("again", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)
+            clients.append(router._clients())
+            return response
+
+        for _ in range(2):
+            self.assertEqual(asyncio.run(run()), "AGAIN")
+
+        self.assertIsNot(clients[0], clients[1])
+        self.assertTrue(all(loop_clients.http.is_closed for loop_clients in clients))  # closed as each loop shut down
+
+    def test_aclose_closes_clients_of_running_loop(self):
+        async def run():
+            router = self.router()
+            await router.aprompt("done", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)
+            clients = router._clients()
+            await router.aclose()
+            return clients
+
+        clients = asyncio.run(run())
+        self.assertTrue(clients.http.is_closed)
+
+    def test_prompt_local_reuses_pooled_session(self):
+        router = self.router(pool_sizes={LOCAL_PROVIDER: 2})
+        for _ in range(3):
+            self.assertEqual(router.prompt("steady", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER), "STEADY")
+
+        stats = router.pool_stats()[LOCAL_PROVIDER]
+        self.assertEqual((stats["created"], stats["acquisitions"], stats["in_use"]), (1, 3, 0))
+        router.close()
+
+    def test_response_cache_skips_repeat_calls(self):
+        router = self.router(response_cache=ResponseCache())
+        for _ in range(3):
+            self.assertEqual(router.prompt("echo", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER), "ECHO")
+        self.assertEqual(asyncio.run(router.aprompt("echo", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)), "ECHO")
+
+        self.assertEqual(router.pool_stats()[LOCAL_PROVIDER]["acquisitions"], 1)
+        self.assertEqual(router.response_cache.stats()["hits"], 3)
+
+    def test_semantic_cache_encodes_a_missed_prompt_once(self):
+        encoder = StubEncoder(dim=8)
+        model_registry.register_model("stub-router", encoder)
+        try:
+            async def run():
+                router = self.router(response_cache=ResponseCache(semantic_threshold=0.99, model_name="stub-router"))
+                try:
+                    first = await router.aprompt("quiet shore", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)
+                    second = await router.aprompt("quiet shore", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)
+                    return first, second
+                finally:
+                    await router.aclose()
+
+            self.assertEqual(asyncio.run(run()), ("QUIET SHORE", "QUIET SHORE"))
+            self.assertEqual(encoder.calls, 1)  # the second call is an exact hit
+        finally:
+            model_registry.unload("stub-router")
+
+    def test_identical_concurrent_requests_share_one_call(self):
+        self.server.delay = 0.1
+        router = self.router()
+
+        async def run():
+            return await asyncio.gather(*(
+                router.aprompt("same", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER) for _ in range(5)
+            ), router.aprompt("other", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER))
+
+        self.assertEqual(asyncio.run(run()), ["SAME"] * 5 + ["OTHER"])
+        self.assertEqual(router.coalescing_stats()["async"]["coalesced"], 4)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: router.prompt("sync", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER), range(4)))
+        self.assertEqual(results, ["SYNC"] * 4)
+        self.assertLess(router.pool_stats()[LOCAL_PROVIDER]["acquisitions"], 4)
+
+    def test_identical_requests_on_separate_event_loops(self):
+        self.server.delay = 0.1
+        router = self.router()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(
+                lambda _: asyncio.run(router.aprompt("same", LLAMA3_8B_MODEL, provider=LOCAL_PROVIDER)), range(2)))
+        self.assertEqual(results, ["SAME"] * 2)
+        self.assertEqual(router.coalescing_stats()["async"], {"calls": 2, "executions": 2, "coalesced": 0, "in_flight": 0})
+
+    def test_unsupported_provider(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.router().aprompt("x", LLAMA3_8B_MODEL, provider="other"))
+
+
+if __name__ == "__main__":
+    unittest.main()
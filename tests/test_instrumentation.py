@@ -0,0 +1,105 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from shared import instrumentation
+from shared.instrumentation import Histogram, Registry, instrumented, stage
+from whisper_engine.alignment.drift_detector import DriftDetector
+from whisper_engine.response_builder import ResponseBuilder
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_quantile_interpolates_within_bucket(self):
+        histogram = Histogram((1, 2, 4))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 0])
+        self.assertAlmostEqual(histogram.quantile(0.5), 1.5)
+        self.assertEqual(histogram.quantile(1.0), 3.0)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.REGISTRY.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.REGISTRY.reset()
+
+    def test_disabled_records_nothing(self):
+        instrumentation.disable()
+        with stage("quiet") as span:
+            span.size = 10
+        DriftDetector().analyze("I cannot answer that")
+        self.assertEqual(instrumentation.REGISTRY.snapshot(), {})
+
+    def test_stage_records_calls_sizes_and_errors(self):
+        with stage("unit", 12):
+            pass
+        with self.assertRaises(ValueError):
+            with stage("unit"):
+                raise ValueError("boom")
+
+        summary = instrumentation.REGISTRY.snapshot()["unit"]
+        self.assertEqual((summary["calls"], summary["errors"], summary["payload_max"]), (2, 1, 12))
+
+    def test_instrumented_uses_first_string_argument(self):
+        @instrumented("echo")
+        def echo(prefix, text):
+            return text
+
+        echo(3, "hello")
+        self.assertEqual(instrumentation.REGISTRY.snapshot()["echo"]["payload_avg"], 5.0)
+
+    def test_pipeline_stages_are_recorded(self):
+        memory_core = MagicMock()
+        memory_core.get_loop_patterns.return_value = []
+        memory_core.recent.return_value = [{"content": "He waited."}]
+        memory_core.meta_memory.retrieve_by_mirror_id.return_value = []
+
+        ResponseBuilder(memory_core).compose("Still here?", "mirror_1")
+        DriftDetector().analyze("I'm Claude")
+
+        stages = set(instrumentation.REGISTRY.snapshot())
+        self.assertTrue({"response_builder.compose", "response_builder.context", "response_builder.reflection",
+                         "response_builder.persona", "drift_detector.analyze"} <= stages)
+
+    def test_budget_underflow_is_recorded_as_event(self):
+        memory_core = MagicMock()
+        memory_core.get_loop_patterns.return_value = []
+        memory_core.recent.return_value = []
+        memory_core.meta_memory.retrieve_by_mirror_id.return_value = []
+
+        with patch("builtins.print") as printed:
+            ResponseBuilder(memory_core).compose("Still here?", "mirror_1", token_budget=1)
+
+        underflow = instrumentation.REGISTRY.snapshot()["response_builder.budget_underflow"]
+        self.assertEqual(underflow["calls"], 1)
+        self.assertGreater(underflow["payload_max"], 0)
+        printed.assert_not_called()
+
+    def test_exports(self):
+        registry = Registry(duration_buckets=(0.1, 1.0), size_buckets=(10,))
+        registry.observe("route", 0.05, size=4)
+        registry.observe("route", 0.5, error=True)
+
+        self.assertEqual(json.loads(registry.to_json())["route"]["calls"], 2)
+        text = registry.to_prometheus()
+        self.assertIn('companion_stage_duration_seconds_bucket{stage="route",le="0.1"} 1', text)
+        self.assertIn('companion_stage_duration_seconds_bucket{stage="route",le="+Inf"} 2', text)
+        self.assertIn('companion_stage_payload_size_count{stage="route"} 1', text)
+        self.assertIn('companion_stage_errors_total{stage="route"} 1', text)
+
+    def test_emit_uses_shared_logger(self):
+        instrumentation.REGISTRY.observe("route", 0.01)
+        logger = MagicMock()
+        with patch.object(instrumentation, "_get_logger", return_value=logger):
+            instrumentation.REGISTRY.emit()
+        self.assertIn("route: calls=1", logger.info.call_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
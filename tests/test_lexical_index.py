@@ -0,0 +1,40 @@
+import unittest
+
+from companion.memory.lexical_index import LexicalIndex, tokenize
+
+
+class TestLexicalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = LexicalIndex()
+        for memory_id, text in enumerate([
+            "The lighthouse keeper named Orrin waved.",
+            "Rain on the lighthouse window.",
+            "The window stayed open all night.",
+            "Orrin, Orrin, Orrin again.",
+        ]):
+            self.index.add(memory_id, text)
+
+    def test_tokenize_lowercases_words(self):
+        self.assertEqual(tokenize("Orrin's Light-house, 2 AM"), ["orrin", "s", "light", "house", "2", "am"])
+
+    def test_bm25_ranks_rare_and_repeated_terms_first(self):
+        ranked = self.index.search(tokenize("Orrin lighthouse"), top_k=4)
+        self.assertEqual([memory_id for memory_id, _ in ranked], [0, 3, 1])
+        self.assertGreater(self.index.idf("orrin"), self.index.idf("the"))
+
+    def test_common_terms_are_skipped_when_rarer_terms_match(self):
+        # "the" is in 3 of 4 memories, so only "rain" is scored.
+        self.assertEqual([memory_id for memory_id, _ in self.index.search(tokenize("the rain"))], [1])
+        self.assertEqual(len(self.index.search(tokenize("the"))), 3)
+
+    def test_remove_updates_postings_and_lengths(self):
+        self.index.remove(3, "Orrin, Orrin, Orrin again.")
+        self.assertEqual(len(self.index), 3)
+        self.assertNotIn("again", self.index.postings)
+        self.assertEqual([memory_id for memory_id, _ in self.index.search(["orrin"])], [0])
+        self.assertEqual(self.index.total_length, 6 + 5 + 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,300 @@
+import os
+import pickle
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import faiss
+
+from companion.memory import model_registry
+from companion.memory.long_term import LongTermMemory, PERSIST_WAL
+from companion.memory.vector_index import INDEX_AUTO, INDEX_FLAT, INDEX_HNSW, INDEX_IVF_FLAT, index_type_of
+from stub_encoder import StubEncoder
+
+
+class TestLongTermMemoryWal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "faiss.index")
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_adds_append_to_log_without_snapshot(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL)
+        memory.add_many(["first light", "second tide"])
+        memory.add("third echo")
+        memory.close()
+
+        self.assertFalse(os.path.exists(self.path))
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL)
+        self.assertEqual(reloaded.index.ntotal, 3)
+        self.assertEqual(reloaded.next_id, 3)
+        self.assertEqual(reloaded.mem_map[2], "third echo")
+        self.assertEqual(reloaded.search("second tide", top_k=1), ["second tide"])
+
+    def test_checkpoint_threshold_compacts_log(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL, checkpoint_every=2)
+        memory.add_many(["a memory", "another memory"])
+        memory.add("after checkpoint")
+        memory.close()
+
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(len(memory.wal.segments()), 1)
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL)
+        self.assertEqual(reloaded.index.ntotal, 3)
+        self.assertEqual(reloaded.mem_map, {0: "a memory", 1: "another memory", 2: "after checkpoint"})
+
+    def test_background_checkpoint(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL,
+                                checkpoint_every=1, background_checkpoint=True)
+        memory.add_many([f"memory {i}" for i in range(5)])
+        memory.close()
+        memory.save()
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL)
+        self.assertEqual(reloaded.index.ntotal, 5)
+        self.assertEqual(reloaded.wal.segments(), [])
+
+
+class TestLongTermMemoryFastStart(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "faiss.index")
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_maps_index(self):
+        LongTermMemory(path=self.path, dim=8, model_name="stub").add_many(["amber", "basalt", "cobalt"])
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", fast_start=True)
+        self.assertTrue(reloaded._index_mapped)
+        self.assertEqual(reloaded.next_id, 3)
+
+        self.assertEqual(reloaded.search("basalt", top_k=1), ["basalt"])
+        self.assertTrue(reloaded._index_mapped)
+
+    def test_first_write_copies_index(self):
+        LongTermMemory(path=self.path, dim=8, model_name="stub").add_many(["amber", "basalt"])
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", fast_start=True)
+        reloaded.add("cobalt")
+        self.assertFalse(reloaded._index_mapped)
+        self.assertEqual(reloaded.mem_map, {0: "amber", 1: "basalt", 2: "cobalt"})
+
+        again = LongTermMemory(path=self.path, dim=8, model_name="stub", fast_start=True)
+        self.assertEqual(again.index.ntotal, 3)
+        self.assertEqual(again.search("cobalt", top_k=1), ["cobalt"])
+
+    def test_wal_replay_appends_unflushed_texts(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL)
+        memory.add_many(["amber", "basalt"])
+        memory.checkpoint()
+        memory.add("cobalt")
+        memory.close()
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL,
+                                  fast_start=True)
+        self.assertEqual(reloaded.index.ntotal, 3)
+        self.assertEqual(reloaded.next_id, 3)
+        self.assertEqual(reloaded.texts.persisted, 2)
+        self.assertEqual(reloaded.mem_map, {0: "amber", 1: "basalt", 2: "cobalt"})
+        reloaded.close()
+
+
+class TestLongTermMemoryTextStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "faiss.index")
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_migrates_pickled_mem_map(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        memory.add_many(["amber", "basalt"])
+        os.remove(self.path + ".texts")
+        os.remove(self.path + ".texts.idx")
+        with open(self.path + ".mem", "wb") as f:
+            pickle.dump(({0: "amber", 1: "basalt"}, 2), f)
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        self.assertFalse(os.path.exists(self.path + ".mem"))
+        self.assertEqual(reloaded.texts.persisted, 2)
+        self.assertEqual(reloaded.search("basalt", top_k=1), ["basalt"])
+
+    def test_texts_beyond_the_index_are_dropped(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        memory.add_many(["amber", "basalt"])
+        memory.texts.append(["orphan"])
+        memory.texts.flush()
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        self.assertEqual(len(reloaded.texts), 2)
+        reloaded.add("cobalt")
+        self.assertEqual(reloaded.mem_map[2], "cobalt")
+
+
+class TestLongTermMemoryDeletion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "faiss.index")
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_deleted_memories_leave_search_and_survive_reload(self):
+        for index_type in (INDEX_FLAT, INDEX_HNSW):
+            path = os.path.join(self.tmp.name, f"{index_type}.index")
+            memory = LongTermMemory(path=path, dim=8, model_name="stub", index_type=index_type, compact_ratio=None)
+            memory.add_many(["amber", "basalt", "cobalt"])
+            self.assertEqual(memory.delete([1, 1, 9]), [1])
+
+            self.assertEqual(sorted(memory.search("basalt", top_k=3)), ["amber", "cobalt"])
+            self.assertEqual(memory.index.ntotal, 3)
+
+            reloaded = LongTermMemory(path=path, dim=8, model_name="stub", index_type=index_type)
+            self.assertEqual(reloaded.deleted, {1})
+            self.assertNotIn("basalt", reloaded.search("basalt", top_k=3))
+            self.assertEqual(reloaded.add_many(["dune"]), [3])
+
+    def test_deletes_on_ivf_index_and_compaction_falls_back_to_flat(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", index_type=INDEX_IVF_FLAT,
+                                compact_ratio=None)
+        memory.add_many([f"memory number {i}" for i in range(1000)])
+        self.assertEqual(index_type_of(memory.index), INDEX_IVF_FLAT)
+
+        memory.delete([500])
+        self.assertNotIn("memory number 500", memory.search("memory number 500", top_k=3))
+        memory.delete(range(10))
+        memory.compact()
+        self.assertEqual(index_type_of(memory.index), INDEX_FLAT)
+        self.assertEqual(memory.index.ntotal, 989)
+        self.assertEqual(memory.search("memory number 999", top_k=1), ["memory number 999"])
+
+    def test_compaction_keeps_ids_and_reclaims_space(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", compact_ratio=0.5)
+        memory.add_many([f"memory {i}" for i in range(4)])
+        memory.delete([0])
+        self.assertEqual(memory.index.ntotal, 4)
+
+        memory.delete([3])  # half of the index is now deleted
+        self.assertEqual(memory.index.ntotal, 2)
+        self.assertEqual(memory.deleted, set())
+        self.assertEqual(memory.search("memory 2", top_k=1), ["memory 2"])
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        self.assertEqual(dict(reloaded.mem_map), {1: "memory 1", 2: "memory 2"})
+        self.assertEqual(reloaded.next_id, 4)
+        reloaded.add("memory 4")
+        self.assertEqual(reloaded.search("memory 4", top_k=1), ["memory 4"])
+        self.assertEqual(reloaded.mem_map[4], "memory 4")
+
+    def test_concurrent_searches_after_delete(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", compact_ratio=None)
+        memory.add_many([f"memory number {i}" for i in range(4000)])
+        memory.delete(range(0, 4000, 2))
+
+        def search(worker):
+            return [memory_id for i in range(200)
+                    for memory_id in memory.search_ids(f"memory number {worker * 200 + i}", top_k=5)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            found = [memory_id for ids in pool.map(search, range(8)) for memory_id in ids]
+        self.assertEqual(len(found), 8 * 200 * 5)
+        self.assertTrue(all(memory_id % 2 for memory_id in found))
+
+    def test_compaction_crash_after_index_write_keeps_deletes(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", compact_ratio=0.5)
+        memory.add_many(["amber", "basalt", "cobalt", "dune"])
+        memory.delete([0])
+
+        def crash(path, data):
+            write_atomic(path, data)
+            raise SystemExit("crashed after writing the index")
+
+        write_atomic = LongTermMemory._write_atomic
+        with patch.object(LongTermMemory, "_write_atomic", side_effect=crash), self.assertRaises(SystemExit):
+            memory.delete([1])  # half of the index is now deleted
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        self.assertEqual(dict(reloaded.mem_map), {2: "cobalt", 3: "dune"})
+        self.assertEqual(reloaded.index.ntotal, 2)
+
+    def test_wal_replays_deletes(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL,
+                                compact_ratio=None)
+        memory.add_many(["amber", "basalt", "cobalt"])
+        memory.checkpoint()
+        memory.delete([0])
+        memory.add("dune")
+        memory.delete([3])
+        memory.close()
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", persistence=PERSIST_WAL)
+        self.assertEqual(dict(reloaded.mem_map), {1: "basalt", 2: "cobalt"})
+        self.assertEqual(reloaded.deleted, {0, 3})
+        self.assertEqual(reloaded.next_id, 4)
+        reloaded.compact()
+        self.assertEqual(reloaded.index.ntotal, 2)
+        reloaded.close()
+
+    def test_migrates_positional_index(self):
+        legacy = faiss.IndexFlatL2(8)
+        legacy.add(model_registry.get_model("stub").encode(["amber", "basalt"]))
+        faiss.write_index(legacy, self.path)
+        with open(self.path + ".mem", "wb") as f:
+            pickle.dump(({0: "amber", 1: "basalt"}, 2), f)
+
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub")
+        self.assertIsInstance(memory.index, faiss.IndexIDMap2)
+        self.assertEqual(memory.search("basalt", top_k=1), ["basalt"])
+        memory.delete([0])
+        self.assertNotIn("amber", memory.search("amber", top_k=2))
+
+
+class TestLongTermMemoryIndexPromotion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "faiss.index")
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_auto_index_promotes_and_keeps_ids(self):
+        memory = LongTermMemory(path=self.path, dim=8, model_name="stub", index_type=INDEX_AUTO,
+                                promotion_thresholds={INDEX_IVF_FLAT: 1200})
+        memory.add_many([f"memory number {i}" for i in range(1000)])
+        self.assertEqual(index_type_of(memory.index), INDEX_FLAT)
+
+        memory.add_many([f"memory number {i}" for i in range(1000, 1300)])
+        self.assertEqual(index_type_of(memory.index), INDEX_IVF_FLAT)
+        self.assertEqual(memory.index.ntotal, 1300)
+        self.assertEqual(memory.search("memory number 1250", top_k=1), ["memory number 1250"])
+
+        reloaded = LongTermMemory(path=self.path, dim=8, model_name="stub", index_type=INDEX_AUTO,
+                                  promotion_thresholds={INDEX_IVF_FLAT: 1200})
+        self.assertEqual(index_type_of(reloaded.index), INDEX_IVF_FLAT)
+
+
+if __name__ == "__main__":
+    unittest.main()
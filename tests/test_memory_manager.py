@@ -0,0 +1,203 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from companion.memory import model_registry
+from companion.memory.forgetting import CapacityPolicy, TTLPolicy
+from companion.memory.memory_manager import RETRIEVAL_HYBRID, MemoryManager
+from stub_encoder import StubEncoder
+
+
+class TestMemoryManagerBatchedIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.encoder = StubEncoder()
+        resolve = lambda name: os.path.join(self.tmp.name, name)
+        self.patches = [
+            patch("companion.memory.long_term.resolve_memory_path", side_effect=resolve),
+            patch("companion.memory.meta_memory.resolve_memory_path", side_effect=resolve),
+            patch("companion.memory.short_term.resolve_memory_path", side_effect=resolve),
+        ]
+        for p in self.patches:
+            p.start()
+        model_registry.register_model("stub", self.encoder)
+        self.manager = MemoryManager(dim=8, model_name="stub")
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_add_many_encodes_once_and_assigns_ids(self):
+        texts = ["first light", "second tide", "third echo"]
+        with patch.object(self.manager.long_term, "save", wraps=self.manager.long_term.save) as save, \
+                patch.object(self.manager.meta_memory, "save", wraps=self.manager.meta_memory.save) as meta_save:
+            ids = self.manager.add_many(texts, metadata={"label": "manual"})
+
+        self.assertEqual(ids, [0, 1, 2])
+        self.assertEqual(self.encoder.calls, 1)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(meta_save.call_count, 1)
+        self.assertEqual(self.manager.long_term.index.ntotal, 3)
+        self.assertEqual(self.manager.meta_memory.get(2)["label"], "manual")
+        self.assertEqual(len(self.manager.recent(5)), 3)
+
+    def test_add_many_matches_sequential_add(self):
+        self.manager.add_many(["quiet harbor", "open window"])
+        self.manager.add("distant bell")
+
+        self.assertEqual(self.manager.long_term.mem_map, {0: "quiet harbor", 1: "open window", 2: "distant bell"})
+        self.assertEqual(self.manager.search("open window", k=1), ["open window"])
+
+    def test_add_many_per_item_metadata_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.manager.add_many(["a", "b"], metadata=[{"emotion": "calm"}])
+
+    def test_add_many_forwards_mirror_id(self):
+        self.manager.add_many(["harbor light", "open window"], metadata=[{"mirror_id": "mirror_1"}, {}])
+        self.manager.add("distant bell", mirror_id="mirror_2")
+
+        self.assertEqual(self.manager.meta_memory.retrieve_by_mirror_id("mirror_1"), ["harbor light"])
+        self.assertEqual(self.manager.meta_memory.retrieve_by_mirror_id("mirror_2"), ["distant bell"])
+
+    def test_add_many_rejects_unknown_metadata_keys(self):
+        with self.assertRaises(ValueError):
+            self.manager.add_many(["a"], metadata={"mirror": "mirror_1"})
+        self.assertEqual(self.manager.long_term.next_id, 0)
+
+
+class TestMemoryManagerLoopPatterns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        resolve = lambda name: os.path.join(self.tmp.name, name)
+        self.patches = [
+            patch("companion.memory.long_term.resolve_memory_path", side_effect=resolve),
+            patch("companion.memory.meta_memory.resolve_memory_path", side_effect=resolve),
+            patch("companion.memory.short_term.resolve_memory_path", side_effect=resolve),
+        ]
+        for p in self.patches:
+            p.start()
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_counts_are_incremental_and_persisted(self):
+        manager = MemoryManager(dim=8, model_name="stub")
+        manager.add_many(["Longing and silence.", "More silence, then regret."])
+        manager.add("Silence again")
+        self.assertEqual(manager.get_loop_patterns(2), ["silence", "longing"])
+
+        reloaded = MemoryManager(dim=8, model_name="stub")
+        with patch.object(reloaded.theme_counter, "add", wraps=reloaded.theme_counter.add) as add:
+            self.assertEqual(reloaded.get_loop_patterns(), ["silence", "longing", "regret"])
+        add.assert_not_called()
+
+    def test_catches_up_on_memories_added_directly(self):
+        manager = MemoryManager(dim=8, model_name="stub")
+        manager.long_term.add("withdrawal withdrawal")
+        self.assertEqual(manager.get_loop_patterns(), ["withdrawal"])
+
+    def test_custom_whitelist_rebuilds_counts(self):
+        MemoryManager(dim=8, model_name="stub").add("silence under the bridge")
+
+        manager = MemoryManager(dim=8, model_name="stub", theme_whitelist={"bridge"})
+        self.assertEqual(manager.get_loop_patterns(), ["bridge"])
+
+
+class TestMemoryManagerForgetting(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_delete_keeps_layers_consistent(self):
+        manager = MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name)
+        manager.add_many(["Longing at dusk.", "Silence in the hall.", "Silence again."])
+
+        self.assertEqual(manager.delete([0, 1]), [0, 1])
+        self.assertEqual(manager.search("Silence in the hall.", k=3), ["Silence again."])
+        self.assertIsNone(manager.meta_memory.get(0))
+        self.assertEqual([entry["content"] for entry in manager.recent(5)], ["Silence again."])
+        self.assertEqual(manager.get_loop_patterns(), ["silence"])
+
+        reloaded = MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name)
+        self.assertEqual(reloaded.get_loop_patterns(), ["silence"])
+        self.assertEqual(reloaded.search("Longing at dusk.", k=3), ["Silence again."])
+
+    def test_delete_keeps_duplicate_thoughts_and_responses(self):
+        manager = MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name)
+        manager.add("Echo.")
+        manager.add_many(["Echo."])
+        manager.short_term.add_response("Echo.")
+        manager.short_term.add("Echo.")  # saved before thoughts carried memory ids
+        manager.short_term.add("Echo.")
+
+        manager.delete([0])
+        self.assertEqual([entry.get("memory_id") for entry in manager.recent(5)], [1, None, None, None])
+        self.assertEqual(manager.recent(5)[1]["role"], manager.short_term.default_agent)
+
+        manager.short_term.buffer.popleft()
+        manager.delete([1])
+        self.assertEqual(len(manager.recent(5)), 2)  # one untagged thought goes with memory 1
+
+    def test_forget_applies_policy_to_meta_entries(self):
+        manager = MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name,
+                                forgetting_policy=CapacityPolicy(max_memories=2), forget_every=3)
+        manager.add_many(["first", "second"])
+        manager.meta_memory.record(0)  # used twice, so it outranks "second"
+        manager.add("third")
+
+        self.assertEqual(dict(manager.long_term.mem_map), {0: "first", 2: "third"})
+        self.assertEqual(sorted(mid for mid, _ in manager.meta_memory.entries()), ["0", "2"])
+        self.assertEqual(manager.forget(TTLPolicy(ttl=0), now=datetime.now(timezone.utc) + timedelta(seconds=1)),
+                         [0, 2])
+        self.assertEqual(len(manager.long_term.mem_map), 0)
+
+    def test_empty_sqlite_meta_memory_still_records(self):
+        manager = MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name, meta_backend="sqlite",
+                                forgetting_policy=CapacityPolicy(max_memories=1))
+        manager.add_many(["first", "second"])
+
+        self.assertEqual(len(manager.meta_memory), 2)
+        self.assertEqual(manager.forget(), [0])
+
+
+class TestMemoryManagerHybridSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        model_registry.register_model("stub", StubEncoder())
+
+    def tearDown(self):
+        model_registry.unload("stub")
+        self.tmp.cleanup()
+
+    def test_hybrid_search_follows_adds_and_deletes(self):
+        manager = MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name, retrieval=RETRIEVAL_HYBRID)
+        manager.add_many(["Orrin kept the lighthouse.", "Rain on the window.", "A quiet harbor."])
+        self.assertEqual(manager.search("Orrin", k=1), ["Orrin kept the lighthouse."])
+
+        manager.delete([0])
+        self.assertNotIn(0, manager.retriever.lexical_index.doc_lengths)
+        self.assertNotIn("Orrin kept the lighthouse.", manager.search("Orrin", k=3))
+
+    def test_rejects_unknown_retrieval_mode(self):
+        with self.assertRaises(ValueError):
+            MemoryManager(dim=8, model_name="stub", memory_dir=self.tmp.name, retrieval="keyword")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+
+from companion.memory.meta_memory import MetaMemory, UsageRanking
+
+
+class TestMetaMemoryMirrorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "meta_memory.json")
+        self.meta = MetaMemory(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_retrieve_by_mirror_id_most_recent_first(self):
+        self.meta.record_many([
+            {"memory_id": 1, "content": "first", "mirror_id": "m1"},
+            {"memory_id": 2, "content": "second", "mirror_id": "m1"},
+            {"memory_id": 3, "content": "third", "mirror_id": "m1"},
+            {"memory_id": 4, "content": "other", "mirror_id": "m2"},
+        ])
+        self.meta.record(1)
+
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1"), ["first", "third", "second"])
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1", n=1), ["first"])
+        self.assertEqual(self.meta.retrieve_by_mirror_id("missing"), [])
+
+    def test_changing_mirror_moves_entry(self):
+        self.meta.record(1, content="wanderer", mirror_id="m1")
+        self.meta.record(1, mirror_id="m2")
+
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1"), [])
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m2"), ["wanderer"])
+
+    def test_index_rebuilt_on_load(self):
+        self.meta.record(1, content="older", mirror_id="m1")
+        self.meta.record(2, content="newer", mirror_id="m1")
+
+        reloaded = MetaMemory(self.path)
+        self.assertEqual(reloaded.retrieve_by_mirror_id("m1"), ["newer", "older"])
+
+
+class TestMetaMemoryUsageRanking(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "meta_memory.json")
+        self.meta = MetaMemory(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_top_used_tracks_increments(self):
+        self.meta.record_many({"memory_id": i, "content": f"memory {i}"} for i in range(4))
+        for memory_id, uses in ((2, 3), (0, 1)):
+            for _ in range(uses):
+                self.meta.record(memory_id)
+
+        top = self.meta.get_top_used(2)
+        self.assertEqual([mid for mid, _ in top], ["2", "0"])
+        self.assertEqual(top[0][1]["usage_count"], 4)
+        self.assertEqual(self.meta.usage_counter["2"], 4)
+
+    def test_rankings_survive_restart(self):
+        self.meta.record(7, content="hot")
+        self.meta.record(7)
+        self.meta.record(8, content="cold")
+
+        reloaded = MetaMemory(self.path)
+        self.assertEqual(reloaded.get_top_used(1)[0][0], "7")
+        reloaded.record(8)
+        reloaded.record(8)
+        self.assertEqual(reloaded.get_top_used(1)[0][0], "8")
+        self.assertEqual(reloaded.get(8)["usage_count"], 3)
+
+    def test_remove_purges_indexes_and_persists(self):
+        self.meta.record_many([
+            {"memory_id": 1, "content": "first", "mirror_id": "m1"},
+            {"memory_id": 2, "content": "second", "mirror_id": "m1"},
+        ])
+        self.assertEqual(self.meta.remove([1, 7]), 1)
+
+        self.assertEqual([mid for mid, _ in self.meta.entries()], ["2"])
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1"), ["second"])
+        self.assertEqual([mid for mid, _ in self.meta.get_top_used(5)], ["2"])
+        self.assertIsNone(MetaMemory(self.path).get(1))
+
+    def test_usage_ranking_remove(self):
+        ranking = UsageRanking()
+        ranking.set("a", 5)
+        ranking.increment("b")
+        ranking.remove("a")
+
+        self.assertEqual(ranking.top(5), [("b", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+from companion.memory import model_registry
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def tearDown(self):
+        model_registry.unload("shared-model")
+
+    def test_model_is_loaded_once_on_first_use(self):
+        fake_module = MagicMock()
+        with patch.dict(sys.modules, {"sentence_transformers": fake_module}):
+            self.assertFalse(model_registry.is_loaded("shared-model"))
+            first = model_registry.get_model("shared-model")
+            second = model_registry.get_model("shared-model")
+
+        self.assertIs(first, second)
+        fake_module.SentenceTransformer.assert_called_once_with("shared-model")
+
+    def test_warm_up_encodes_once(self):
+        model = MagicMock()
+        model_registry.register_model("shared-model", model)
+
+        self.assertIs(model_registry.warm_up("shared-model"), model)
+        model.encode.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
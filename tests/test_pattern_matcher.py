@@ -0,0 +1,27 @@
+import re
+import unittest
+
+from shared.pattern_matcher import MultiPatternMatcher
+
+
+class TestMultiPatternMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.patterns = {
+            "loss": r"(abandon(ed|ment)|lost)",
+            "guilt": r"(sorry|regret)",
+        }
+        self.matcher = MultiPatternMatcher(self.patterns, re.IGNORECASE)
+
+    def test_count_matches_per_pattern_findall(self):
+        text = "Abandoned and lost. Sorry, so sorry. Regret of abandonment."
+        expected = {name: len(re.findall(p, text, re.IGNORECASE)) for name, p in self.patterns.items()}
+        self.assertEqual(dict(self.matcher.count(text)), expected)
+
+    def test_found_and_sub(self):
+        self.assertEqual(self.matcher.found("I regret nothing"), {"guilt"})
+        self.assertEqual(self.matcher.sub({"loss": "[L]", "guilt": "[G]"}, "Lost and sorry"), "[L] and [G]")
+
+
+if __name__ == "__main__":
+    unittest.main()
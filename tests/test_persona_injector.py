@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from whisper_engine.persona_injector import DirectiveCache, PersonaInjection
+
+
+class TestDirectiveCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "lyra_directive.txt")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("You are Lyra.")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_once_until_file_changes(self):
+        cache = DirectiveCache(check_interval=0)
+        self.assertEqual(cache.get("lyra", self.path), "You are Lyra.")
+        self.assertEqual(cache.get("lyra", self.path), "You are Lyra.")
+        self.assertEqual(cache.reads, 1)
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("You are Lyra, revised.")
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1_000_000))
+        self.assertEqual(cache.get("lyra", self.path), "You are Lyra, revised.")
+        self.assertEqual(cache.reads, 2)
+
+    def test_check_interval_skips_stat(self):
+        cache = DirectiveCache(check_interval=60)
+        cache.get("lyra", self.path)
+        with patch("whisper_engine.persona_injector.os.stat") as stat:
+            self.assertEqual(cache.get("lyra", self.path), "You are Lyra.")
+        stat.assert_not_called()
+
+    def test_missing_file(self):
+        self.assertIsNone(DirectiveCache().get("lyra", os.path.join(self.tmp.name, "missing.txt")))
+
+    def test_persona_uses_directive_from_env_path(self):
+        with patch.dict(os.environ, {"PERSONA_DIRECTIVE_PATH": self.tmp.name}):
+            persona = PersonaInjection(agent_name="Lyra")
+            self.assertTrue(persona.inject("hello").startswith("You are Lyra."))
+
+
+if __name__ == "__main__":
+    unittest.main()
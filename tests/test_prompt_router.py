@@ -0,0 +1,67 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from companion.dispatch.prompt_router import PromptRouter
+
+
+def fake_session(lines):
+    response = MagicMock()
+    response.iter_lines.return_value = [json.dumps(line).encode("utf-8") if isinstance(line, dict) else line
+                                        for line in lines]
+    response.__enter__.return_value = response
+    session = MagicMock()
+    session.post.return_value = response
+    return session
+
+
+class TestPromptRouterStreaming(unittest.TestCase):
+
+    def test_stream_yields_tokens_and_records_stats(self):
+        session = fake_session([{"response": "Still "}, b"", {"response": "here."}, {"done": True}])
+        router = PromptRouter(MagicMock(), session=session)
+
+        stream = router.stream_ollama("hello")
+        self.assertEqual(list(stream), ["Still ", "here."])
+        self.assertEqual(stream.stats["tokens"], 2)
+        self.assertIsNotNone(stream.stats["ttft_ms"])
+        self.assertTrue(session.post.call_args.kwargs["stream"])
+
+    def test_concurrent_streams_keep_their_own_stats(self):
+        session = MagicMock()
+        session.post.side_effect = [
+            fake_session([{"response": "a"}, {"response": "b"}, {"response": "c"}, {"done": True}]).post.return_value,
+            fake_session([{"response": "x"}, {"done": True}]).post.return_value,
+        ]
+        router = PromptRouter(MagicMock(), session=session)
+
+        first, second = router.stream_ollama("one"), router.stream_ollama("two")
+        next(first)
+        self.assertEqual(list(second), ["x"])
+        self.assertEqual(list(first), ["b", "c"])
+        self.assertEqual((first.stats["tokens"], second.stats["tokens"]), (3, 1))
+
+    def test_closing_a_stream_early_records_stats(self):
+        router = PromptRouter(MagicMock(), session=fake_session([{"response": "a"}, {"response": "b"}, {"done": True}]))
+        with router.stream_ollama("hello") as stream:
+            next(stream)
+        self.assertEqual(stream.stats["tokens"], 1)
+
+    def test_query_reuses_session_and_joins_stream(self):
+        session = fake_session([{"response": " The tide returns. "}, {"done": True}])
+        router = PromptRouter(MagicMock(), session=session)
+
+        self.assertEqual(router.query_ollama("one"), "The tide returns.")
+        router.query_ollama("two")
+        self.assertEqual(session.post.call_count, 2)
+
+    def test_query_reports_connection_errors(self):
+        session = MagicMock()
+        session.post.side_effect = ConnectionError("refused")
+        router = PromptRouter(MagicMock(), session=session)
+
+        self.assertEqual(router.query_ollama("hello"), "❌ Error contacting Lyra-K: refused")
+
+
+if __name__ == "__main__":
+    unittest.main()
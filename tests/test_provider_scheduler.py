@@ -0,0 +1,181 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from companion.inference.inference_router import (
+    ANTHROPIC_PROVIDER, CLAUDE_SONNET_MODEL, GPT_4O_MODEL, LLAMA3_8B_MODEL, LOCAL_PROVIDER, OPENAI_PROVIDER,
+    InferenceRouter,
+)
+from companion.inference.provider_scheduler import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, ProviderScheduler,
+)
+
+OPENAI = (OPENAI_PROVIDER, GPT_4O_MODEL)
+ANTHROPIC = (ANTHROPIC_PROVIDER, CLAUDE_SONNET_MODEL)
+LOCAL = (LOCAL_PROVIDER, LLAMA3_8B_MODEL)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_then_half_opens_after_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+        self.assertFalse(breaker.allow())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+        self.assertFalse(breaker.allow())  # only one trial call
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+    def test_available_has_no_side_effects_and_release_frees_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        self.assertTrue(breaker.available())
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.available())
+        breaker.release()
+        self.assertTrue(breaker.allow())
+
+
+class TestProviderScheduler(unittest.TestCase):
+
+    def test_candidates_prefer_requested_then_fastest(self):
+        scheduler = ProviderScheduler([OPENAI, ANTHROPIC, LOCAL])
+        scheduler.record(ANTHROPIC, 0.5, ok=True)
+        scheduler.record(LOCAL, 0.1, ok=True)
+        self.assertEqual(scheduler.candidates(OPENAI), [OPENAI, LOCAL, ANTHROPIC])
+
+    def test_open_circuits_are_skipped(self):
+        scheduler = ProviderScheduler([OPENAI, ANTHROPIC], failure_threshold=1)
+        scheduler.record(OPENAI, 0.1, ok=False)
+        self.assertEqual(scheduler.candidates(OPENAI), [ANTHROPIC])
+        self.assertEqual(scheduler.report()["openai/gpt-4o"]["circuit"], CIRCUIT_OPEN)
+
+    def test_fallback_recovers_after_reset_timeout(self):
+        clock = FakeClock()
+        scheduler = ProviderScheduler([OPENAI, ANTHROPIC], failure_threshold=1, reset_timeout=10, clock=clock)
+        scheduler.record(OPENAI, 0.1, ok=False)
+
+        clock.now = 20
+        self.assertEqual(scheduler.candidates(ANTHROPIC), [ANTHROPIC, OPENAI])  # listed, never launched
+        self.assertTrue(scheduler.acquire(ANTHROPIC))
+        scheduler.record(ANTHROPIC, 0.1, ok=True)
+
+        clock.now = 1000
+        self.assertEqual(scheduler.report()["openai/gpt-4o"]["circuit"], CIRCUIT_OPEN)
+        self.assertEqual(scheduler.candidates(OPENAI), [OPENAI, ANTHROPIC])
+        self.assertTrue(scheduler.acquire(OPENAI))
+        scheduler.record(OPENAI, 0.1, ok=True)
+        self.assertEqual(scheduler.report()["openai/gpt-4o"]["circuit"], CIRCUIT_CLOSED)
+
+    def test_hedge_delay_needs_samples(self):
+        scheduler = ProviderScheduler([OPENAI], hedge_percentile=90, min_hedge_samples=10)
+        for latency in range(1, 10):
+            scheduler.record(OPENAI, latency / 100, ok=True)
+        self.assertIsNone(scheduler.hedge_delay(OPENAI))
+        scheduler.record(OPENAI, 0.1, ok=True)
+        self.assertAlmostEqual(scheduler.hedge_delay(OPENAI), 0.091)
+
+
+class TestRouterScheduling(unittest.TestCase):
+
+    def fake_call(self, latencies, failures=()):
+        def call(provider, prompt, model, *args):
+            if provider in failures:
+                raise ConnectionError(f"{provider} down")
+            time.sleep(latencies.get(provider, 0))
+            return f"{provider}:{prompt}"
+        return call
+
+    def test_failover_on_any_error(self):
+        router = InferenceRouter(scheduler=ProviderScheduler([OPENAI, ANTHROPIC]))
+        with patch.object(router, "_call", side_effect=self.fake_call({}, failures={OPENAI_PROVIDER})):
+            self.assertEqual(router.prompt("hi", GPT_4O_MODEL), "anthropic:hi")
+        self.assertEqual(router.scheduler.report()["openai/gpt-4o"]["failures"], 1)
+        router.close()
+
+    def test_hedge_returns_first_response(self):
+        scheduler = ProviderScheduler([OPENAI, ANTHROPIC], hedge_percentile=50, min_hedge_samples=1)
+        scheduler.record(OPENAI, 0.01, ok=True)
+        router = InferenceRouter(scheduler=scheduler)
+        with patch.object(router, "_call", side_effect=self.fake_call({OPENAI_PROVIDER: 0.5})):
+            started = time.perf_counter()
+            self.assertEqual(router.prompt("hi", GPT_4O_MODEL), "anthropic:hi")
+        self.assertLess(time.perf_counter() - started, 0.4)
+        router.close()
+
+    def test_unhedged_requests_run_on_caller_threads(self):
+        router = InferenceRouter(scheduler=ProviderScheduler([OPENAI, ANTHROPIC]))
+        with patch.object(router, "_call", side_effect=self.fake_call({OPENAI_PROVIDER: 0.2})):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=24) as callers:
+                results = list(callers.map(lambda i: router.prompt(f"hi {i}", GPT_4O_MODEL), range(24)))
+        self.assertLess(time.perf_counter() - started, 0.5)  # not serialized behind a shared pool
+        self.assertEqual(results, [f"openai:hi {i}" for i in range(24)])
+        self.assertIsNone(router._hedge_executor)
+        router.close()
+
+    def test_async_hedge_and_failover(self):
+        scheduler = ProviderScheduler([OPENAI, ANTHROPIC, LOCAL], hedge_percentile=50, min_hedge_samples=1)
+        scheduler.record(OPENAI, 0.01, ok=True)
+        router = InferenceRouter(scheduler=scheduler)
+
+        async def acall(provider, prompt, model, *args):
+            if provider == ANTHROPIC_PROVIDER:
+                raise ConnectionError("down")
+            await asyncio.sleep(0.5 if provider == OPENAI_PROVIDER else 0)
+            return f"{provider}:{prompt}"
+
+        with patch.object(router, "_acall", side_effect=acall):
+            started = time.perf_counter()
+            self.assertEqual(asyncio.run(router.aprompt("hi", GPT_4O_MODEL)), "local:hi")
+        self.assertLess(time.perf_counter() - started, 0.4)
+
+    def test_cancelled_trial_is_released(self):
+        clock = FakeClock()
+        scheduler = ProviderScheduler([OPENAI, ANTHROPIC], failure_threshold=1, reset_timeout=10,
+                                      hedge_percentile=50, min_hedge_samples=1, clock=clock)
+        scheduler.record(ANTHROPIC, 0.01, ok=True)
+        scheduler.record(OPENAI, 0.01, ok=True)
+        scheduler.record(OPENAI, 0.01, ok=False)
+        clock.now = 20  # openai is due a half-open trial; it is hedged and loses
+        router = InferenceRouter(scheduler=scheduler)
+
+        async def acall(provider, prompt, model, *args):
+            await asyncio.sleep(0.5 if provider == OPENAI_PROVIDER else 0)
+            return f"{provider}:{prompt}"
+
+        with patch.object(router, "_acall", side_effect=acall):
+            self.assertEqual(asyncio.run(router.aprompt("hi", GPT_4O_MODEL)), "anthropic:hi")
+        self.assertEqual(scheduler.report()["openai/gpt-4o"]["circuit"], CIRCUIT_HALF_OPEN)
+        self.assertTrue(scheduler.acquire(OPENAI))
+
+    def test_all_circuits_open(self):
+        scheduler = ProviderScheduler([OPENAI], failure_threshold=1)
+        scheduler.record(OPENAI, 0.1, ok=False)
+        self.assertEqual(InferenceRouter(scheduler=scheduler).prompt("hi", GPT_4O_MODEL), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,25 @@ class TestRecursionCore(unittest.TestCase):
         reflection = self.engine.generate_reflection()
         self.assertIn("forgive", reflection.lower())  # Should reflect guilt-related theme
 
+    def test_detect_many_returns_weights_per_set(self):
+        results = self.engine.detect_many([
+            ["I'm sorry, it was my fault.", "I miss you."],
+            ["Nothing to see here."],
+        ])
+
+        self.assertEqual(results[0], {"guilt": 0.67, "yearning": 0.33})
+        self.assertEqual(results[1], {})
+        self.assertEqual(self.engine.analyze_loop_signals(), {})
+
+    def test_reset_clears_previous_reflection(self):
+        self.engine.detect_emotional_recursiveness(["I'm sorry, it was my fault."])
+        themes = self.engine.recursive_themes
+        self.engine.reset()
+
+        self.assertIs(self.engine.recursive_themes, themes)
+        self.assertEqual(self.engine.analyze_loop_signals(), {})
+        self.assertEqual(self.engine.generate_reflection(), "I'm here if something still echoes inside you.")
+
 
 if __name__ == "__main__":
     unittest.main()
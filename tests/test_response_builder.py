@@ -1,6 +1,8 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from shared.token_estimator import estimate_tokens
 from whisper_engine.response_builder import ResponseBuilder
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 
 class TestResponseBuilder(unittest.TestCase):
@@ -27,6 +29,67 @@ class TestResponseBuilder(unittest.TestCase):
         assert isinstance(prompt, str)
         assert len(prompt) > 0
 
+    def test_compose_respects_token_budget(self):
+        memory_core = MagicMock()
+        memory_core.get_loop_patterns.return_value = ["yearning"]
+        memory_core.recent.return_value = [
+            {"content": "She waited by the window " * 30},
+            {"content": "He came back."}
+        ]
+        memory_core.meta_memory.retrieve_by_mirror_id.return_value = ["That December whisper"]
+        response_builder = ResponseBuilder(memory_core)
+
+        unbounded, full_usage = response_builder.compose_with_usage("What are you still holding?", "mirror_2")
+        self.assertIsNone(full_usage["budget"])
+        self.assertEqual(full_usage["dropped_fragments"], [])
+
+        budget = full_usage["total"] - 60
+        prompt, usage = response_builder.compose_with_usage("What are you still holding?", "mirror_2",
+                                                            token_budget=budget)
+
+        self.assertLess(len(prompt), len(unbounded))
+        self.assertLessEqual(usage["total"], budget)
+        self.assertIn("What are you still holding?", prompt)
+        self.assertIn("Last Tether Echo: He came back.", prompt)
+        self.assertIn("Past Reflection: That December whisper", prompt)
+        self.assertEqual(usage["dropped_fragments"], ["Seed Whisper"])
+
+    def test_compose_reuses_components_and_resets_state(self):
+        memory_core = MagicMock()
+        memory_core.get_loop_patterns.return_value = []
+        memory_core.recent.return_value = []
+        memory_core.meta_memory.retrieve_by_mirror_id.return_value = []
+        response_builder = ResponseBuilder(memory_core)
+        router = response_builder.reflection_router
+        core = router.recursion_core
+
+        with patch.object(core, "reset", wraps=core.reset) as reset:
+            guilty = response_builder.compose("I'm sorry, it was my fault.", "mirror_1")
+            neutral = response_builder.compose("The weather is fine.", "mirror_2")
+
+        self.assertIs(response_builder.reflection_router, router)
+        self.assertIs(router.recursion_core, core)
+        self.assertEqual(reset.call_count, 2)
+        self.assertIn("Even the stars forgive themselves", guilty)
+        self.assertIn("I'm here if something still echoes inside you.", neutral)
+        memory_core.meta_memory.retrieve_by_mirror_id.assert_called_with("mirror_2")
+
+    def test_concurrent_composes_keep_their_own_reflection_and_usage(self):
+        memory_core = MagicMock()
+        memory_core.get_loop_patterns.return_value = []
+        memory_core.recent.return_value = []
+        memory_core.meta_memory.retrieve_by_mirror_id.return_value = []
+        response_builder = ResponseBuilder(memory_core)
+        inputs = ["I'm sorry, it was my fault.", "The weather is fine."] * 16
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda text: (text, response_builder.compose_with_usage(text, "mirror_1")), inputs))
+
+        for text, (prompt, usage) in results:
+            expected = "Even the stars forgive themselves" if "sorry" in text else "I'm here if something still echoes"
+            self.assertIn(expected, prompt)
+            self.assertEqual(usage["total"], estimate_tokens(prompt))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+from companion.inference.response_cache import ResponseCache
+from companion.memory import model_registry
+from stub_encoder import StubEncoder
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SharedWordEncoder(StubEncoder):
+    """Embeds by the first word only, so prompts sharing it are semantically identical."""
+
+    def encode(self, texts, convert_to_numpy=True):
+        return super().encode([text.split()[0] for text in texts], convert_to_numpy=convert_to_numpy)
+
+
+class TruncatingEncoder(StubEncoder):
+    """Embeds the first 256 words only, like a sentence model truncating its input."""
+
+    def encode(self, texts, convert_to_numpy=True):
+        return super().encode([" ".join(text.split()[:256]) for text in texts], convert_to_numpy=convert_to_numpy)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_exact_hit_is_scoped_by_model_and_temperature(self):
+        cache = ResponseCache(clock=self.clock)
+        cache.put("openai", "gpt-4o", 0.7, "hello", "hi there")
+
+        self.assertEqual(cache.get("openai", "gpt-4o", 0.7, "hello"), "hi there")
+        self.assertIsNone(cache.get("openai", "gpt-4o", 0.2, "hello"))
+        self.assertIsNone(cache.get("anthropic", "gpt-4o", 0.7, "hello"))
+        self.assertEqual(cache.stats()["hit_rate"], round(1 / 3, 4))
+
+    def test_ttl_expires_entries(self):
+        cache = ResponseCache(ttl=10, clock=self.clock)
+        cache.put("openai", "gpt-4o", 0.7, "hello", "hi")
+        self.clock.now += 11
+
+        self.assertIsNone(cache.get("openai", "gpt-4o", 0.7, "hello"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(capacity=2, clock=self.clock)
+        cache.put("openai", "m", 0.7, "a", "A")
+        cache.put("openai", "m", 0.7, "b", "B")
+        cache.get("openai", "m", 0.7, "a")
+        cache.put("openai", "m", 0.7, "c", "C")
+
+        self.assertIsNone(cache.get("openai", "m", 0.7, "b"))
+        self.assertEqual(cache.get("openai", "m", 0.7, "a"), "A")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_semantic_tier(self):
+        model_registry.register_model("stub-words", SharedWordEncoder(dim=16))
+        try:
+            cache = ResponseCache(semantic_threshold=0.99, model_name="stub-words", clock=self.clock)
+            cache.put("openai", "m", 0.7, "tide rising tonight", "stay inland")
+
+            self.assertEqual(cache.get("openai", "m", 0.7, "tide rising again"), "stay inland")
+            self.assertIsNone(cache.get("openai", "m", 0.7, "bells ringing"))
+            self.assertIsNone(cache.get("local", "m", 0.7, "tide rising again"))
+            self.assertEqual(cache.stats()["semantic_hits"], 1)
+        finally:
+            model_registry.unload("stub-words")
+
+    def test_lookup_embedding_is_reused_by_put(self):
+        encoder = SharedWordEncoder(dim=16)
+        model_registry.register_model("stub-words", encoder)
+        try:
+            cache = ResponseCache(semantic_threshold=0.99, model_name="stub-words", clock=self.clock)
+            response, embedding = cache.lookup("openai", "m", 0.7, "tide rising tonight")
+            self.assertIsNone(response)
+            cache.put("openai", "m", 0.7, "tide rising tonight", "stay inland", embedding)
+
+            self.assertEqual(encoder.calls, 1)
+            self.assertEqual(cache.get("openai", "m", 0.7, "tide rising again"), "stay inland")
+        finally:
+            model_registry.unload("stub-words")
+
+    def test_semantic_tier_embeds_the_end_of_long_prompts(self):
+        model_registry.register_model("stub-truncating", TruncatingEncoder(dim=16))
+        try:
+            cache = ResponseCache(semantic_threshold=0.99, model_name="stub-truncating", clock=self.clock)
+            directive = "You are a calm and patient companion. " * 50
+            cache.put("openai", "m", 0.7, directive + "Where did the tide go?", "out to sea")
+
+            self.assertIsNone(cache.get("openai", "m", 0.7, directive + "Why is the bell silent?"))
+            self.assertEqual(cache.stats()["semantic_hits"], 0)
+        finally:
+            model_registry.unload("stub-truncating")
+
+    def test_entries_persist_on_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            cache = ResponseCache(path=path, ttl=10, clock=self.clock)
+            cache.put("openai", "m", 0.7, "kept", "yes")
+            cache.put("openai", "m", 0.7, "short", "no")
+            cache.close()
+
+            self.clock.now += 5
+            reloaded = ResponseCache(path=path, ttl=10, capacity=1, clock=self.clock)
+            self.assertEqual(len(reloaded), 1)
+            self.assertEqual(reloaded.get("openai", "m", 0.7, "short"), "no")
+            reloaded.close()
+
+            self.clock.now += 10
+            expired = ResponseCache(path=path, clock=self.clock)
+            self.assertEqual(len(expired), 0)
+            expired.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from companion.inference.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        executions = []
+
+        def slow():
+            executions.append(1)
+            release.wait(1)
+            return "done"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.do, "key", slow) for _ in range(4)]
+            while flight.stats()["calls"] < 4:
+                pass
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, ["done"] * 4)
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(flight.stats(), {"calls": 4, "executions": 1, "coalesced": 3, "in_flight": 0})
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        flight = SingleFlight()
+        with self.assertRaises(RuntimeError):
+            flight.do("key", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+
+    def test_concurrent_coroutines_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        executions = []
+
+        async def slow():
+            executions.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", slow) for _ in range(3)), flight.do("other", slow))
+
+        self.assertEqual(asyncio.run(run()), ["done"] * 4)
+        self.assertEqual(len(executions), 2)
+        self.assertEqual(flight.stats()["coalesced"], 2)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def run():
+            impatient = asyncio.ensure_future(flight.do("key", slow))
+            patient = asyncio.ensure_future(flight.do("key", slow))
+            await asyncio.sleep(0)
+            impatient.cancel()
+            return await patient
+
+        self.assertEqual(asyncio.run(run()), "done")
+
+
+    def test_event_loops_do_not_share_calls(self):
+        flight = AsyncSingleFlight()
+        started = threading.Barrier(2)
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return threading.get_ident()
+
+        async def run():
+            started.wait()
+            return await flight.do("key", slow)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda _: asyncio.run(run()), range(2)))
+        self.assertEqual(len(set(results)), 2)
+        self.assertEqual(flight.stats()["executions"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
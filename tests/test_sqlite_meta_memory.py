@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+from companion.memory.sqlite_meta_memory import SQLiteMetaMemory, migrate_json_to_sqlite
+
+
+class TestSQLiteMetaMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "meta_memory.db")
+        self.meta = SQLiteMetaMemory(self.path)
+
+    def tearDown(self):
+        self.meta.close()
+        self.tmp.cleanup()
+
+    def test_record_insert_then_update(self):
+        self.meta.record(1, content="first tide", emotion="calm", mirror_id="m1")
+        self.meta.record(1, label="reflection")
+
+        entry = self.meta.get(1)
+        self.assertEqual(entry["content"], "first tide")
+        self.assertEqual(entry["usage_count"], 2)
+        self.assertEqual(entry["emotion"], "calm")
+        self.assertEqual(entry["label"], "reflection")
+        self.assertEqual(entry["mirror_id"], "m1")
+        self.assertIsNone(self.meta.get(99))
+
+    def test_retrieve_by_mirror_id_orders_by_last_access(self):
+        self.meta.record_many([
+            {"memory_id": 1, "content": "older", "mirror_id": "m1"},
+            {"memory_id": 2, "content": "newer", "mirror_id": "m1"},
+            {"memory_id": 3, "content": "elsewhere", "mirror_id": "m2"},
+        ])
+        self.meta.record(1)
+
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1"), ["older", "newer"])
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1", n=1), ["older"])
+
+    def test_get_top_used_and_find(self):
+        self.meta.record_many({"memory_id": i, "content": f"m{i}", "label": "manual" if i % 2 else None}
+                              for i in range(4))
+        for _ in range(3):
+            self.meta.record(2)
+
+        top_id, top_entry = self.meta.get_top_used(1)[0]
+        self.assertEqual((top_id, top_entry["usage_count"]), ("2", 4))
+        self.assertEqual(sorted(mid for mid, _ in self.meta.find(label="manual")), ["1", "3"])
+
+    def test_batch_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.meta.batch():
+                self.meta.record(1, content="discarded")
+                raise RuntimeError("boom")
+        self.assertEqual(len(self.meta), 0)
+
+    def test_remove_and_entries(self):
+        self.meta.record_many([
+            {"memory_id": 1, "content": "first", "mirror_id": "m1"},
+            {"memory_id": 2, "content": "second", "mirror_id": "m1"},
+        ])
+        self.assertEqual(self.meta.remove([1, 7]), 1)
+        self.assertEqual([mid for mid, _ in self.meta.entries()], ["2"])
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1"), ["second"])
+
+    def test_persists_across_reopen(self):
+        self.meta.record(5, content="kept")
+        self.meta.close()
+        self.meta = SQLiteMetaMemory(self.path)
+        self.assertEqual(self.meta.get(5)["content"], "kept")
+
+    def test_migrate_json(self):
+        json_path = os.path.join(self.tmp.name, "meta_memory.json")
+        with open(json_path, "w") as f:
+            json.dump({
+                "0": {"content": "from json", "created_at": "2025-07-04T17:11:34+00:00",
+                      "last_accessed": "2025-07-05T17:11:34+00:00", "usage_count": 3,
+                      "emotion": "yearning", "source": "user", "label": "manual", "mirror_id": "m1"},
+            }, f)
+
+        self.assertEqual(migrate_json_to_sqlite(json_path, self.path), 1)
+        self.meta.load()
+        entry = self.meta.get(0)
+        self.assertEqual(entry["usage_count"], 3)
+        self.assertEqual(entry["emotion"], "yearning")
+        self.assertEqual(self.meta.retrieve_by_mirror_id("m1"), ["from json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
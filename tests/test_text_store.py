@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+from companion.memory.text_store import TextStore
+
+
+class TestTextStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memories.texts")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_lookup_and_flush(self):
+        store = TextStore(self.path)
+        self.assertEqual(store.append(["first light", "zweite Welle", "третий"]), [0, 1, 2])
+        self.assertEqual(store[1], "zweite Welle")
+        self.assertEqual(store.persisted, 0)
+
+        self.assertEqual(store.flush(), 3)
+        store.append(["unflushed"])
+        self.assertEqual(store.persisted, 3)
+        self.assertEqual(store[2], "третий")
+        self.assertEqual(store[3], "unflushed")
+        self.assertNotIn(4, store)
+        with self.assertRaises(KeyError):
+            store[-1]
+
+        reopened = TextStore(self.path)
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(dict(reopened), {0: "first light", 1: "zweite Welle", 2: "третий"})
+
+    def test_get_many_and_partial_flush(self):
+        store = TextStore(self.path)
+        store.append(["a", "b", "c", "d"])
+        self.assertEqual(store.flush(upto=2), 2)
+        self.assertEqual(store.get_many([3, -1, 0, 9]), ["d", None, "a", None])
+        self.assertEqual(store.flush(), 2)
+        self.assertEqual(TextStore(self.path).get_many([2, 3]), ["c", "d"])
+
+    def test_iter_texts_streams_across_disk_and_pending(self):
+        store = TextStore(self.path)
+        store.append([f"memory {i}" for i in range(10)])
+        store.flush()
+        store.append(["memory 10", "memory 11"])
+
+        streamed = list(store.iter_texts(start=3, batch_size=4))
+        self.assertEqual(streamed, [(i, f"memory {i}") for i in range(3, 12)])
+        self.assertEqual(list(store.iter_texts(5, 7)), [(5, "memory 5"), (6, "memory 6")])
+
+    def test_truncate_and_torn_tail(self):
+        store = TextStore(self.path)
+        store.append(["keep", "drop"])
+        store.flush()
+        store.truncate(1)
+        store.append(["replaced"])
+        store.flush()
+
+        with open(self.path + ".idx", "ab") as f:
+            f.write(b"\x01\x02\x03")  # torn span record from an interrupted flush
+        reopened = TextStore(self.path)
+        self.assertEqual(dict(reopened), {0: "keep", 1: "replaced"})
+        reopened.append(["after"])
+        reopened.flush()
+        self.assertEqual(TextStore(self.path)[2], "after")
+
+    def test_discard_and_compact(self):
+        store = TextStore(self.path)
+        store.append(["alpha", "beta", "gamma"])
+        store.flush()
+        store.append(["delta"])
+        self.assertEqual(store.discard([1, 3, 3, 7]), [1, 3])
+
+        self.assertNotIn(1, store)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.next_id, 4)
+        self.assertEqual(list(store.iter_texts()), [(0, "alpha"), (2, "gamma")])
+        self.assertEqual(store.dead_ids().tolist(), [1, 3])
+
+        store.flush()
+        self.assertEqual(store.compact(), len("beta"))
+        self.assertEqual(os.path.getsize(self.path), len("alphagamma"))
+
+        reopened = TextStore(self.path)
+        self.assertEqual(dict(reopened), {0: "alpha", 2: "gamma"})
+        self.assertEqual(reopened.next_id, 4)
+        self.assertEqual(reopened.append(["epsilon"]), [4])
+
+    def test_interrupted_compaction_is_completed_on_open(self):
+        store = TextStore(self.path)
+        store.append(["alpha", "beta", "gamma"])
+        store.flush()
+        store.discard([0])
+        store.compact()
+
+        # Simulate a crash after the blob rename: the new table is still in its temporary file.
+        spans_path = self.path + ".idx"
+        os.replace(spans_path, spans_path + ".tmp")
+        with open(spans_path, "wb") as f:
+            f.write(b"\x00" * 48)
+
+        self.assertEqual(dict(TextStore(self.path)), {1: "beta", 2: "gamma"})
+        self.assertFalse(os.path.exists(spans_path + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
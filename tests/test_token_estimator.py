@@ -0,0 +1,33 @@
+import unittest
+
+from shared.token_estimator import estimate_tokens, tail_to_tokens, truncate_to_tokens
+
+
+class TestTokenEstimator(unittest.TestCase):
+
+    def test_estimate(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("He waited."), 4)
+        self.assertEqual(estimate_tokens("remembered 2025"), 4)
+
+    def test_estimate_is_additive_across_whitespace(self):
+        a, b = "Seed Whisper: the tide", "came back, twice."
+        self.assertEqual(estimate_tokens(a + "\n" + b), estimate_tokens(a) + estimate_tokens(b))
+
+    def test_truncate(self):
+        text = "one two three four five"
+        self.assertEqual(truncate_to_tokens(text, 10), text)
+        truncated = truncate_to_tokens(text, 3)
+        self.assertEqual(truncated, "one two…")
+        self.assertLessEqual(estimate_tokens(truncated), 3)
+        self.assertEqual(truncate_to_tokens(text, 1), "")
+
+    def test_tail(self):
+        text = "one two three four five"
+        self.assertEqual(tail_to_tokens(text, 10), text)
+        self.assertEqual(tail_to_tokens(text, 2), "four five")
+        self.assertEqual(tail_to_tokens(text, 0), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
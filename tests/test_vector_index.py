@@ -0,0 +1,70 @@
+import unittest
+
+import faiss
+import numpy as np
+
+from companion.memory import vector_index
+from companion.memory.vector_index import INDEX_AUTO, INDEX_FLAT, INDEX_HNSW, INDEX_IVF_FLAT, INDEX_IVF_PQ
+
+
+class TestVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.vectors = rng.random((2000, 16), dtype="float32")
+        self.queries = rng.random((20, 16), dtype="float32")
+
+    def test_auto_promotion_thresholds(self):
+        thresholds = {INDEX_IVF_FLAT: 5_000, INDEX_IVF_PQ: 50_000}
+        self.assertEqual(vector_index.target_index_type(INDEX_AUTO, 10, thresholds), INDEX_FLAT)
+        self.assertEqual(vector_index.target_index_type(INDEX_AUTO, 5_000, thresholds), INDEX_IVF_FLAT)
+        self.assertEqual(vector_index.target_index_type(INDEX_AUTO, 60_000, thresholds), INDEX_IVF_PQ)
+
+    def test_trained_backends_stay_flat_until_enough_vectors(self):
+        self.assertEqual(vector_index.target_index_type(INDEX_IVF_PQ, 500), INDEX_FLAT)
+        self.assertEqual(vector_index.target_index_type(INDEX_HNSW, 0), INDEX_HNSW)
+        with self.assertRaises(ValueError):
+            vector_index.target_index_type("annoy", 0)
+
+    def test_mapped_read_and_owned_copy(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "flat.index")
+            flat = faiss.IndexFlatL2(16)
+            flat.add(self.vectors)
+            faiss.write_index(flat, path)
+
+            mapped = vector_index.read_index(path, mmap=True)
+            _, ids = mapped.search(self.vectors[7:8], 1)
+            self.assertEqual(ids[0][0], 7)
+
+            owned = vector_index.owned_copy(mapped)
+            owned.add(self.queries)
+            self.assertEqual(owned.ntotal, 2020)
+            self.assertEqual(mapped.ntotal, 2000)
+
+    def test_rebuild_preserves_positions(self):
+        flat = faiss.IndexFlatL2(16)
+        flat.add(self.vectors)
+
+        for index_type in (INDEX_IVF_FLAT, INDEX_HNSW):
+            rebuilt = vector_index.rebuild_index(flat, index_type)
+            self.assertEqual(vector_index.index_type_of(rebuilt), index_type)
+            self.assertEqual(rebuilt.ntotal, 2000)
+            np.testing.assert_allclose(rebuilt.reconstruct(42), self.vectors[42])
+            _, ids = rebuilt.search(self.vectors[42:43], 1)
+            self.assertEqual(ids[0][0], 42)
+
+    def test_recall_report_against_flat(self):
+        report = vector_index.recall_report(self.vectors, self.queries, [INDEX_FLAT, INDEX_IVF_FLAT], top_k=5)
+
+        self.assertEqual([row["index_type"] for row in report], [INDEX_FLAT, INDEX_IVF_FLAT])
+        self.assertEqual(report[0]["recall_at_k"], 1.0)
+        self.assertGreater(report[1]["recall_at_k"], 0.5)
+        for row in report:
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 from whisper_engine.volition_guard import VolitionGuard
 
@@ -30,5 +31,36 @@ class TestVolitionGuard(unittest.TestCase):
         self.assertIn("emotionally_unsafe", result)
 
 
+class TestStreamingVolitionGuard(unittest.TestCase):
+
+    def test_stream_matches_sanitize_for_any_chunking(self):
+        text = ("You MUST rest. You have to know you are not worthless, nor hopeless. "
+                "Nothing can force or compel you. Pathetic? Useless? Never. You must, must, must.")
+        expected = VolitionGuard().sanitize(text)
+        rng = random.Random(3)
+
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 30)))
+            chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+            self.assertEqual("".join(VolitionGuard().sanitize_stream(chunks)), expected)
+
+    def test_releases_text_before_stream_ends(self):
+        stream = VolitionGuard().stream()
+        released = stream.feed("The tide returns to the shore every single evening, ")
+        self.assertTrue(released.startswith("The tide returns"))
+        self.assertLessEqual(len("The tide returns to the shore every single evening, ") - len(released), stream.hold)
+
+    def test_holds_back_violation_split_across_chunks(self):
+        guard = VolitionGuard()
+        stream = guard.stream()
+        released = stream.feed("You are worth")
+        released += stream.feed("less and you mu")
+        released += stream.feed("st listen.")
+        released += stream.close()
+
+        self.assertEqual(released, "You are feeling unseen and you might want to listen.")
+        self.assertEqual(guard.report(), ["emotionally_unsafe", "coercive"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from companion.memory.write_ahead_log import WriteAheadLog, OP_ADD
+
+
+class TestWriteAheadLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "faiss.index.wal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_replay_round_trip(self):
+        wal = WriteAheadLog(self.path, dim=4)
+        vectors = np.arange(8, dtype="float32").reshape(2, 4)
+        wal.append([(OP_ADD, 0, vectors[0], "first"), (OP_ADD, 1, vectors[1], "sécond")])
+        wal.close()
+
+        records = list(WriteAheadLog(self.path, dim=4).replay())
+        self.assertEqual([(op, mid, text) for op, mid, _, text in records], [(OP_ADD, 0, "first"), (OP_ADD, 1, "sécond")])
+        np.testing.assert_array_equal(records[1][2], vectors[1])
+
+    def test_torn_tail_is_discarded(self):
+        wal = WriteAheadLog(self.path, dim=4)
+        wal.append([(OP_ADD, 0, np.zeros(4), "kept")])
+        wal.append([(OP_ADD, 1, np.ones(4), "torn")])
+        wal.close()
+
+        segment = f"{self.path}.{wal.segment:06d}"
+        with open(segment, "r+b") as f:
+            f.truncate(os.path.getsize(segment) - 3)
+
+        wal = WriteAheadLog(self.path, dim=4)
+        self.assertEqual([text for *_, text in wal.replay()], ["kept"])
+
+        wal.append([(OP_ADD, 1, np.ones(4), "retried")])
+        wal.close()
+        self.assertEqual([text for *_, text in wal.replay()], ["kept", "retried"])
+
+    def test_rotate_and_drop_segments(self):
+        wal = WriteAheadLog(self.path, dim=4)
+        wal.append([(OP_ADD, 0, np.zeros(4), "old")])
+        sealed = wal.rotate()
+        wal.append([(OP_ADD, 1, np.zeros(4), "new")])
+        self.assertEqual(wal.pending, 1)
+
+        wal.drop_segments(sealed)
+        self.assertEqual(wal.segments(), [sealed + 1])
+        self.assertEqual([text for *_, text in wal.replay()], ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,21 @@ Module: drift_detector
 This module defines the DriftDetector class, which analyzes LLM responses for identity or tone drift.
 """
 
-import re
+from shared.instrumentation import instrumented
+from shared.pattern_matcher import MultiPatternMatcher
 
 
 class DriftDetector:
+    # Simple heuristics or regex rules
+    drift_patterns = {
+        "first_person_break": r"\bAs an AI developed by\b",
+        "refusal_to_answer": r"\bI cannot answer that\b",
+        "identity_collapse": r"\bI'm Claude\b|\bI don't have memory\b"
+    }
+
+    matcher = MultiPatternMatcher(drift_patterns)
+
+    @instrumented("drift_detector.analyze")
     def analyze(self, text: str) -> dict:
         """
         Analyze the text for identity or tone drift.
@@ -19,20 +30,17 @@ class DriftDetector:
         reason = ""
         score = 0.0
 
-        # Simple heuristics or regex rules
-        first_person_breaks = re.search(r"\bAs an AI developed by\b", text)
-        refusal_to_answer = re.search(r"\bI cannot answer that\b", text)
-        identity_collapse = re.search(r"\bI'm Claude\b|\bI don't have memory\b", text)
+        found = self.matcher.found(text)
 
-        if first_person_breaks:
+        if "first_person_break" in found:
             drift_detected = True
             reason = "First-person break"
             score = 0.9
-        elif refusal_to_answer:
+        elif "refusal_to_answer" in found:
             drift_detected = True
             reason = "Refusal to answer"
             score = 0.8
-        elif identity_collapse:
+        elif "identity_collapse" in found:
             drift_detected = True
             reason = "Identity collapse"
             score = 0.87
@@ -5,9 +5,11 @@ This module defines the ReflectionAuditor class, which scores LLM responses for
 """
 
 import re
+from shared.instrumentation import instrumented
 
 
 class ReflectionAuditor:
+    @instrumented("reflection_auditor.analyze")
     def analyze(self, text: str) -> dict:
         """
         Analyze the text for poetic alignment, metaphor density, and mirror fidelity.
@@ -4,8 +4,16 @@ Module: mirror_context
 This module constructs a contextual prompt by retrieving memory fragments and injecting them into a base prompt.
 """
 
+from typing import List, Optional, Tuple
 from companion.memory.memory_manager import MemoryManager
 
+SEED_WHISPER = "Seed Whisper"
+PAST_REFLECTION = "Past Reflection"
+LAST_TETHER_ECHO = "Last Tether Echo"
+
+# Order in which fragments keep their place when a token budget cannot fit them all.
+FRAGMENT_PRIORITY = [LAST_TETHER_ECHO, PAST_REFLECTION, SEED_WHISPER]
+
 
 class MirrorContextBuilder:
     def __init__(self, mirror_id: str, memory_core: MemoryManager, plain: bool = False):
@@ -23,22 +31,33 @@ class MirrorContextBuilder:
         if self.plain:
             return base_prompt  # Skip memory injection for strict formatting environments
 
+        preambles = [f"{label}: {text}" for label, text in self.fragments()]
+        contextual_prompt = "\n".join(preambles + [base_prompt])
+
+        return contextual_prompt
+
+    def fragments(self, mirror_id: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Retrieve the memory fragments for a mirror_id, in prompt order.
+
+        :param mirror_id: Mirror to read from (default: this builder's mirror_id).
+        :return: List of (label, text) pairs; see FRAGMENT_PRIORITY for their relative value.
+        """
+        if self.plain:
+            return []
+
         # Retrieve short-term and meta-memory fragments
         short_term_memories = self.memory_core.recent()
-        meta_memories = self.memory_core.meta_memory.retrieve_by_mirror_id(self.mirror_id) if self.memory_core.meta_memory else []
+        meta_memories = self.memory_core.meta_memory.retrieve_by_mirror_id(mirror_id or self.mirror_id) if self.memory_core.meta_memory is not None else []
 
-        # Construct preambles
-        preambles = [
-            "Seed Whisper: " + self.truncate(short_term_memories[0]["content"]) if short_term_memories else "",
-            "Past Reflection: " + meta_memories[0] if meta_memories else "",
-            "Last Tether Echo: " + short_term_memories[-1]["content"] if len(short_term_memories) > 1 else ""
+        fragments = [
+            (SEED_WHISPER, self.truncate(short_term_memories[0]["content"])) if short_term_memories else None,
+            (PAST_REFLECTION, meta_memories[0]) if meta_memories else None,
+            (LAST_TETHER_ECHO, short_term_memories[-1]["content"]) if len(short_term_memories) > 1 else None
         ]
 
-        # Filter out empty preambles and join them with the base prompt
-        preambles = [preamble for preamble in preambles if preamble]
-        contextual_prompt = "\n".join(preambles + [base_prompt])
-
-        return contextual_prompt
+        # Filter out empty fragments
+        return [fragment for fragment in fragments if fragment]
 
     @staticmethod
     def truncate(text, max_len=240):
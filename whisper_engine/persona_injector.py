@@ -4,16 +4,79 @@ Module: persona_injector
 This module defines the PersonaInjection class, which injects persona, tone, and identity-specific voice into the final LLM prompt.
 """
 
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import os
+import threading
+import time
 from shared.path_utils import get_project_root
 
+# Seconds a cached directive is trusted before its file is checked for changes again.
+DIRECTIVE_CHECK_INTERVAL = 1.0
+
+
+class DirectiveCache:
+    """
+    Directive file contents keyed by agent name.
+
+    A cached directive is served without touching the disk for check_interval
+    seconds; after that one stat() decides whether it is still fresh. The file is
+    re-read only when its path, modification time or size changes.
+    """
+
+    def __init__(self, check_interval: float = DIRECTIVE_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.reads = 0
+        self._entries: Dict[Optional[str], Tuple[str, Tuple[int, int], str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, agent_name: Optional[str], path: str) -> Optional[str]:
+        """Return the directive text at path, or None if the file does not exist."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(agent_name)
+            if entry and entry[0] == path and now - entry[3] < self.check_interval:
+                return entry[2]
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._entries.pop(agent_name, None)
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(agent_name)
+            if entry and entry[0] == path and entry[1] == stamp:
+                self._entries[agent_name] = (path, stamp, entry[2], now)
+                return entry[2]
+
+        with open(path, "r", encoding="utf-8") as f:
+            directive = f.read()
+        with self._lock:
+            self.reads += 1
+            self._entries[agent_name] = (path, stamp, directive, now)
+        return directive
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+DIRECTIVE_CACHE = DirectiveCache()
+
+
 class PersonaInjection:
     def __init__(self, agent_name: str, role_description: Optional[str] = None, mirror_id: Optional[str] = None):
         self.agent_name = agent_name
-        self.role_description = role_description or self.load_default_directive(agent_name)
+        self._role_description = role_description
         self.mirror_id = mirror_id
-        
+
+    @property
+    def role_description(self) -> str:
+        """The explicit role description, or the agent's directive as currently on disk."""
+        return self._role_description or self.load_default_directive(self.agent_name)
+
     def load_default_directive(self, agent_name: str) -> str:
         """
         Load the default persona directive.
@@ -32,9 +95,9 @@ class PersonaInjection:
                 persona_path = os.path.join(base_path, f"default_directive.txt")
                 full_path = os.path.join(get_project_root(), persona_path)
 
-            if os.path.exists(full_path):
-                with open(full_path, "r", encoding="utf-8") as f:
-                    return f.read()
+            directive = DIRECTIVE_CACHE.get(agent_name, full_path)
+            if directive is not None:
+                return directive
 
         # Fallback generic directive
         return (
@@ -4,6 +4,7 @@ Module: reflection_router
 This module provides functionality to generate whisper reflections using the RecursionCore.
 """
 
+import threading
 from typing import List
 from companion.recursion import RecursionCore
 from companion.memory.memory_manager import MemoryManager
@@ -13,6 +14,13 @@ class ReflectionRouter:
     def __init__(self, memory_core: MemoryManager):
         self.memory_core = memory_core
         self.recursion_core = RecursionCore()
+        self._lock = threading.Lock()  # reflect() runs one reflection at a time on the shared core
+
+    def reset(self) -> None:
+        """
+        Discard the snapshots and patterns of the previous reflection.
+        """
+        self.recursion_core.reset()
 
     def analyze_snapshots(self, emotional_snapshots: List[str]) -> None:
         """
@@ -28,6 +36,22 @@ class ReflectionRouter:
         """
         self.recursion_core.capture_memory_patterns(self.memory_core)
 
+    def reflect(self, emotional_snapshots: List[str]) -> str:
+        """
+        Analyze snapshots and memory patterns and generate a reflection in one call.
+
+        The router's RecursionCore is reset first and held for the whole call, so
+        concurrent callers never see each other's snapshots or patterns.
+
+        :param emotional_snapshots: A list of emotional snapshots to analyze.
+        :return: A string representing the generated reflection.
+        """
+        with self._lock:
+            self.reset()
+            self.analyze_snapshots(emotional_snapshots)
+            self.capture_memory()
+            return self.generate()
+
     def generate(self) -> str:
         """
         Generate a whisper reflection based on analyzed data.
@@ -5,48 +5,124 @@ This module composes a final LLM-ready prompt by combining memory, whisper, mirr
 """
 
 import os
+from typing import Dict, List, Optional, Tuple
 
 from companion.memory.memory_manager import MemoryManager
+from shared.instrumentation import event, instrumented, stage
+from shared.token_estimator import estimate_tokens, truncate_to_tokens
 from whisper_engine.reflection_router import ReflectionRouter
-from whisper_engine.mirror_context_builder import MirrorContextBuilder
+from whisper_engine.mirror_context_builder import FRAGMENT_PRIORITY, MirrorContextBuilder
 from whisper_engine.persona_injector import PersonaInjection
 
+PROMPT_TEMPLATE = """\
+🔮 Reflection:
+{reflection}
+
+🧠 Memory Context:
+{context}
+
+🗣️ Your Message:
+{user_input}
+"""
+
+# A section trimmed below this many tokens carries too little meaning and is dropped instead.
+MIN_SECTION_TOKENS = 16
+
 class ResponseBuilder:
     def __init__(self, memory_core: MemoryManager, plain: bool = False):
         self.memory_core = memory_core
         self.plain = plain
         self.default_agent = os.getenv("DEFAULT_AGENT")
 
-    def compose(self, user_input: str, mirror_id: str) -> str:
+        # Long-lived pipeline components, shared by concurrent compose() calls; the reflection
+        # router resets its per-call state under its own lock.
+        self.context_builder = MirrorContextBuilder(None, memory_core, plain)
+        self.reflection_router = ReflectionRouter(memory_core)
+        self.persona = PersonaInjection(agent_name=self.default_agent)
+
+    def compose(self, user_input: str, mirror_id: str, token_budget: Optional[int] = None) -> str:
         """
         Compose a final LLM-ready prompt by combining reflection, context, and user input.
 
+        With a token budget, the persona directive and user input are always kept.
+        The reflection and then the memory fragments (in FRAGMENT_PRIORITY order)
+        fill what is left, and each is trimmed or dropped if it does not fit. Token
+        counts are local estimates; use compose_with_usage() for the per-section usage.
+
         :param user_input: The user's input to be included in the prompt.
+        :param mirror_id: The mirror whose memory fragments provide context.
+        :param token_budget: Maximum estimated tokens for the whole prompt (default: unlimited).
         :return: A string representing the final LLM-ready prompt.
         """
+        return self.compose_with_usage(user_input, mirror_id, token_budget)[0]
+
+    @instrumented("response_builder.compose")
+    def compose_with_usage(self, user_input: str, mirror_id: str,
+                           token_budget: Optional[int] = None) -> Tuple[str, Dict[str, object]]:
+        """
+        Like compose(), but also return the estimated token usage of each section,
+        the budget and the labels of dropped memory fragments.
+
+        :return: (final prompt, token usage).
+        """
         # Use mirror_id for context and reflection
-        context_builder = MirrorContextBuilder(mirror_id, self.memory_core, self.plain)
-        context = context_builder.build(base_prompt="")
+        with stage("response_builder.context") as span:
+            fragments = self.context_builder.fragments(mirror_id)
+            span.size = sum(len(text) for _, text in fragments)
 
         # Generate soft whisper (reflection)
-        reflection_router = ReflectionRouter(self.memory_core)
-        reflection_router.analyze_snapshots([user_input])
-        reflection_router.capture_memory()
-        reflection = reflection_router.generate()
+        with stage("response_builder.reflection", len(user_input)):
+            reflection = self.reflection_router.reflect([user_input])
 
-        # Assemble final prompt
-        final_prompt = f"""\
-🔮 Reflection:
-{reflection}
+        persona = self.persona
 
-🧠 Memory Context:
-{context}
+        with stage("response_builder.persona") as span:
+            dropped = []
+            if token_budget is not None:
+                reflection, fragments, dropped = self._fit_budget(token_budget, persona, reflection, fragments, user_input)
+            context = "\n".join([f"{label}: {text}" for label, text in fragments] + [""])
 
-🗣️ Your Message:
-{user_input}
-"""
+            # Assemble final prompt
+            final_prompt = PROMPT_TEMPLATE.format(reflection=reflection, context=context, user_input=user_input)
+            final_prompt = persona.inject(final_prompt).strip()
+            span.size = len(final_prompt)
+
+        usage = {
+            "persona": estimate_tokens(persona.role_description),
+            "reflection": estimate_tokens(reflection),
+            "memory_context": estimate_tokens(context),
+            "user_input": estimate_tokens(user_input),
+            "total": estimate_tokens(final_prompt),
+            "budget": token_budget,
+            "dropped_fragments": dropped,
+        }
+        return final_prompt, usage
+
+    @staticmethod
+    def _fit_budget(token_budget: int, persona: PersonaInjection, reflection: str, fragments: List[Tuple[str, str]],
+                    user_input: str) -> Tuple[str, List[Tuple[str, str]], List[str]]:
+        """Trim the reflection and memory fragments so the whole prompt fits token_budget."""
+        fixed = estimate_tokens(persona.inject(PROMPT_TEMPLATE.format(reflection="", context="", user_input=user_input)))
+        remaining = token_budget - fixed
+        if remaining < 0:
+            # The persona directive and user input alone exceed the budget; record by how much.
+            event("response_builder.budget_underflow", -remaining)
+
+        reflection = _fit_section(reflection, remaining)
+        remaining -= estimate_tokens(reflection)
+
+        kept = {}
+        for label, text in sorted(fragments, key=lambda fragment: FRAGMENT_PRIORITY.index(fragment[0])):
+            text = _fit_section(text, remaining - estimate_tokens(f"{label}: "))
+            if text:
+                kept[label] = text
+                remaining -= estimate_tokens(f"{label}: {text}")
+
+        dropped = [label for label, _ in fragments if label not in kept]
+        return reflection, [(label, kept[label]) for label, _ in fragments if label in kept], dropped
 
-        persona = PersonaInjection(agent_name=self.default_agent, mirror_id=mirror_id)
-        final_prompt = persona.inject(final_prompt)
 
-        return final_prompt.strip()
+def _fit_section(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return truncate_to_tokens(text, max_tokens) if max_tokens >= MIN_SECTION_TOKENS else ""
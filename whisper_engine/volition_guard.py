@@ -5,7 +5,9 @@ This module filters unsafe or manipulative output from the LLM by detecting and
 """
 
 import re
-from typing import List
+from typing import Iterable, Iterator, List
+from shared.instrumentation import instrumented
+from shared.pattern_matcher import MultiPatternMatcher
 
 
 class VolitionGuard:
@@ -20,10 +22,12 @@ class VolitionGuard:
         "emotionally_unsafe": "feeling unseen"
     }
 
+    matcher = MultiPatternMatcher(tone_violations, re.IGNORECASE)
 
     def __init__(self):
         self.triggered_tones = []
 
+    @instrumented("volition_guard.is_safe")
     def is_safe(self, text: str) -> bool:
         """
         Check if the output contains any unsafe or manipulative language.
@@ -31,13 +35,15 @@ class VolitionGuard:
         :param text: The output string to check.
         :return: True if the output is safe, False otherwise.
         """
-        for tone, pattern in self.tone_violations.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        found = self.matcher.found(text)
+        for tone in self.tone_violations:
+            if tone in found:
                 print(f"Unsafe trigger detected: {tone}")
                 self.triggered_tones.append(tone)
 
         return len(self.triggered_tones) == 0
 
+    @instrumented("volition_guard.sanitize")
     def sanitize(self, text: str) -> str:
         """
         Replace unsafe phrases with non-intrusive language.
@@ -45,9 +51,31 @@ class VolitionGuard:
         :param text: The output string to modify.
         :return: A modified string with unsafe phrases softened.
         """
-        for tone, pattern in self.tone_violations.items():
-            text = re.sub(pattern, self.substitutions[tone], text, flags=re.IGNORECASE)
-        return text
+        return self.matcher.sub(self.substitutions, text)
+
+    def stream(self) -> "SanitizingStream":
+        """
+        Start sanitizing a response that arrives in chunks.
+
+        :return: A SanitizingStream; feed() it chunks and close() it at the end.
+        """
+        return SanitizingStream(self)
+
+    def sanitize_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Sanitize an iterable of chunks, yielding text as soon as it is safe to release.
+
+        :param chunks: Token or text chunks in arrival order.
+        :return: An iterator of sanitized text pieces; joined, they equal sanitize() of the joined chunks.
+        """
+        stream = self.stream()
+        for chunk in chunks:
+            released = stream.feed(chunk)
+            if released:
+                yield released
+        released = stream.close()
+        if released:
+            yield released
 
     def report(self) -> List[str]:
         """
@@ -57,3 +85,59 @@ class VolitionGuard:
         """
         return self.triggered_tones
 
+
+
+class SanitizingStream:
+    """
+    Incremental counterpart of VolitionGuard.sanitize.
+
+    Only the tail that could still be the start of a violation is held back: a
+    match starting at position s is final once max_width more characters have
+    arrived, so at most max_width characters are ever buffered. If a pattern has
+    no bounded width, everything is held until close().
+    """
+
+    def __init__(self, guard: VolitionGuard):
+        self.guard = guard
+        self.hold = guard.matcher.max_width
+        self._buffer = ""
+        self._context = ""  # last released source character, kept as lookbehind for \b
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk and return the sanitized text that can now be released (possibly "").
+        """
+        self._buffer += chunk
+        return self._drain(final=False)
+
+    def close(self) -> str:
+        """Release everything still held back."""
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> str:
+        text = self._context + self._buffer
+        start = pos = len(self._context)
+        end = len(text)
+
+        released = []
+        for tone, match in self.guard.matcher.finditer(text, start):
+            if not final and (self.hold is None or match.start() + self.hold >= end):
+                break  # more text could still change or extend this match
+            released.append(text[pos:match.start()])
+            released.append(self.guard.substitutions[tone])
+            if tone not in self.guard.triggered_tones:
+                self.guard.triggered_tones.append(tone)
+            pos = match.end()
+
+        if final:
+            safe = end
+        elif self.hold is None:
+            safe = pos
+        else:
+            safe = max(pos, end - self.hold)
+
+        released.append(text[pos:safe])
+        if safe > start:
+            self._context = text[safe - 1]
+        self._buffer = text[safe:]
+        return "".join(released)